@@ -1,5 +1,23 @@
 from django.contrib import admin
 from .models import BuyerProfile, RealtorProfile, SellerProfile, PartnerProfile
+from .filters import filter_budget_overlap
+from .matching import parse_budget_range
+
+
+class BudgetOverlapListFilter(admin.SimpleListFilter):
+    """Buyers whose numeric budget overlaps one of the standard budget brackets"""
+
+    title = "budget"
+    parameter_name = "budget"
+
+    def lookups(self, request, model_admin):
+        return BuyerProfile.BudgetRange.choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        low, high = parse_budget_range(self.value())
+        return filter_budget_overlap(queryset, "", low=low, high=high)
 
 
 @admin.register(BuyerProfile)
@@ -10,21 +28,22 @@ class BuyerProfileAdmin(admin.ModelAdmin):
         "user",
         "preferred_location",
         "budget_range",
-
+        "budget_min",
+        "budget_max",
         "created_at",
     )
-    list_filter = ("created_at",)
+    list_filter = (BudgetOverlapListFilter, "created_at")
     search_fields = (
         "user__email",
         "user__first_name",
         "user__last_name",
         "preferred_location",
     )
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("budget_min", "budget_max", "created_at", "updated_at")
 
     fieldsets = (
         ("User Information", {"fields": ("user",)}),
-        ("Preferences", {"fields": ("preferred_location", "budget_range")}),
+        ("Preferences", {"fields": ("preferred_location", "budget_range", "budget_min", "budget_max")}),
 
         ("Timestamps", {"fields": ("created_at", "updated_at")}),
     )
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from api import signals  # noqa: F401
+        from api.gazetteer import get_gazetteer
+
+        # Load the gazetteer once at startup rather than on the first request
+        get_gazetteer()
@@ -0,0 +1,127 @@
+"""
+Listing photos uploaded straight from the browser to media storage.
+
+1. plan_upload() checks what the browser says it is about to send (type, size
+   and SHA-256, or per-part SHA-256s for files above MULTIPART_THRESHOLD),
+   derives the content-addressed name from the digest, and returns presigned
+   PUT URL(s) for it. Only content already attached to one of the user's own
+   listings skips the upload; anything else, even if stored for someone else,
+   must be uploaded, so knowing a photo's digest doesn't give access to it.
+   It also returns a signed token describing the upload.
+2. The browser PUTs the bytes to the storage backend, which rejects any body
+   that doesn't hash to the signed checksum.
+3. finish_upload() takes the token back, moves a single PUT from its staging
+   key into place or completes a multipart upload, and confirms the object
+   exists with an acceptable size; the caller then attaches the names to the
+   listing (api.uploads.attach_listing_images).
+
+The image itself is decoded and validated by the process_images worker, as
+no app server ever holds the bytes.
+"""
+import re
+
+from django.core import signing
+
+from api.models import ImageBlob, PropertyImage
+from api.storage import (
+    MULTIPART_THRESHOLD, PRESIGNED_URL_EXPIRY, checksum_header, composite_digest, content_addressed_name,
+    part_sizes, property_image_storage,
+)
+from api.uploads import MAX_IMAGE_UPLOAD_SIZE
+
+
+CONTENT_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+UPLOAD_DIRECTORY = "property_images"
+TOKEN_SALT = "api.direct_uploads"
+HEX_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class DirectUploadError(ValueError):
+    pass
+
+
+def _digests(spec, size):
+    """Raw digests the upload is signed for: one for a single PUT, one per part for multipart."""
+    if size > MULTIPART_THRESHOLD:
+        expected, digests = len(part_sizes(size)), spec.get("parts") or []
+        if len(digests) != expected:
+            raise DirectUploadError(f"expected {expected} part checksums for {size} bytes.")
+    else:
+        digests = [spec.get("sha256") or ""]
+    if not all(isinstance(d, str) and HEX_DIGEST_RE.match(d) for d in digests):
+        raise DirectUploadError("checksums must be lowercase hex SHA-256 digests.")
+    return [bytes.fromhex(d) for d in digests]
+
+
+def plan_upload(user, spec):
+    """
+    `spec` is {"content_type", "size", "sha256"} (or "parts": [sha256, ...] above
+    MULTIPART_THRESHOLD). Returns {"token", "name", "exists"} plus the storage's
+    upload instructions unless the content is already one of `user`'s listing photos.
+    """
+    content_type = spec.get("content_type")
+    if content_type not in CONTENT_TYPES:
+        raise DirectUploadError(f"{content_type} images are not supported.")
+    size = spec.get("size")
+    if not isinstance(size, int) or size <= 0:
+        raise DirectUploadError("size must be a positive number of bytes.")
+    if size > MAX_IMAGE_UPLOAD_SIZE:
+        raise DirectUploadError(f"larger than {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)} MB.")
+
+    digests = _digests(spec, size)
+    hexdigest = digests[0].hex() if len(digests) == 1 else composite_digest(digests)
+    name = content_addressed_name(UPLOAD_DIRECTORY, hexdigest, CONTENT_TYPES[content_type])
+    # Tracked from now on, so gc_image_blobs reclaims it if the upload is never attached
+    ImageBlob.touch(name)
+
+    storage = property_image_storage()
+    checksums = [checksum_header(d) for d in digests]
+    # Never reveals (or hands out) content the user hasn't shown they have
+    exists = PropertyImage.objects.filter(image=name, seller_profile__user=user).exists() and storage.exists(name)
+    upload = {} if exists else storage.direct_upload(name, size, content_type, checksums)
+    token = signing.dumps(
+        {"user": user.pk, "name": name, "upload_id": upload.get("upload_id"), "checksums": checksums},
+        salt=TOKEN_SALT,
+    )
+    return {"token": token, "name": name, "exists": exists, **upload}
+
+
+def finish_upload(user, token, etags=None):
+    """
+    Complete the upload described by `token` (`etags` are the part ETags, in
+    order, for multipart) and return its storage name.
+    """
+    try:
+        upload = signing.loads(token, salt=TOKEN_SALT, max_age=PRESIGNED_URL_EXPIRY)
+    except signing.BadSignature:
+        raise DirectUploadError("upload token is invalid or has expired.")
+    if upload["user"] != user.pk:
+        raise DirectUploadError("upload token is invalid or has expired.")
+
+    storage, name, upload_id = property_image_storage(), upload["name"], upload["upload_id"]
+    if upload_id and len(upload["checksums"]) == 1:
+        try:
+            storage.complete_direct_put(name, upload_id)
+        except ValueError as e:
+            raise DirectUploadError(str(e))
+    elif upload_id:
+        etags = etags or []
+        if len(etags) != len(upload["checksums"]):
+            raise DirectUploadError(f"expected {len(upload['checksums'])} part ETags.")
+        parts = [
+            {"number": number, "etag": etag, "checksum": checksum}
+            for number, (etag, checksum) in enumerate(zip(etags, upload["checksums"]), 1)
+        ]
+        try:
+            storage.complete_direct_upload(name, upload_id, parts)
+        except ValueError as e:
+            raise DirectUploadError(str(e))
+
+    # The plan's grace period may be over by now: restart it before checking the file
+    # is there, so gc_image_blobs can't collect it between this check and the attach
+    ImageBlob.touch(name)
+    if not storage.exists(name):
+        raise DirectUploadError("the file has not been uploaded.")
+    if storage.size(name) > MAX_IMAGE_UPLOAD_SIZE:
+        raise DirectUploadError(f"larger than {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)} MB.")
+    return name
@@ -0,0 +1,122 @@
+"""
+Facet counts for the property search filters.
+
+All counts come from a single aggregate query using conditional Count()
+(FILTER (WHERE ...) on PostgreSQL). Facets are disjunctive: the counts for one
+dimension apply every other selected filter but not that dimension's own
+selection, so the UI can show what changing it would return. Results are
+cached briefly, keyed on the normalized filter parameters and the listing
+version from api.search_cache.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from api.filters import PropertyFilter, normalize_property_params
+from api.matching import parse_budget_range
+from api.models import BuyerProfile, SellerProfile
+from api.search_cache import listing_version
+
+
+FACETS_CACHE_TTL = getattr(settings, "PROPERTY_FACETS_CACHE_TTL", 60)
+
+FACET_PARAMS = ("type", "beds", "baths", "price_min", "price_max")
+BEDROOM_BUCKETS = (1, 2, 3, 4, 5)
+BATHROOM_BUCKETS = (1, 2, 3, 4)
+PRICE_BUCKETS = [
+    (value, label, *parse_budget_range(value)) for value, label in BuyerProfile.BudgetRange.choices
+]
+
+
+class FacetParamsError(ValueError):
+    def __init__(self, errors):
+        super().__init__("Invalid filter parameters")
+        self.errors = errors
+
+
+def _selected_conditions(cleaned):
+    """One Q per facet dimension for the values currently selected."""
+    conditions = {"type": Q(), "beds": Q(), "baths": Q(), "price": Q()}
+    if cleaned.get("type"):
+        conditions["type"] = Q(property_type__iexact=cleaned["type"])
+    if cleaned.get("beds") is not None:
+        conditions["beds"] = Q(bedrooms__gte=cleaned["beds"])
+    if cleaned.get("baths") is not None:
+        conditions["baths"] = Q(bathrooms__gte=cleaned["baths"])
+    if cleaned.get("price_min") is not None:
+        conditions["price"] &= Q(estimated_value__gte=cleaned["price_min"])
+    if cleaned.get("price_max") is not None:
+        conditions["price"] &= Q(estimated_value__lte=cleaned["price_max"])
+    return conditions
+
+
+def _others(conditions, dimension):
+    combined = Q()
+    for name, condition in conditions.items():
+        if name != dimension:
+            combined &= condition
+    return combined
+
+
+def _price_q(low, high, last=False):
+    # Upper bounds are exclusive (but the last's), so a price on a boundary counts once
+    q = Q(estimated_value__gte=low)
+    if high is not None:
+        q &= Q(estimated_value__lte=high) if last else Q(estimated_value__lt=high)
+    return q
+
+
+def compute_facets(params):
+    params = normalize_property_params(params)
+    filterset = PropertyFilter(params, queryset=SellerProfile.objects.none())
+    if not filterset.is_valid():
+        raise FacetParamsError(filterset.errors)
+    conditions = _selected_conditions(filterset.form.cleaned_data)
+
+    # Non-facet filters (keywords, location, zip) narrow the base set for every count
+    base_params = {k: v for k, v in params.items() if k not in FACET_PARAMS}
+    base = PropertyFilter(base_params, queryset=SellerProfile.objects.filter(has_active_listing=True)).qs
+
+    aggregates = {"total": Count("id", filter=_others(conditions, None))}
+    for value in SellerProfile.PropertyType.values:
+        aggregates[f"type_{value}"] = Count("id", filter=Q(property_type=value) & _others(conditions, "type"))
+    for beds in BEDROOM_BUCKETS:
+        aggregates[f"beds_{beds}"] = Count("id", filter=Q(bedrooms__gte=beds) & _others(conditions, "beds"))
+    for baths in BATHROOM_BUCKETS:
+        aggregates[f"baths_{baths}"] = Count("id", filter=Q(bathrooms__gte=baths) & _others(conditions, "baths"))
+    for index, (_, _, low, high) in enumerate(PRICE_BUCKETS):
+        last = index == len(PRICE_BUCKETS) - 1
+        aggregates[f"price_{index}"] = Count("id", filter=_price_q(low, high, last) & _others(conditions, "price"))
+
+    counts = base.order_by().aggregate(**aggregates)
+
+    return {
+        "total": counts["total"],
+        "type": [
+            {"value": value, "label": label, "count": counts[f"type_{value}"]}
+            for value, label in SellerProfile.PropertyType.choices
+        ],
+        "beds": [{"value": beds, "label": f"{beds}+", "count": counts[f"beds_{beds}"]} for beds in BEDROOM_BUCKETS],
+        "baths": [{"value": baths, "label": f"{baths}+", "count": counts[f"baths_{baths}"]} for baths in BATHROOM_BUCKETS],
+        "price": [
+            {"value": value, "label": label, "min": low, "max": high, "count": counts[f"price_{index}"]}
+            for index, (value, label, low, high) in enumerate(PRICE_BUCKETS)
+        ],
+    }
+
+
+def facets_cache_key(params):
+    normalized = json.dumps(normalize_property_params(params), sort_keys=True)
+    return f"property-facets:{listing_version()}:" + hashlib.md5(normalized.encode()).hexdigest()
+
+
+def get_facets(params):
+    key = facets_cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(params)
+        cache.set(key, facets, FACETS_CACHE_TTL)
+    return facets
@@ -1,6 +1,79 @@
+import math
+
 import django_filters
-from django.db.models import Q
-from api.models import SellerProfile, PartnerProfile
+from django import forms
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from django.utils.functional import cached_property
+from api.models import SellerProfile, PartnerProfile, ClientPipelineStage, BuyerRealtorConnection
+
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_RADIUS_KM = 10
+# Geo filters only place a listing to within a cell of this grid (~11 km) for locked viewers
+LOCKED_GEO_GRID_DEGREES = 0.1
+
+
+def _parse_coordinates(value, count, name):
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        raise forms.ValidationError({name: "Enter comma-separated numbers."})
+    if len(numbers) != count or not all(math.isfinite(n) for n in numbers):
+        raise forms.ValidationError({name: f"Enter exactly {count} comma-separated numbers."})
+    return numbers
+
+
+def _check_latitude(lat, name):
+    if not -90 <= lat <= 90:
+        raise forms.ValidationError({name: "Latitude must be between -90 and 90."})
+
+
+def _check_longitude(lon, name):
+    if not -180 <= lon <= 180:
+        raise forms.ValidationError({name: "Longitude must be between -180 and 180."})
+
+
+class PropertyFilterForm(forms.Form):
+    """Parses bbox ("west,south,east,north") and near ("lat,lon") into floats."""
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("bbox"):
+            west, south, east, north = _parse_coordinates(cleaned["bbox"], 4, "bbox")
+            for lat in (south, north):
+                _check_latitude(lat, "bbox")
+            for lon in (west, east):
+                _check_longitude(lon, "bbox")
+            if south > north:
+                raise forms.ValidationError({"bbox": "South must not be greater than north."})
+            cleaned["bbox"] = (west, south, east, north)
+        if cleaned.get("near"):
+            lat, lon = _parse_coordinates(cleaned["near"], 2, "near")
+            _check_latitude(lat, "near")
+            _check_longitude(lon, "near")
+            cleaned["near"] = (lat, lon)
+        if cleaned.get("radius_km") is not None and cleaned["radius_km"] <= 0:
+            raise forms.ValidationError({"radius_km": "Radius must be greater than 0."})
+        return cleaned
+
+
+def _grid_floor(value, limit):
+    return max(math.floor(value / LOCKED_GEO_GRID_DEGREES) * LOCKED_GEO_GRID_DEGREES, -limit)
+
+
+def _grid_ceil(value, limit):
+    return min(math.ceil(value / LOCKED_GEO_GRID_DEGREES) * LOCKED_GEO_GRID_DEGREES, limit)
+
+
+def haversine_km(lat, lon):
+    """Database expression for the great-circle distance from (lat, lon) to each row."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    d_lat = Radians(F("latitude")) - Value(lat)
+    d_lon = Radians(F("longitude")) - Value(lon)
+    a = Power(Sin(d_lat / 2), 2) + Value(math.cos(lat)) * Cos(Radians(F("latitude"))) * Power(Sin(d_lon / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
 
 class PropertyFilter(django_filters.FilterSet):
     keywords = django_filters.CharFilter(method='filter_keywords')
@@ -11,9 +84,13 @@ class PropertyFilter(django_filters.FilterSet):
     baths = django_filters.NumberFilter(field_name='bathrooms', lookup_expr='gte')
     type = django_filters.CharFilter(field_name='property_type', lookup_expr='iexact')
     zip_code = django_filters.CharFilter(field_name='zip_code', lookup_expr='icontains')
+    bbox = django_filters.CharFilter(method='filter_bbox')
+    near = django_filters.CharFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(method='filter_radius_km')
 
     class Meta:
         model = SellerProfile
+        form = PropertyFilterForm
         fields = ['type', 'beds', 'baths']
 
     def filter_keywords(self, queryset, name, value):
@@ -30,6 +107,70 @@ class PropertyFilter(django_filters.FilterSet):
             Q(zip_code__icontains=value)
         )
 
+    @cached_property
+    def exact_geo(self):
+        """
+        Whether geo filters use exact coordinates. Otherwise they match whole grid
+        cells, so shrinking boxes can't pin down a "Location Protected" listing.
+        Without a request (facets, saved searches) they never do.
+        """
+        from api.search_cache import viewer_has_full_access
+        return viewer_has_full_access(getattr(self.request, 'user', None))
+
+    def filter_bbox(self, queryset, name, value):
+        west, south, east, north = value
+        if not self.exact_geo:
+            # Widen the box to whole grid cells
+            south, north = _grid_floor(south, 90), _grid_ceil(north, 90)
+            west, east = _grid_floor(west, 180), _grid_ceil(east, 180)
+        queryset = queryset.filter(latitude__gte=south, latitude__lte=north)
+        if west <= east:
+            return queryset.filter(longitude__gte=west, longitude__lte=east)
+        # Box crosses the antimeridian
+        return queryset.filter(Q(longitude__gte=west) | Q(longitude__lte=east))
+
+    def filter_near(self, queryset, name, value):
+        lat, lon = value
+        radius = float(self.form.cleaned_data.get('radius_km') or DEFAULT_RADIUS_KM)
+
+        # Cheap bounding-box prefilter on the (latitude, longitude) index, then exact distance
+        d_lat = math.degrees(radius / EARTH_RADIUS_KM)
+        d_lon = math.degrees(radius / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 0.01)))
+        if not self.exact_geo:
+            box = (lon - d_lon, max(lat - d_lat, -90), lon + d_lon, min(lat + d_lat, 90))
+            return self.filter_bbox(queryset, name, box)
+        queryset = queryset.filter(
+            latitude__gte=lat - d_lat, latitude__lte=lat + d_lat,
+            longitude__gte=lon - d_lon, longitude__lte=lon + d_lon,
+        )
+        return queryset.alias(distance_km=haversine_km(lat, lon)).filter(distance_km__lte=radius)
+
+    def filter_radius_km(self, queryset, name, value):
+        # Only meaningful together with `near`; applied in filter_near
+        return queryset
+
+
+def normalize_property_params(params):
+    """
+    Canonical form of PropertyFilter query parameters: unknown and empty keys
+    dropped, values stripped and case-folded where the filter is
+    case-insensitive, keys in sorted order.
+    """
+    normalized = {}
+    for key in sorted(PropertyFilter.base_filters):
+        value = params.get(key)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if not value:
+            continue
+        if key in ('location', 'keywords'):
+            value = value.lower()
+        elif key == 'type':
+            value = value.upper()
+        normalized[key] = value
+    return normalized
+
 
 class PartnerFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method='filter_search')
@@ -44,3 +185,54 @@ class PartnerFilter(django_filters.FilterSet):
             Q(company_name__icontains=value) |
             Q(service_areas__icontains=value)
         )
+
+
+class ClientPipelineFilter(django_filters.FilterSet):
+    stage = django_filters.MultipleChoiceFilter(choices=ClientPipelineStage.Stage.choices, distinct=False)
+    search = django_filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = ClientPipelineStage
+        fields = ['stage']
+
+    def filter_search(self, queryset, name, value):
+        return queryset.filter(
+            Q(seller__user__first_name__icontains=value) |
+            Q(seller__user__last_name__icontains=value) |
+            Q(seller__user__email__icontains=value) |
+            Q(seller__street_address__icontains=value) |
+            Q(seller__city__icontains=value)
+        )
+
+
+def filter_budget_overlap(queryset, prefix, low=None, high=None):
+    """
+    Keep rows whose buyer budget [budget_min, budget_max] overlaps [low, high].
+    An open-ended budget (budget_max is null) overlaps any range above its minimum.
+    """
+    if high is not None:
+        queryset = queryset.filter(**{f"{prefix}budget_min__lte": high})
+    if low is not None:
+        queryset = queryset.filter(
+            Q(**{f"{prefix}budget_max__isnull": True}) | Q(**{f"{prefix}budget_max__gte": low})
+        )
+    return queryset
+
+
+class BuyerConnectionFilter(django_filters.FilterSet):
+    budget_min = django_filters.NumberFilter(method='filter_budget_min')
+    budget_max = django_filters.NumberFilter(method='filter_budget_max')
+    covers_price = django_filters.NumberFilter(method='filter_covers_price')
+
+    class Meta:
+        model = BuyerRealtorConnection
+        fields = []
+
+    def filter_budget_min(self, queryset, name, value):
+        return filter_budget_overlap(queryset, 'buyer__', low=value)
+
+    def filter_budget_max(self, queryset, name, value):
+        return filter_budget_overlap(queryset, 'buyer__', high=value)
+
+    def filter_covers_price(self, queryset, name, value):
+        return filter_budget_overlap(queryset, 'buyer__', low=value, high=value)
@@ -0,0 +1,77 @@
+"""
+Bundled US states/cities gazetteer.
+
+Loaded once per process from settings.GAZETTEER_FILE (regenerate it from a
+GeoNames dump with the build_gazetteer command). Each state's cities are kept
+sorted by lowercase name, so a prefix lookup is two bisects.
+"""
+import bisect
+import json
+from functools import lru_cache
+
+from django.conf import settings
+
+
+class Gazetteer:
+    def __init__(self, data):
+        entries = sorted(data["states"].items(), key=lambda item: item[1]["name"])
+        self.states = {abbr: entry["name"] for abbr, entry in entries}
+        self._state_by_name = {name.lower(): abbr for abbr, name in self.states.items()}
+        self._cities = {}
+        for abbr, entry in entries:
+            names = sorted(set(entry["cities"]), key=str.lower)
+            self._cities[abbr] = ([name.lower() for name in names], names)
+
+    def normalize_state(self, value):
+        """Return the two-letter code for a state name or code, or "" if unknown."""
+        value = (value or "").strip()
+        if value.upper() in self.states:
+            return value.upper()
+        return self._state_by_name.get(value.lower(), "")
+
+    def cities(self, state, prefix="", limit=None):
+        """City names in a state, optionally only those starting with `prefix`."""
+        keys, names = self._cities.get(state, ([], []))
+        prefix = prefix.strip().lower()
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\uffff") if prefix else len(keys)
+        if limit is not None:
+            end = min(end, start + limit)
+        return names[start:end]
+
+    def canonical_city(self, state, city):
+        """The gazetteer's spelling of `city` in `state`, or None if it isn't listed."""
+        keys, names = self._cities.get(state, ([], []))
+        key = city.strip().lower()
+        index = bisect.bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return names[index]
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer():
+    with open(settings.GAZETTEER_FILE) as f:
+        return Gazetteer(json.load(f))
+
+
+def normalize_city_state(city, state):
+    """
+    ("los angeles ", "California") -> ("Los Angeles", "CA").
+    Unknown values are only stripped, so free text is never lost.
+    """
+    gazetteer = get_gazetteer()
+    state = gazetteer.normalize_state(state) or (state or "").strip()
+    city = (city or "").strip()
+    return (gazetteer.canonical_city(state, city) if city else None) or city, state
+
+
+def normalize_preferred_location(value):
+    """Canonical "City, ST" (or just "ST") form of a free-text buyer location."""
+    parts = [part.strip() for part in (value or "").split(",") if part.strip()]
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return get_gazetteer().normalize_state(parts[0]) or parts[0]
+    city, state = normalize_city_state(parts[0], parts[1])
+    return f"{city}, {state}"
@@ -0,0 +1,159 @@
+"""
+Server-side geocoding of listing addresses.
+
+The geocoder is pluggable through settings.GEOCODER (a dotted path to a
+Geocoder subclass). NominatimGeocoder is used in production; FixtureGeocoder
+answers from a bundled JSON file so tests and offline development never touch
+the network.
+
+Results are stored in GeocodeCache keyed by normalized address. Saving a
+listing only ever consults that cache; addresses it can't answer are left
+pending (geocoded_at is null) for the geocode_listings worker, which calls the
+external geocoder in rate-limited batches. No request waits on the network.
+"""
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api import search_cache
+from api.models import GeocodeCache, SellerProfile
+
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_FIELDS = {"address_number", "street_address", "city", "state", "zip_code"}
+
+
+class Geocoder:
+    def geocode(self, address, zip_code=""):
+        """Return (latitude, longitude) for an address, or None if it can't be resolved."""
+        raise NotImplementedError
+
+
+class NominatimGeocoder(Geocoder):
+    url = "https://nominatim.openstreetmap.org/search"
+
+    def __init__(self):
+        self._last_request = 0.0
+
+    def _throttle(self):
+        wait = self._last_request + settings.GEOCODER_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+    def geocode(self, address, zip_code=""):
+        self._throttle()
+        try:
+            response = requests.get(
+                self.url,
+                params={"format": "json", "q": address, "limit": 1, "countrycodes": "us"},
+                headers={"User-Agent": settings.GEOCODER_USER_AGENT},
+                timeout=settings.GEOCODER_TIMEOUT,
+            )
+            response.raise_for_status()
+            results = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Error geocoding %r: %s", address, e)
+            return None
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class FixtureGeocoder(Geocoder):
+    """Looks addresses up in settings.GEOCODER_FIXTURE, falling back to the zip code centroid."""
+
+    def __init__(self, path=None):
+        with open(path or settings.GEOCODER_FIXTURE) as f:
+            data = json.load(f)
+        self.addresses = {normalize_address(key): tuple(value) for key, value in data.get("addresses", {}).items()}
+        self.zip_codes = {key: tuple(value) for key, value in data.get("zip_codes", {}).items()}
+
+    def geocode(self, address, zip_code=""):
+        return self.addresses.get(normalize_address(address)) or self.zip_codes.get(zip_code.strip())
+
+
+@lru_cache(maxsize=None)
+def get_geocoder():
+    return import_string(settings.GEOCODER)()
+
+
+def listing_address(listing):
+    """One-line address, e.g. "1234 Maple Avenue, Los Angeles, CA 90210"."""
+    street = " ".join(part for part in [listing.address_number, listing.street_address] if part)
+    region = " ".join(part for part in [listing.state, listing.zip_code] if part)
+    return ", ".join(part for part in [street, listing.city, region] if part)
+
+
+def normalize_address(address):
+    """Cache key form: lowercase, punctuation other than commas dropped, whitespace collapsed."""
+    address = re.sub(r"[^\w\s,]", "", address.lower())
+    return ", ".join(" ".join(part.split()) for part in address.split(",") if part.strip())
+
+
+def cached_coordinates(address):
+    """
+    (hit, coordinates) from GeocodeCache without calling the geocoder.
+    A fresh cached miss is a hit with coordinates None.
+    """
+    entry = GeocodeCache.objects.filter(address_key=normalize_address(address)).first()
+    if entry is None or not entry.is_fresh:
+        return False, None
+    return True, (entry.latitude, entry.longitude) if entry.latitude is not None else None
+
+
+def resolve(address, zip_code="", geocoder=None):
+    """Coordinates for an address, from the cache when fresh, else from the geocoder."""
+    hit, coordinates = cached_coordinates(address)
+    if hit:
+        return coordinates
+
+    coordinates = (geocoder or get_geocoder()).geocode(address, zip_code)
+    latitude, longitude = coordinates or (None, None)
+    GeocodeCache.objects.update_or_create(
+        address_key=normalize_address(address),
+        defaults={"latitude": latitude, "longitude": longitude, "resolved_at": timezone.now()},
+    )
+    return coordinates
+
+
+def _store(listing, coordinates, geocoded_at):
+    latitude, longitude = coordinates or (None, None)
+    # update() so geocoding never re-triggers the listing's post_save handlers
+    # Position is a similarity feature, so neighbour lists are queued for a refresh
+    SellerProfile.objects.filter(pk=listing.pk).update(
+        latitude=latitude, longitude=longitude, geocoded_at=geocoded_at, similar_refreshed_at=None
+    )
+    listing.latitude, listing.longitude, listing.geocoded_at = latitude, longitude, geocoded_at
+    if listing.has_active_listing:
+        search_cache.bump_listing_version()
+
+
+def apply_cached_coordinates(listing):
+    """
+    Called when a listing's address changes. Uses the cache only; on a miss the
+    old coordinates are cleared and the listing is left for the worker.
+    """
+    address = listing_address(listing)
+    if not address:
+        _store(listing, None, timezone.now())
+        return True
+    hit, coordinates = cached_coordinates(address)
+    _store(listing, coordinates, timezone.now() if hit else None)
+    return hit
+
+
+def geocode_listing(listing, geocoder=None):
+    """Resolve and store the listing's coordinates. Returns True if they were found."""
+    address = listing_address(listing)
+    coordinates = resolve(address, listing.zip_code, geocoder) if address else None
+    _store(listing, coordinates, timezone.now())
+    return coordinates is not None
@@ -0,0 +1,204 @@
+"""
+Responsive derivatives of listing photos.
+
+Uploaded originals are left untouched. The process_images worker resizes each
+pending PropertyImage (once per unique file; rows sharing a content-addressed
+blob share its variants) to the widths in VARIANTS, never upscaling, and writes
+every size in the original's web format (JPEG, or PNG when it has an alpha
+channel) plus WebP, and AVIF when the installed Pillow can encode it. File
+names and dimensions are recorded on the row, and image_set() turns them into
+srcset strings for the API, so the browser only downloads the size it needs.
+
+The same pass stores a low-quality placeholder (a ~16px WebP as a data URI,
+a few hundred bytes) and the dominant colour, which listing cards paint
+immediately, so no extra request is needed before the real image arrives.
+"""
+import base64
+import io
+import os
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from api.models import PropertyImage
+from api.uploads import ALLOWED_FORMATS, MAX_IMAGE_PIXELS
+
+
+# Variant name -> maximum width in pixels
+VARIANTS = getattr(settings, "IMAGE_VARIANTS", {"thumb": 320, "card": 768, "full": 1600})
+VARIANTS_DIR = "property_images/variants"
+
+MIME_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+SAVE_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+    "webp": {"format": "WEBP", "quality": 78, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+# Longest side of the placeholder; the browser blurs it up to the card size
+PLACEHOLDER_SIZE = 16
+
+
+def alternative_formats():
+    Image.init()
+    # AVIF needs Pillow 11.2+ or the pillow-avif-plugin package
+    return ["webp", "avif"] if "AVIF" in Image.SAVE else ["webp"]
+
+
+def _open(image_field):
+    with image_field.open("rb") as f:
+        image = Image.open(f)
+        # Direct uploads reach storage without the upload handler's header checks
+        if image.format not in ALLOWED_FORMATS or image.width * image.height > MAX_IMAGE_PIXELS:
+            raise UnidentifiedImageError(f"{image.format} {image.width}x{image.height} is not accepted")
+        image.load()
+    # Apply the camera's rotation, so EXIF can be dropped from the variants
+    return ImageOps.exif_transpose(image)
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
+
+
+def _replace(name, content):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(content))
+
+
+def placeholder(image):
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    data = _encode(tiny, "webp")
+    return "data:image/webp;base64," + base64.b64encode(data).decode("ascii")
+
+
+def dominant_color(image):
+    """Most common colour of a 5-colour median-cut palette, transparency flattened onto white."""
+    small = image.resize((64, 64), Image.BILINEAR)
+    if small.mode == "RGBA":
+        small = Image.alpha_composite(Image.new("RGBA", small.size, "white"), small)
+    quantized = small.convert("RGB").quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(quantized.getcolors())
+    return "#%02x%02x%02x" % tuple(quantized.getpalette()[index * 3:index * 3 + 3])
+
+
+def variants_dir(image_name):
+    """Variants are stored per original file, e.g. variants/<digest>_jpg/ for a content-addressed name."""
+    return f"{VARIANTS_DIR}/{os.path.basename(image_name).replace('.', '_')}"
+
+
+def variant_original_name(variant_name):
+    """
+    Inverse of variants_dir() for a file inside it. Exact for content-addressed
+    originals; legacy names containing extra dots can't be recovered (None).
+    """
+    parts = variant_name.split("/")
+    if len(parts) != 4 or "/".join(parts[:2]) != VARIANTS_DIR:
+        return None
+    stem, _, ext = parts[2].rpartition("_")
+    if re.fullmatch(r"[0-9a-f]{64}", stem):
+        return f"property_images/{stem[:2]}/{stem}.{ext}"
+    return f"property_images/{stem}.{ext}" if stem else None
+
+
+def delete_variants_dir(image_name):
+    directory = variants_dir(image_name)
+    if default_storage.exists(directory):
+        for name in default_storage.listdir(directory)[1]:
+            default_storage.delete(f"{directory}/{name}")
+
+
+def delete_variant_files(variants):
+    """Delete the files recorded in a row's `variants`, whatever directory they are in."""
+    for variant in variants.values():
+        for name in variant["files"].values():
+            default_storage.delete(name)
+
+
+def copy_processed(property_image, source):
+    """Share the variants already generated for another row with the same file."""
+    property_image.width, property_image.height = source.width, source.height
+    property_image.variants = source.variants
+    property_image.placeholder, property_image.dominant_color = source.placeholder, source.dominant_color
+    property_image.processed_at = timezone.now()
+
+
+def generate_variants(property_image):
+    """
+    Write every variant of `property_image` to storage and record them on the
+    instance (not saved). Returns False when the original can't be decoded.
+    """
+    try:
+        original = _open(property_image.image)
+    except (FileNotFoundError, UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        property_image.width = property_image.height = None
+        property_image.variants = {}
+        property_image.placeholder = property_image.dominant_color = ""
+        property_image.processed_at = timezone.now()
+        return False
+
+    has_alpha = original.mode in ("RGBA", "LA", "PA") or "transparency" in original.info
+    original = original.convert("RGBA" if has_alpha else "RGB")
+    base_format = "png" if has_alpha else "jpeg"
+    formats = [base_format] + alternative_formats()
+
+    variants, by_width = {}, {}
+    for name, max_width in sorted(VARIANTS.items(), key=lambda item: item[1]):
+        width = min(max_width, original.width)
+        if width not in by_width:
+            height = max(1, round(original.height * width / original.width))
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            files = {
+                fmt: _replace(f"{variants_dir(property_image.image.name)}/{name}.{fmt}", _encode(resized, fmt))
+                for fmt in formats
+            }
+            by_width[width] = {"width": width, "height": height, "files": files}
+        # A small original serves several variant names from the same files
+        variants[name] = by_width[width]
+
+    property_image.width, property_image.height = original.size
+    property_image.variants = variants
+    property_image.placeholder = placeholder(original)
+    property_image.dominant_color = dominant_color(original)
+    property_image.processed_at = timezone.now()
+    return True
+
+
+def image_set(property_image):
+    """
+    srcset-style description of one image for the API:
+    {"src", "width", "height", "placeholder", "color",
+     "variants": {name: {width, height, <format>: url}},
+     "srcset": {mime type: "url 320w, url 768w"}}.
+    Images the worker hasn't reached yet have empty variants, srcset and placeholder.
+    """
+    data = {
+        "src": property_image.image.url,
+        "width": property_image.width,
+        "height": property_image.height,
+        "placeholder": property_image.placeholder,
+        "color": property_image.dominant_color,
+    }
+    variants, srcset = {}, {}
+    for name, variant in sorted((property_image.variants or {}).items(), key=lambda item: item[1]["width"]):
+        urls = {fmt: default_storage.url(file_name) for fmt, file_name in variant["files"].items()}
+        variants[name] = {"width": variant["width"], "height": variant["height"], **urls}
+        for fmt, url in urls.items():
+            candidate = f"{url} {variant['width']}w"
+            entries = srcset.setdefault(MIME_TYPES[fmt], [])
+            if candidate not in entries:
+                entries.append(candidate)
+    data["variants"] = variants
+    data["srcset"] = {mime: ", ".join(entries) for mime, entries in srcset.items()}
+    return data
+
+
+def pending_images():
+    return PropertyImage.objects.filter(processed_at__isnull=True).exclude(image="").order_by("id")
@@ -0,0 +1,74 @@
+"""
+Homepage "latest listings" snapshot.
+
+The newest LATEST_LISTINGS_COUNT active listings are serialized once, as a
+locked viewer sees them, and kept in the cache together with the listing
+version (see api.search_cache) they were built at. Every viewer in the
+"locked" namespace sees exactly that payload, so anonymous homepage visits are
+answered from the cache without a COUNT or any per-row serialization.
+
+When the listing version moves the next request rebuilds the snapshot. Only
+one process rebuilds at a time; the others keep serving the previous snapshot
+until the new one is stored.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from api import search_cache
+from api.models import SellerProfile
+from api.v1.serializer import PropertySearchSerializer
+
+
+LATEST_LISTINGS_COUNT = getattr(settings, "LATEST_LISTINGS_COUNT", 24)
+SNAPSHOT_KEY = "latest-listings:locked"
+REBUILD_LOCK_KEY = "latest-listings:rebuilding"
+REBUILD_LOCK_TIMEOUT = 30
+
+
+def latest_queryset():
+    return (
+        SellerProfile.objects.filter(has_active_listing=True)
+        .select_related("user")
+        .prefetch_related("images")
+        .order_by("-created_at")
+    )
+
+
+def latest_listings(limit, context=None):
+    """
+    (results, has_more) for the newest `limit` listings, serialized for the
+    viewer in `context`. One row past the page tells whether more exist.
+    """
+    listings = list(latest_queryset()[:limit + 1])
+    results = PropertySearchSerializer(listings[:limit], many=True, context=context or {}).data
+    return results, len(listings) > limit
+
+
+def build_snapshot():
+    version = search_cache.listing_version()
+    # No request in the context, so every listing is serialized locked
+    results, has_more = latest_listings(LATEST_LISTINGS_COUNT)
+    snapshot = {"version": version, "results": results, "has_more": has_more}
+    cache.set(SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def get_snapshot():
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is not None and snapshot["version"] == search_cache.listing_version():
+        return snapshot
+    if snapshot is None:
+        return build_snapshot()
+    if not cache.add(REBUILD_LOCK_KEY, True, REBUILD_LOCK_TIMEOUT):
+        return snapshot  # another process is rebuilding it
+    try:
+        return build_snapshot()
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+def locked_latest_listings(limit):
+    """(results, has_more) for a locked viewer, from the snapshot."""
+    snapshot = get_snapshot()
+    results = snapshot["results"]
+    return results[:limit], len(results) > limit or snapshot["has_more"]
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from api.models import BuyerProfile
+from api.matching import parse_budget_range
+
+class Command(BaseCommand):
+    help = 'Populates BuyerProfile.budget_min/budget_max from budget_range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write("Backfilling buyer budget bounds...")
+
+        batch, updated = [], 0
+        buyers = BuyerProfile.objects.only('id', 'budget_range', 'budget_min', 'budget_max')
+        for buyer in buyers.iterator(chunk_size=batch_size):
+            bounds = parse_budget_range(buyer.budget_range)
+            if (buyer.budget_min, buyer.budget_max) == bounds:
+                continue
+            buyer.budget_min, buyer.budget_max = bounds
+            # Candidate listings are found by these bounds; queue the buyer for rebuild_buyer_matches --pending
+            buyer.matches_refreshed_at = None
+            batch.append(buyer)
+            if len(batch) >= batch_size:
+                updated += BuyerProfile.objects.bulk_update(batch, ['budget_min', 'budget_max', 'matches_refreshed_at'])
+                batch = []
+        if batch:
+            updated += BuyerProfile.objects.bulk_update(batch, ['budget_min', 'budget_max', 'matches_refreshed_at'])
+
+        self.stdout.write(self.style.SUCCESS(f'Done! Updated {updated} buyer profiles.'))
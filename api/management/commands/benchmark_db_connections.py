@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+
+POOLED_ENGINE = 'otlhubs.pooled_postgresql'
+
+
+class Command(BaseCommand):
+    help = 'Measures per-request database connection overhead: a new connection per request vs the configured reuse/pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per configuration')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        configured = connections[options['database']]
+        settings_dict = configured.settings_dict
+        engine = 'django.db.backends.postgresql' if settings_dict['ENGINE'] == POOLED_ENGINE else settings_dict['ENGINE']
+        # What every request paid before: the same database, reconnecting each time
+        baseline = load_backend(engine).DatabaseWrapper(
+            {
+                **settings_dict,
+                'ENGINE': engine,
+                'CONN_MAX_AGE': 0,
+                'OPTIONS': {k: v for k, v in settings_dict['OPTIONS'].items() if k != 'pool'},
+            },
+            alias=f"{options['database']}-baseline",
+        )
+
+        if settings_dict['ENGINE'] == POOLED_ENGINE:
+            label = f"pool {settings_dict['OPTIONS'].get('pool', {})}"
+        else:
+            label = f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']}"
+        results = [
+            self.measure('new connection per request', baseline, options['requests']),
+            self.measure(f'configured ({label})', configured, options['requests']),
+        ]
+        baseline.close()
+
+        before, after = results[0][1], results[1][1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Median request {before:.3f} ms -> {after:.3f} ms '
+            f'({before - after:.3f} ms of connection overhead saved per request).'
+        ))
+
+    def measure(self, label, connection, requests):
+        connects = 0
+
+        def count(sender, connection=None, **kwargs):
+            nonlocal connects
+            connects += 1
+
+        connection.close()
+        connection_created.connect(count, weak=False)
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                # What request_started / request_finished do around a view with one query
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count)
+
+        timings.sort()
+        median = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        self.stdout.write(
+            f'{label}: median {median:.3f} ms, p95 {p95:.3f} ms, '
+            f'mean {statistics.mean(timings):.3f} ms, {connects} connects for {requests} requests'
+        )
+        return label, median
@@ -0,0 +1,45 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.gazetteer import get_gazetteer
+
+class Command(BaseCommand):
+    help = 'Rebuilds the bundled US gazetteer from a GeoNames dump (US.txt or cities*.txt)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('geonames_file', help='Tab-separated GeoNames file, e.g. from https://download.geonames.org/export/dump/')
+        parser.add_argument('--min-population', type=int, default=1000)
+        parser.add_argument('--output', default=settings.GAZETTEER_FILE)
+        parser.add_argument('--replace', action='store_true', help="Drop the current file's cities instead of keeping them")
+
+    def handle(self, *args, **options):
+        # State names come from the current file; GeoNames admin1 codes are the same ISO codes.
+        # Its cities are kept too (unless --replace), as stored profiles and listings use those
+        # spellings ("New York", "St. Cloud") where GeoNames has others.
+        current = get_gazetteer()
+        states = {
+            abbr: {"name": name, "cities": set() if options['replace'] else set(current.cities(abbr))}
+            for abbr, name in current.states.items()
+        }
+
+        self.stdout.write(f"Reading {options['geonames_file']}...")
+        try:
+            with open(options['geonames_file'], encoding='utf-8') as f:
+                for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                    # name=1, feature_class=6, country_code=8, admin1=10, population=14
+                    if len(row) < 15 or row[6] != 'P' or row[8] != 'US' or row[10] not in states:
+                        continue
+                    if int(row[14] or 0) >= options['min_population']:
+                        states[row[10]]["cities"].add(row[1])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        data = {"states": {abbr: {"name": s["name"], "cities": sorted(s["cities"])} for abbr, s in states.items()}}
+        with open(options['output'], 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+            f.write('\n')
+
+        total = sum(len(s["cities"]) for s in data["states"].values())
+        self.stdout.write(self.style.SUCCESS(f'Done! Wrote {total} cities to {options["output"]}.'))
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import SellerProfile
+from api.similar import K, claim_pending, load_vectors, refresh_all, refresh_listing
+
+class Command(BaseCommand):
+    help = 'Recomputes the precomputed "similar listings" neighbour lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=K, help='Neighbours kept per listing')
+        parser.add_argument('--chunk-size', type=int, default=256, help='Listings compared against all others per step')
+        parser.add_argument('--listing', type=int, help='Only refresh the lists affected by this SellerProfile id')
+        parser.add_argument('--pending', action='store_true', help='Only refresh listings changed since their last refresh')
+        parser.add_argument('--rebuild-threshold', type=int, default=100,
+                            help='With --pending, rebuild everything instead when more listings than this are pending')
+        parser.add_argument('--watch', action='store_true', help='With --pending, keep running, polling for changes')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between polls with --watch')
+
+    def handle(self, *args, **options):
+        if options['listing']:
+            listing = SellerProfile.objects.filter(pk=options['listing']).first()
+            if listing is None:
+                raise CommandError(f"SellerProfile {options['listing']} does not exist")
+            rewritten = refresh_listing(listing, k=options['k'], chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'Done! Rewrote {rewritten} neighbour lists.'))
+            return
+
+        if options['pending']:
+            while True:
+                self.refresh_pending(options)
+                if not options['watch']:
+                    break
+                time.sleep(options['interval'])
+            return
+
+        self.rebuild(options)
+
+    def rebuild(self, options):
+        self.stdout.write("Computing similar listings...")
+        total = refresh_all(k=options['k'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Done! Computed neighbours for {total} listings.'))
+
+    def refresh_pending(self, options):
+        threshold = options['rebuild_threshold']
+        listings = claim_pending(threshold + 1)
+        if len(listings) > threshold:
+            # Cheaper than one incremental refresh per listing (and the first build lands here)
+            self.stdout.write(f"More than {threshold} listings pending.")
+            self.rebuild(options)
+            return
+
+        rewritten, vectors = 0, None
+        for listing in listings:
+            if vectors is None and listing.has_active_listing:
+                vectors = load_vectors()
+            rewritten += refresh_listing(listing, k=options['k'], chunk_size=options['chunk_size'], vectors=vectors)
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Refreshed {len(listings)} pending listings, rewrote {rewritten} neighbour lists.'
+        ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api import search_cache
+from api.images import delete_variant_files
+from api.models import ImageBlob, PropertyImage
+from api.storage import is_content_addressed, property_image_storage
+
+class Command(BaseCommand):
+    help = 'Moves property images stored before content addressing into the deduplicated layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        storage = property_image_storage()
+        moved = missing = 0
+        last_id = 0
+        while True:
+            batch = list(
+                PropertyImage.objects.filter(id__gt=last_id).exclude(image='').order_by('id')
+                .only('id', 'image', 'variants')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for image in batch:
+                old_name = image.image.name
+                if is_content_addressed(old_name):
+                    continue
+                if not storage.exists(old_name):
+                    missing += 1
+                    continue
+                with storage.open(old_name) as f:
+                    new_name = storage.save(old_name, f)
+                with transaction.atomic():
+                    # update() so the move doesn't look like a new upload to the signal handlers
+                    PropertyImage.objects.filter(pk=image.pk).update(image=new_name, variants={}, processed_at=None)
+                    if ImageBlob.retain(new_name) and not storage.exists(new_name):
+                        # save() reused a stored copy that gc_image_blobs has since deleted: store it again
+                        with storage.open(old_name) as f:
+                            if storage.save(old_name, f) != new_name:
+                                # Rolls the move back, so the row keeps pointing at the old file
+                                raise CommandError(f"{old_name} changed while it was being moved; run the command again.")
+                if not PropertyImage.objects.filter(image=old_name).exists():
+                    storage.delete(old_name)
+                    delete_variant_files(image.variants or {})
+                moved += 1
+
+        if moved:
+            search_cache.bump_listing_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Moved {moved} images ({missing} missing files). Run process_images to rebuild their variants.'
+        ))
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api.images import delete_variants_dir
+from api.models import ImageBlob, PropertyImage
+from api.storage import property_image_storage
+
+class Command(BaseCommand):
+    help = 'Deletes content-addressed image blobs (and their variants) that no PropertyImage references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Only collect blobs unreferenced for at least this long, so in-flight uploads can still claim them')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting it')
+
+    def handle(self, *args, **options):
+        storage = property_image_storage()
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        candidates = ImageBlob.objects.filter(ref_count=0, updated_at__lt=cutoff).values_list('id', flat=True)
+
+        deleted = freed = 0
+        for blob_id in candidates.iterator():
+            with transaction.atomic():
+                blob = ImageBlob.objects.select_for_update().filter(
+                    id=blob_id, ref_count=0, updated_at__lt=cutoff
+                ).first()
+                # Re-check under the lock: the count may have been claimed, or may have drifted
+                if blob is None or PropertyImage.objects.filter(image=blob.name).exists():
+                    continue
+                size = storage.size(blob.name) if storage.exists(blob.name) else 0
+                if options['dry_run']:
+                    self.stdout.write(f"Would delete {blob.name} ({size} bytes)")
+                else:
+                    blob.delete()
+                    storage.delete(blob.name)
+                    delete_variants_dir(blob.name)
+                deleted += 1
+                freed += size
+
+        verb = 'Would free' if options['dry_run'] else 'Freed'
+        self.stdout.write(self.style.SUCCESS(f'Done! {verb} {freed} bytes from {deleted} blobs.'))
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.media_gc import referenced_names, referenced_variant_files, walk
+
+class Command(BaseCommand):
+    help = 'Mark-and-sweep: deletes media files that nothing in the database references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', nargs='*', default=['property_images', '.staging'],
+                            help='Directories inside the media storage to sweep')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Files checked against the database per query')
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Never delete files modified more recently than this (uploads in flight)')
+        parser.add_argument('--dry-run', action='store_true', help='Report orphans without deleting them')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        started = time.monotonic()
+
+        # Mark: variant files are only recorded inside JSON, so collect them up front
+        variant_files = referenced_variant_files()
+        self.stdout.write(f"Marked {len(variant_files)} variant files in {time.monotonic() - started:.1f}s")
+
+        scanned = orphans = freed = 0
+        files = (name for prefix in options['prefix'] if storage.exists(prefix) for name in walk(storage, prefix))
+        while True:
+            batch = list(islice(files, options['batch_size']))
+            if not batch:
+                break
+            scanned += len(batch)
+            candidates = [name for name in batch if name not in variant_files]
+            referenced = referenced_names(candidates)
+
+            for name in candidates:
+                if name in referenced or storage.get_modified_time(name) >= cutoff:
+                    continue
+                size = storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(f"Would delete {name} ({size} bytes)")
+                else:
+                    storage.delete(name)
+                orphans += 1
+                freed += size
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"Scanned {scanned} files ({scanned / elapsed:.0f}/s), {orphans} orphans so far")
+
+        elapsed = time.monotonic() - started
+        verb = 'Would free' if options['dry_run'] else 'Freed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! Scanned {scanned} files in {elapsed:.1f}s ({scanned / max(elapsed, 1e-6):.0f}/s). '
+            f'{verb} {freed} bytes from {orphans} orphaned files.'
+        ))
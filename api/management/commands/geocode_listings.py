@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api import search_cache
+from api.models import SellerProfile
+from api.geocoding import get_geocoder, listing_address, resolve
+
+class Command(BaseCommand):
+    help = 'Geocodes pending listing addresses into SellerProfile.latitude/longitude, in rate-limited batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-geocode every listing, not just pending ones')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--watch', action='store_true', help='Keep running, polling for newly pending listings')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between polls with --watch')
+
+    def handle(self, *args, **options):
+        geocoder = get_geocoder()
+        while True:
+            found, total = self.geocode_pending(geocoder, options['batch_size'], options['all'])
+            self.stdout.write(self.style.SUCCESS(f'Done! Geocoded {found} of {total} listings.'))
+            if not options['watch']:
+                break
+            options['all'] = False
+            time.sleep(options['interval'])
+
+    def geocode_pending(self, geocoder, batch_size, everything):
+        listings = SellerProfile.objects.only(
+            'id', 'address_number', 'street_address', 'city', 'state', 'zip_code', 'has_active_listing'
+        ).order_by('id')
+        if not everything:
+            listings = listings.filter(geocoded_at__isnull=True)
+
+        found = total = 0
+        last_id = 0
+        while True:
+            batch = list(listings.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return found, total
+            last_id = batch[-1].id
+
+            # Listings sharing an address cost one lookup; the geocoder throttles its own requests
+            resolved = {}
+            for listing in batch:
+                address = listing_address(listing)
+                if address and address not in resolved:
+                    resolved[address] = resolve(address, listing.zip_code, geocoder)
+
+            now = timezone.now()
+            for listing in batch:
+                listing.latitude, listing.longitude = resolved.get(listing_address(listing)) or (None, None)
+                listing.geocoded_at = now
+                # Position is a similarity feature; queue the neighbour lists for a refresh
+                listing.similar_refreshed_at = None
+            SellerProfile.objects.bulk_update(batch, ['latitude', 'longitude', 'geocoded_at', 'similar_refreshed_at'])
+            if any(listing.has_active_listing for listing in batch):
+                search_cache.bump_listing_version()
+
+            found += sum(listing.latitude is not None for listing in batch)
+            total += len(batch)
+            self.stdout.write(f"Geocoded batch of {len(batch)} listings (up to id {last_id})")
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stripe
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import path
+
+from api.v1.async_views import AccessPassSuccessAsyncView
+from api.v1.payment import AccessPassSuccessView
+
+# Served as ROOT_URLCONF while the command runs, so both versions of the callback are reachable
+urlpatterns = [
+    path('sync/access-pass-success/', AccessPassSuccessView.as_view()),
+    path('async/access-pass-success/', AccessPassSuccessAsyncView.as_view()),
+]
+
+
+class SimulatedStripeClient(stripe.HTTPClient):
+    """Answers every Stripe call with an unpaid checkout session after `latency` seconds."""
+    name = 'simulated'
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def session(self, url):
+        session_id = url.split('?')[0].rsplit('/', 1)[-1]
+        return json.dumps({'id': session_id, 'object': 'checkout.session', 'payment_status': 'unpaid', 'metadata': {}})
+
+    def request(self, method, url, headers, post_data=None, *, _usage=None):
+        time.sleep(self.latency)
+        return self.session(url), 200, {}
+
+    async def request_async(self, method, url, headers, post_data=None):
+        await asyncio.sleep(self.latency)
+        return self.session(url).encode(), 200, {}
+
+    async def sleep_async(self, secs):
+        await asyncio.sleep(secs)
+
+    def close(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the access pass payment callback under simulated Stripe latency, '
+        'with the same number of requests in flight for both: the sync view on that many '
+        'worker threads vs the async view on one event loop'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per configuration')
+        parser.add_argument('--latency', type=int, default=200, help='Simulated Stripe response time (ms)')
+        parser.add_argument(
+            '--concurrency', type=int, default=50,
+            help='Requests in flight: threads of the sync worker, and the in-flight limit of the async one',
+        )
+
+    def handle(self, *args, **options):
+        requests, latency, concurrency = options['requests'], options['latency'] / 1000, options['concurrency']
+        original_client, original_key = stripe.default_http_client, stripe.api_key
+        stripe.default_http_client = SimulatedStripeClient(latency)
+        stripe.api_key = original_key or 'sk_test_loadtest'
+        try:
+            # The dummy cache turns throttling off, so every request reaches the view
+            with override_settings(
+                ROOT_URLCONF=__name__,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            ):
+                sync = self.run_sync(requests, concurrency)
+                self.report(f"sync view, {concurrency} threads", requests, *sync)
+                concurrent = asyncio.run(self.run_async(requests, concurrency))
+                self.report(f"async view, {concurrency} in flight", requests, *concurrent)
+        finally:
+            stripe.default_http_client, stripe.api_key = original_client, original_key
+
+        before, after = requests / sync[0], requests / concurrent[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Done! {before:.1f} -> {after:.1f} requests/s ({after / before:.1f}x) with {concurrency} '
+            f'requests in flight at {options["latency"]} ms Stripe latency.'
+        ))
+
+    def run_sync(self, requests, threads):
+        local = threading.local()
+
+        def get(i):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            started = time.perf_counter()
+            response = local.client.get('/sync/access-pass-success/', {'session_id': f'cs_test_{i}'})
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(get, range(requests)))
+        return time.perf_counter() - started, results
+
+    async def run_async(self, requests, concurrency):
+        client, slots = AsyncClient(), asyncio.Semaphore(concurrency)
+
+        async def get(i):
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get('/async/access-pass-success/', {'session_id': f'cs_test_{i}'})
+                return response.status_code, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(get(i) for i in range(requests)))
+        return time.perf_counter() - started, results
+
+    def report(self, label, requests, elapsed, results):
+        timings = sorted(ms for _, ms in results)
+        failed = sum(1 for code, _ in results if code != 302)
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        self.stdout.write(
+            f'{label}: {requests / elapsed:.1f} requests/s, median {statistics.median(timings):.1f} ms, '
+            f'p95 {p95:.1f} ms, {failed} failed'
+        )
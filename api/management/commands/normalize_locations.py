@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from api import search_cache
+from api.models import BuyerProfile, SellerProfile
+from api.gazetteer import normalize_city_state, normalize_preferred_location
+
+class Command(BaseCommand):
+    help = 'Normalizes SellerProfile city/state and BuyerProfile preferred_location against the gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        self.stdout.write("Normalizing listing locations...")
+        batch, sellers = [], 0
+        for seller in SellerProfile.objects.only('id', 'city', 'state').iterator(chunk_size=batch_size):
+            normalized = normalize_city_state(seller.city, seller.state)
+            if normalized == (seller.city, seller.state):
+                continue
+            seller.city, seller.state = normalized
+            # bulk_update() sends no signals; queue the listing for rebuild_buyer_matches --pending
+            seller.matches_refreshed_at = None
+            batch.append(seller)
+            if len(batch) >= batch_size:
+                sellers += SellerProfile.objects.bulk_update(batch, ['city', 'state', 'matches_refreshed_at'])
+                batch = []
+        if batch:
+            sellers += SellerProfile.objects.bulk_update(batch, ['city', 'state', 'matches_refreshed_at'])
+        if sellers:
+            search_cache.bump_listing_version()
+
+        self.stdout.write("Normalizing buyer preferred locations...")
+        batch, buyers = [], 0
+        for buyer in BuyerProfile.objects.only('id', 'preferred_location').iterator(chunk_size=batch_size):
+            normalized = normalize_preferred_location(buyer.preferred_location)
+            if normalized == buyer.preferred_location:
+                continue
+            buyer.preferred_location = normalized
+            buyer.matches_refreshed_at = None
+            batch.append(buyer)
+            if len(batch) >= batch_size:
+                buyers += BuyerProfile.objects.bulk_update(batch, ['preferred_location', 'matches_refreshed_at'])
+                batch = []
+        if batch:
+            buyers += BuyerProfile.objects.bulk_update(batch, ['preferred_location', 'matches_refreshed_at'])
+
+        self.stdout.write(self.style.SUCCESS(f'Done! Updated {sellers} listings and {buyers} buyers.'))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from api import search_cache
+from api.images import copy_processed, generate_variants, pending_images
+from api.models import PropertyImage
+
+class Command(BaseCommand):
+    help = 'Generates resized/WebP variants and placeholders for pending property images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate variants for every image, not just pending ones')
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--watch', action='store_true', help='Keep running, polling for new uploads')
+        parser.add_argument('--interval', type=int, default=10, help='Seconds between polls with --watch')
+
+    def handle(self, *args, **options):
+        while True:
+            processed, failed = self.process(options['batch_size'], options['all'])
+            self.stdout.write(self.style.SUCCESS(f'Done! Processed {processed} images ({failed} could not be decoded).'))
+            if not options['watch']:
+                break
+            options['all'] = False
+            time.sleep(options['interval'])
+
+    def process(self, batch_size, everything):
+        images = PropertyImage.objects.exclude(image='').order_by('id') if everything else pending_images()
+        images = images.select_related('seller_profile').only(
+            'id', 'image', 'width', 'height', 'variants', 'placeholder', 'dominant_color', 'processed_at',
+            'seller_profile__has_active_listing',
+        )
+
+        processed = failed = 0
+        last_id = 0
+        while True:
+            batch = list(images.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return processed, failed
+            last_id = batch[-1].id
+
+            # Rows sharing a file (content-addressed uploads) are processed once;
+            # rows processed before placeholders existed aren't copied from
+            done = {
+                image.image.name: image
+                for image in PropertyImage.objects.filter(
+                    image__in={image.image.name for image in batch}, processed_at__isnull=False
+                ).exclude(id__in=[image.id for image in batch]).exclude(placeholder='')
+            }
+            for image in batch:
+                if image.image.name in done:
+                    copy_processed(image, done[image.image.name])
+                    continue
+                if not generate_variants(image):
+                    failed += 1
+                done[image.image.name] = image
+            PropertyImage.objects.bulk_update(batch, ['width', 'height', 'variants', 'placeholder', 'dominant_color', 'processed_at'])
+            # Search results embed image URLs
+            if any(image.seller_profile.has_active_listing for image in batch):
+                search_cache.bump_listing_version()
+
+            processed += len(batch)
+            self.stdout.write(f"Processed batch of {len(batch)} images (up to id {last_id})")
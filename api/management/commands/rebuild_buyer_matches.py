@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.models import BuyerProfile, SellerProfile
+from api.matching import claim_pending_buyers, claim_pending_listings, refresh_buyer_matches, refresh_listing_matches
+
+class Command(BaseCommand):
+    help = 'Recomputes the precomputed buyer -> listing match table from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyer', type=int, help='Only rebuild matches for this BuyerProfile id')
+        parser.add_argument('--pending', action='store_true', help='Only refresh listings and buyers changed since their last refresh')
+        parser.add_argument('--batch-size', type=int, default=500, help='Pending rows claimed at a time with --pending')
+        parser.add_argument('--watch', action='store_true', help='With --pending, keep running, polling for changes')
+        parser.add_argument('--interval', type=int, default=60, help='Seconds between polls with --watch')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            while True:
+                self.refresh_pending(options['batch_size'])
+                if not options['watch']:
+                    break
+                time.sleep(options['interval'])
+            return
+
+        buyers = BuyerProfile.objects.only('id', 'preferred_location', 'budget_range')
+        if options['buyer']:
+            buyers = buyers.filter(pk=options['buyer'])
+        else:
+            # Claimed before reading, so a change made meanwhile is still picked up by --pending
+            now = timezone.now()
+            SellerProfile.objects.update(matches_refreshed_at=now)
+            BuyerProfile.objects.update(matches_refreshed_at=now)
+
+        self.stdout.write("Rebuilding buyer matches...")
+        total_buyers = total_matches = 0
+        for buyer in buyers.iterator(chunk_size=500):
+            total_matches += refresh_buyer_matches(buyer)
+            total_buyers += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Done! {total_matches} matches for {total_buyers} buyers.'))
+
+    def refresh_pending(self, batch_size):
+        listings = buyers = 0
+        while batch := claim_pending_listings(batch_size):
+            for listing in batch:
+                refresh_listing_matches(listing)
+            listings += len(batch)
+        while batch := claim_pending_buyers(batch_size):
+            for buyer in batch:
+                refresh_buyer_matches(buyer)
+            buyers += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Done! Refreshed matches for {listings} listings and {buyers} buyers.'))
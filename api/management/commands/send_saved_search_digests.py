@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from api.saved_searches import claim_pending, pending_digests, mark_notified, record_hits
+from core.mail import send_saved_search_digest
+
+class Command(BaseCommand):
+    help = 'Checks changed listings against saved searches, then emails each buyer one digest of the new matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report digests without checking listings, sending or marking them')
+        parser.add_argument('--batch-size', type=int, default=200, help='Pending listings checked at a time')
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            self.stdout.write("Checking changed listings against saved searches...")
+            checked = recorded = 0
+            while listings := claim_pending(options['batch_size']):
+                recorded += record_hits(listings)
+                checked += len(listings)
+            self.stdout.write(f"Recorded {recorded} new matches for {checked} listings.")
+
+        self.stdout.write("Sending saved search digests...")
+        sent = failed = 0
+
+        for buyer, hits in pending_digests():
+            listings = [(hit.saved_search.name or "Saved search", hit.listing) for hit in hits]
+            if options['dry_run']:
+                self.stdout.write(f"{buyer.user.email}: {len(listings)} new listing(s)")
+                continue
+            if send_saved_search_digest(buyer.user.email, listings):
+                mark_notified(hits)
+                sent += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Done! {sent} digests sent, {failed} failed.'))
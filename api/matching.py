@@ -0,0 +1,203 @@
+"""
+Buyer -> listing matching.
+
+A buyer matches an active listing when the listing's estimated_value falls inside
+the buyer's budget range and the listing is in the buyer's preferred location.
+Matches are precomputed into BuyerListingMatch and maintained incrementally:
+a changed listing is re-evaluated only against candidate buyers, and a changed
+buyer only against candidate listings.
+
+Saving either only marks it pending (matches_refreshed_at = NULL);
+`rebuild_buyer_matches --pending` re-evaluates pending rows off the request path.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.gazetteer import get_gazetteer
+from api.models import BuyerProfile, SellerProfile, BuyerListingMatch
+
+
+def parse_budget_range(value):
+    """
+    Turn a BuyerProfile.BudgetRange value into (min, max) integers.
+    "200000-400000" -> (200000, 400000), "1000000+" -> (1000000, None), "" -> (None, None)
+    """
+    if not value:
+        return None, None
+    value = value.replace(",", "").replace("$", "").strip()
+    try:
+        if value.endswith("+"):
+            return int(value[:-1]), None
+        low, high = value.split("-", 1)
+        return int(low), int(high)
+    except ValueError:
+        return None, None
+
+
+def budget_covers(value, price):
+    low, high = parse_budget_range(value)
+    if low is None or price is None:
+        return False
+    return price >= low and (high is None or price <= high)
+
+
+def normalize_state(value):
+    """Return the two-letter code for a state name or code, or "" if unknown."""
+    return get_gazetteer().normalize_state(value)
+
+
+def normalize_location(value):
+    """
+    Split a free-text "City, State" into a normalized (city, state) pair.
+    A lone state ("CA", "California") gives ("", "CA"); a lone city gives ("austin", "").
+    """
+    parts = [p.strip() for p in (value or "").split(",") if p.strip()]
+    if not parts:
+        return "", ""
+    if len(parts) == 1:
+        state = normalize_state(parts[0])
+        return ("", state) if state else (parts[0].lower(), "")
+    return parts[0].lower(), normalize_state(parts[1])
+
+
+def location_matches(preferred_location, city, state):
+    want_city, want_state = normalize_location(preferred_location)
+    if not want_city and not want_state:
+        return False
+    if want_city and want_city != (city or "").strip().lower():
+        return False
+    if want_state and want_state != normalize_state(state):
+        return False
+    return True
+
+
+def is_match(buyer, listing):
+    return (
+        listing.has_active_listing
+        and budget_covers(buyer.budget_range, listing.estimated_value)
+        and location_matches(buyer.preferred_location, listing.city, listing.state)
+    )
+
+
+def buyers_covering_price(price, queryset=None):
+    """
+    Buyers whose numeric budget bounds contain `price`.
+    Served by the (budget_min, budget_max) index instead of parsing budget_range text.
+    """
+    queryset = BuyerProfile.objects.all() if queryset is None else queryset
+    if price is None:
+        return queryset.none()
+    return queryset.filter(budget_min__lte=price).filter(
+        Q(budget_max__isnull=True) | Q(budget_max__gte=price)
+    )
+
+
+def _state_variants(state):
+    abbr = normalize_state(state)
+    return [abbr, get_gazetteer().states[abbr]] if abbr else []
+
+
+def candidate_buyers(listing):
+    """Buyers whose budget covers the listing, narrowed in SQL by location text."""
+    location_q = Q()
+    if listing.city:
+        location_q |= Q(preferred_location__icontains=listing.city.strip())
+    for variant in _state_variants(listing.state):
+        location_q |= Q(preferred_location__iexact=variant)
+    if not location_q:
+        return BuyerProfile.objects.none()
+
+    return buyers_covering_price(listing.estimated_value).filter(location_q).only(
+        "id", "preferred_location", "budget_range"
+    )
+
+
+def candidate_listings(buyer):
+    """Active listings inside the buyer's budget, narrowed in SQL by city/state."""
+    low, high = parse_budget_range(buyer.budget_range)
+    city, state = normalize_location(buyer.preferred_location)
+    if low is None or not (city or state):
+        return SellerProfile.objects.none()
+
+    qs = SellerProfile.objects.filter(has_active_listing=True, estimated_value__gte=low)
+    if high is not None:
+        qs = qs.filter(estimated_value__lte=high)
+    if city:
+        qs = qs.filter(city__iexact=city)
+    if state:
+        state_q = Q()
+        for variant in _state_variants(state):
+            state_q |= Q(state__iexact=variant)
+        qs = qs.filter(state_q)
+    return qs.only("id", "city", "state", "estimated_value", "has_active_listing")
+
+
+def mark_listing_pending(listing):
+    """Queue `listing` for rebuild_buyer_matches --pending."""
+    SellerProfile.objects.filter(pk=listing.pk).update(matches_refreshed_at=None)
+
+
+def mark_buyer_pending(buyer):
+    """Queue `buyer` for rebuild_buyer_matches --pending."""
+    BuyerProfile.objects.filter(pk=buyer.pk).update(matches_refreshed_at=None)
+
+
+def _claim_pending(model, fields, limit):
+    """Up to `limit` pending rows, marked refreshed first so a change made meanwhile queues them again."""
+    rows = list(model.objects.filter(matches_refreshed_at__isnull=True).only(*fields).order_by("id")[:limit])
+    model.objects.filter(pk__in=[row.pk for row in rows]).update(matches_refreshed_at=timezone.now())
+    return rows
+
+
+def claim_pending_listings(limit):
+    return _claim_pending(SellerProfile, ("id", "city", "state", "estimated_value", "has_active_listing"), limit)
+
+
+def claim_pending_buyers(limit):
+    return _claim_pending(BuyerProfile, ("id", "preferred_location", "budget_range"), limit)
+
+
+@transaction.atomic
+def refresh_listing_matches(listing):
+    """Recompute every buyer match for one listing. Returns the number of matches."""
+    wanted = set()
+    if listing.has_active_listing:
+        wanted = {
+            buyer.id
+            for buyer in candidate_buyers(listing).iterator(chunk_size=1000)
+            if is_match(buyer, listing)
+        }
+
+    # Diff against what is stored so unchanged matches keep their created_at
+    existing = BuyerListingMatch.objects.filter(listing_id=listing.id)
+    current = set(existing.values_list("buyer_id", flat=True))
+    if current - wanted:
+        existing.filter(buyer_id__in=current - wanted).delete()
+    BuyerListingMatch.objects.bulk_create(
+        [BuyerListingMatch(buyer_id=buyer_id, listing_id=listing.id) for buyer_id in wanted - current],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(wanted)
+
+
+@transaction.atomic
+def refresh_buyer_matches(buyer):
+    """Recompute every listing match for one buyer. Returns the number of matches."""
+    wanted = {
+        listing.id
+        for listing in candidate_listings(buyer).iterator(chunk_size=1000)
+        if is_match(buyer, listing)
+    }
+
+    existing = BuyerListingMatch.objects.filter(buyer_id=buyer.id)
+    current = set(existing.values_list("listing_id", flat=True))
+    if current - wanted:
+        existing.filter(listing_id__in=current - wanted).delete()
+    BuyerListingMatch.objects.bulk_create(
+        [BuyerListingMatch(buyer_id=buyer.id, listing_id=listing_id) for listing_id in wanted - current],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(wanted)
@@ -0,0 +1,165 @@
+"""
+Serving listing photos.
+
+serve_media() decides who may see a file under MEDIA_URL and how it is cached,
+then hands the bytes off according to settings.MEDIA_SERVE_BACKEND:
+
+  "x-accel-redirect"  nginx serves MEDIA_ACCEL_REDIRECT_PREFIX + name from an
+                      internal location (the default outside DEBUG)
+  "x-sendfile"        Apache mod_xsendfile serves the absolute path
+  "python"            Django streams the file itself, with ETag/If-None-Match,
+                      single byte ranges and If-Range (development, or no proxy)
+
+Both headers carry the name URL-quoted: nginx and mod_xsendfile (with its
+default XSendFileUnescape On) decode it, and a legacy non-ASCII file name would
+otherwise go out MIME-encoded and not be found.
+
+With media in an S3-compatible bucket (api.storage.S3Storage) the backend is
+ignored: authorized requests are redirected to a short-lived presigned URL.
+
+Photos of active listings are public: search results list them even for
+locked viewers. Photos of inactive listings are only served to their owner and
+staff. Content-addressed originals never change under a given name, so they
+are cached as immutable; anything else is revalidated daily.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse,
+)
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from api.images import VARIANTS_DIR, variant_original_name
+from api.models import PropertyImage
+from api.storage import is_content_addressed, property_image_storage
+
+
+SERVE_BACKEND = getattr(settings, "MEDIA_SERVE_BACKEND", "python" if settings.DEBUG else "x-accel-redirect")
+ACCEL_REDIRECT_PREFIX = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _original_name(name):
+    if name.startswith(VARIANTS_DIR + "/"):
+        return variant_original_name(name)
+    return name if name.startswith("property_images/") else None
+
+
+def access(user, name):
+    """"public", "private" or None (not found / not allowed) for a media file name."""
+    original = _original_name(name)
+    if original is None:
+        return None
+    listings = list(
+        PropertyImage.objects.filter(image=original).values_list(
+            "seller_profile__has_active_listing", "seller_profile__user_id"
+        )
+    )
+    if any(active for active, _ in listings):
+        return "public"
+    if listings and user.is_authenticated and (user.is_staff or any(owner == user.pk for _, owner in listings)):
+        return "private"
+    return None
+
+
+def _etag(name, stat):
+    if is_content_addressed(name):
+        return '"%s"' % os.path.splitext(os.path.basename(name))[0]
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single-range header, None to send everything, or False if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # malformed or multiple ranges: ignored, as RFC 9110 allows
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _python_response(request, name, path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404
+    etag = _etag(name, stat)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    byte_range = None
+    if "Range" in request.headers and request.headers.get("If-Range", etag) == etag:
+        byte_range = _byte_range(request.headers["Range"], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = end - start + 1
+    else:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    name = os.path.normpath(path).replace(os.sep, "/")
+    if name.startswith(("../", "/")) or name == "..":
+        raise Http404
+    visibility = access(request.user, name)
+    if visibility is None:
+        raise Http404
+
+    storage = property_image_storage()
+    if hasattr(storage, "presigned_url"):
+        # Object storage: the bucket serves the bytes; only the redirect is cached, and not past its expiry
+        response = HttpResponseRedirect(storage.presigned_url(name))
+        patch_cache_control(response, max_age=storage.presigned_url_expiry // 2, **{visibility: True})
+        return response
+    if SERVE_BACKEND == "x-accel-redirect":
+        response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or "application/octet-stream")
+        response["X-Accel-Redirect"] = quote(ACCEL_REDIRECT_PREFIX + name)
+    elif SERVE_BACKEND == "x-sendfile":
+        response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or "application/octet-stream")
+        response["X-Sendfile"] = quote(storage.path(name))
+    else:
+        response = _python_response(request, name, storage.path(name))
+
+    if visibility == "public" and is_content_addressed(name):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, max_age=MUTABLE_MAX_AGE, **{visibility: True})
+    return response
@@ -0,0 +1,59 @@
+"""
+Cleanup of media files nothing references any more.
+
+Deleting a PropertyImage (directly, or through its listing or account) queues
+its files for deletion once the transaction commits. Legacy uploads are removed
+then; content-addressed blobs may be shared, so they are only released and
+left for gc_image_blobs, which waits out a grace period for in-flight uploads.
+
+The gc_media command is the backstop: it walks the media storage and deletes
+any file older than the grace period that no PropertyImage row, live ImageBlob
+or recorded variant refers to (crashed uploads, files from before these hooks).
+"""
+import posixpath
+
+from django.db import transaction
+
+from api.images import delete_variant_files
+from api.models import ImageBlob, PropertyImage
+from api.storage import is_content_addressed, property_image_storage
+
+
+def _delete_unreferenced(name, variants):
+    if PropertyImage.objects.filter(image=name).exists():
+        return
+    property_image_storage().delete(name)
+    delete_variant_files(variants)
+
+
+def image_deleted(instance):
+    name = instance.image.name
+    if not name or is_content_addressed(name):
+        return
+    variants = instance.variants or {}
+    transaction.on_commit(lambda: _delete_unreferenced(name, variants))
+
+
+def walk(storage, directory=""):
+    """Yield every file name under `directory`, one directory listing at a time."""
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name) if directory else name
+    for sub in directories:
+        yield from walk(storage, posixpath.join(directory, sub) if directory else sub)
+
+
+def referenced_variant_files():
+    """Every variant file recorded on an image row, streamed from the database."""
+    referenced = set()
+    for variants in PropertyImage.objects.exclude(variants={}).values_list("variants", flat=True).iterator(chunk_size=2000):
+        for variant in variants.values():
+            referenced.update(variant["files"].values())
+    return referenced
+
+
+def referenced_names(names):
+    """Which of `names` are an image row's file or have a blob row (gc_image_blobs owns those)."""
+    return set(PropertyImage.objects.filter(image__in=names).values_list("image", flat=True)) | set(
+        ImageBlob.objects.filter(name__in=names).values_list("name", flat=True)
+    )
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_sellerprofile_client_status'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='buyerrealtorconnection',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AlterField(
+            model_name='buyerrealtorconnection',
+            name='realtor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buyer_connections', to='api.realtorprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='buyerrealtorconnection',
+            index=models.Index(fields=['realtor', 'status', 'created_at'], name='buyer_realt_realtor_840bcd_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_buyerrealtorconnection_realtor_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientPipelineStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('NEW', 'New'), ('CONTACTED', 'Contacted'), ('OFFER_SUBMITTED', 'Offer Submitted'), ('OFFER_REJECTED', 'Offer Rejected'), ('OFFER_ACCEPTED', 'Offer Accepted'), ('CLOSED', 'Closed')], default='CONTACTED', max_length=20)),
+                ('contacted_seller', models.BooleanField(default=True)),
+                ('put_in_offer', models.BooleanField(default=False)),
+                ('offer_date', models.DateField(blank=True, null=True)),
+                ('seller_accepted_offer', models.BooleanField(default=False)),
+                ('accepted_date', models.DateField(blank=True, null=True)),
+                ('seller_rejected_offer', models.BooleanField(default=False)),
+                ('rejected_date', models.DateField(blank=True, null=True)),
+                ('property_closed', models.BooleanField(default=False)),
+                ('closing_date', models.DateField(blank=True, null=True)),
+                ('closing_comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('realtor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='client_pipeline', to='api.realtorprofile')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pipeline_stages', to='api.sellerprofile')),
+            ],
+            options={
+                'db_table': 'client_pipeline_stages',
+                'indexes': [models.Index(fields=['realtor', 'stage'], name='client_pipe_realtor_2a4e22_idx')],
+                'unique_together': {('seller', 'realtor')},
+            },
+        ),
+    ]
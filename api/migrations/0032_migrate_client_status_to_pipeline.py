@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:19
+
+from django.db import migrations
+from django.utils.dateparse import parse_date
+
+
+BOOLEAN_FIELDS = {
+    'contactedSeller': 'contacted_seller',
+    'putInOffer': 'put_in_offer',
+    'sellerAcceptedOffer': 'seller_accepted_offer',
+    'sellerRejectedOffer': 'seller_rejected_offer',
+    'propertyClosed': 'property_closed',
+}
+
+DATE_FIELDS = {
+    'offerDate': 'offer_date',
+    'acceptedDate': 'accepted_date',
+    'rejectedDate': 'rejected_date',
+    'closingDate': 'closing_date',
+}
+
+
+def _stage(row):
+    # Mirrors ClientPipelineStage.compute_stage (historical models have no methods)
+    if row['property_closed']:
+        return 'CLOSED'
+    if row['seller_accepted_offer']:
+        return 'OFFER_ACCEPTED'
+    if row['seller_rejected_offer']:
+        return 'OFFER_REJECTED'
+    if row['put_in_offer']:
+        return 'OFFER_SUBMITTED'
+    if row['contacted_seller']:
+        return 'CONTACTED'
+    return 'NEW'
+
+
+def _safe_date(value):
+    try:
+        return parse_date(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def forwards(apps, schema_editor):
+    SellerProfile = apps.get_model('api', 'SellerProfile')
+    ClientPipelineStage = apps.get_model('api', 'ClientPipelineStage')
+
+    rows = []
+    sellers = SellerProfile.objects.filter(assigned_realtor__isnull=False).only('id', 'assigned_realtor_id', 'client_status')
+    for seller in sellers.iterator(chunk_size=500):
+        status = seller.client_status if isinstance(seller.client_status, dict) else {}
+        properties = status.get('properties') or [{}]
+        saved = properties[0] if isinstance(properties[0], dict) else {}
+
+        row = {field: bool(saved.get(key, key == 'contactedSeller')) for key, field in BOOLEAN_FIELDS.items()}
+        row.update({field: _safe_date(saved.get(key)) for key, field in DATE_FIELDS.items()})
+        row['closing_comment'] = saved.get('closingComment') or ""
+        row['stage'] = _stage(row)
+
+        rows.append(ClientPipelineStage(seller_id=seller.id, realtor_id=seller.assigned_realtor_id, **row))
+
+    ClientPipelineStage.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+def backwards(apps, schema_editor):
+    SellerProfile = apps.get_model('api', 'SellerProfile')
+    ClientPipelineStage = apps.get_model('api', 'ClientPipelineStage')
+
+    for pipeline in ClientPipelineStage.objects.iterator(chunk_size=500):
+        saved = {key: getattr(pipeline, field) for key, field in BOOLEAN_FIELDS.items()}
+        saved.update({
+            key: getattr(pipeline, field).isoformat() if getattr(pipeline, field) else ""
+            for key, field in DATE_FIELDS.items()
+        })
+        saved['closingComment'] = pipeline.closing_comment
+        SellerProfile.objects.filter(pk=pipeline.seller_id).update(client_status={'properties': [saved]})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_clientpipelinestage'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
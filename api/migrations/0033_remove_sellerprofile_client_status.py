@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_migrate_client_status_to_pipeline'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sellerprofile',
+            name='client_status',
+        ),
+    ]
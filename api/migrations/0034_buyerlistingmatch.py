@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_remove_sellerprofile_client_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuyerListingMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listing_matches', to='api.buyerprofile')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buyer_matches', to='api.sellerprofile')),
+            ],
+            options={
+                'db_table': 'buyer_listing_matches',
+                'indexes': [models.Index(fields=['buyer', 'created_at'], name='buyer_listi_buyer_i_f3eb46_idx')],
+                'unique_together': {('buyer', 'listing')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_buyerlistingmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buyerprofile',
+            name='budget_max',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='buyerprofile',
+            name='budget_min',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='buyerprofile',
+            index=models.Index(fields=['budget_min', 'budget_max'], name='buyer_profi_budget__6b7a1a_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_buyerprofile_budget_bounds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Normalized PropertyFilter query parameters')),
+                ('location_key', models.CharField(blank=True, max_length=255)),
+                ('property_type', models.CharField(blank=True, max_length=50)),
+                ('price_min', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('price_max', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_notified_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to='api.buyerprofile')),
+            ],
+            options={
+                'db_table': 'saved_searches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchHit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_search_hits', to='api.sellerprofile')),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hits', to='api.savedsearch')),
+            ],
+            options={
+                'db_table': 'saved_search_hits',
+                'indexes': [models.Index(fields=['notified_at', 'saved_search'], name='saved_searc_notifie_c1363c_idx')],
+                'unique_together': {('saved_search', 'listing')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['is_active', 'property_type'], name='saved_searc_is_acti_11c890_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['price_min', 'price_max'], name='saved_searc_price_m_d51aab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['location_key'], name='saved_searc_locatio_493920_idx'),
+        ),
+    ]
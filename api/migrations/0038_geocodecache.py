@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0037_sellerprofile_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerprofile',
+            name='geocoded_at',
+            field=models.DateTimeField(blank=True, help_text='Null while the address is waiting to be geocoded', null=True),
+        ),
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address_key', models.CharField(max_length=512, unique=True)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'geocode_cache',
+                'indexes': [models.Index(fields=['resolved_at'], name='geocode_cac_resolve_184277_idx')],
+            },
+        ),
+    ]
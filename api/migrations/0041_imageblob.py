@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:43
+
+import api.storage
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0040_propertyimage_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(storage=api.storage.property_image_storage, upload_to='property_images/'),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Last time ref_count changed')),
+            ],
+            options={
+                'db_table': 'image_blobs',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='image_blobs_ref_cou_203800_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:47
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0041_imageblob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=api.storage.property_image_storage, upload_to='property_images/'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:30
+
+from django.db import migrations
+from django.db.models import F
+
+
+def forwards(apps, schema_editor):
+    SellerProfile = apps.get_model('api', 'SellerProfile')
+    ClientPipelineStage = apps.get_model('api', 'ClientPipelineStage')
+
+    # Sellers assigned outside the clients page (admin, data fixes) have no row and
+    # would not be listed. New rows start where RealtorClientsView.post starts them.
+    sellers = SellerProfile.objects.filter(assigned_realtor__isnull=False).exclude(
+        pipeline_stages__realtor_id=F('assigned_realtor_id')
+    ).values_list('id', 'assigned_realtor_id')
+    rows = [
+        ClientPipelineStage(seller_id=seller_id, realtor_id=realtor_id, contacted_seller=True, stage='CONTACTED')
+        for seller_id, realtor_id in sellers.iterator(chunk_size=500)
+    ]
+    ClientPipelineStage.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0043_propertyimage_placeholder'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
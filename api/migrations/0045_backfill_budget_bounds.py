@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:40
+
+from django.db import migrations
+
+
+def _parse_budget_range(value):
+    # Mirrors api.matching.parse_budget_range, so this migration doesn't change with it
+    if not value:
+        return None, None
+    value = value.replace(",", "").replace("$", "").strip()
+    try:
+        if value.endswith("+"):
+            return int(value[:-1]), None
+        low, high = value.split("-", 1)
+        return int(low), int(high)
+    except ValueError:
+        return None, None
+
+
+def forwards(apps, schema_editor):
+    BuyerProfile = apps.get_model('api', 'BuyerProfile')
+
+    batch = []
+    buyers = BuyerProfile.objects.exclude(budget_range='').only('id', 'budget_range', 'budget_min', 'budget_max')
+    for buyer in buyers.iterator(chunk_size=1000):
+        bounds = _parse_budget_range(buyer.budget_range)
+        if (buyer.budget_min, buyer.budget_max) == bounds:
+            continue
+        buyer.budget_min, buyer.budget_max = bounds
+        batch.append(buyer)
+        if len(batch) >= 1000:
+            BuyerProfile.objects.bulk_update(batch, ['budget_min', 'budget_max'])
+            batch = []
+    if batch:
+        BuyerProfile.objects.bulk_update(batch, ['budget_min', 'budget_max'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0044_backfill_client_pipeline_stages'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
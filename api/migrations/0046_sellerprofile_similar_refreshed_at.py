@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0045_backfill_budget_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellerprofile',
+            name='similar_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='Null while its similar-listing neighbours are waiting to be refreshed', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0046_sellerprofile_similar_refreshed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buyerprofile',
+            name='matches_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='Null while its listing matches are waiting to be refreshed', null=True),
+        ),
+        migrations.AddField(
+            model_name='sellerprofile',
+            name='matches_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='Null while its buyer matches are waiting to be refreshed', null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:30
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def forwards(apps, schema_editor):
+    SellerProfile = apps.get_model('api', 'SellerProfile')
+    # Existing listings were already checked when they were saved; left NULL, the
+    # first send_saved_search_digests would announce every one of them again
+    SellerProfile.objects.update(saved_searches_checked_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0047_matches_refreshed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='savedsearch',
+            name='saved_searc_locatio_493920_idx',
+        ),
+        migrations.AddField(
+            model_name='sellerprofile',
+            name='saved_searches_checked_at',
+            field=models.DateTimeField(blank=True, help_text='Null while it is waiting to be checked against saved searches', null=True),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
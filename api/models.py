@@ -1,6 +1,12 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+from api.storage import property_image_storage
 
 class BuyerProfile(models.Model):
     class BudgetRange(models.TextChoices):
@@ -14,6 +20,12 @@ class BuyerProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="buyer_profile")
     preferred_location = models.CharField(max_length=255, blank=True, help_text="City, State for property search")
     budget_range = models.CharField(max_length=100, blank=True, choices=BudgetRange.choices)
+    # Numeric bounds parsed from budget_range on save; budget_max is null for open-ended ranges
+    budget_min = models.PositiveIntegerField(null=True, blank=True)
+    budget_max = models.PositiveIntegerField(null=True, blank=True)
+    matches_refreshed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Null while its listing matches are waiting to be refreshed"
+    )
     
     # Subscription/Membership fields
     is_membership_active = models.BooleanField(default=False)
@@ -35,10 +47,29 @@ class BuyerProfile(models.Model):
 
     class Meta:
         db_table = "buyer_profiles"
+        indexes = [
+            models.Index(fields=["budget_min", "budget_max"]),
+        ]
         
     def __str__(self):
         return f"{self.user.email} - Buyer"
 
+    def sync_budget_bounds(self):
+        from api.matching import parse_budget_range
+        self.budget_min, self.budget_max = parse_budget_range(self.budget_range)
+
+    def save(self, *args, **kwargs):
+        from api.gazetteer import normalize_preferred_location
+        update_fields = kwargs.get('update_fields')
+        # Only what is written is normalized, so the instance never disagrees with its row
+        if update_fields is None or 'preferred_location' in update_fields:
+            self.preferred_location = normalize_preferred_location(self.preferred_location)
+        if update_fields is None or 'budget_range' in update_fields:
+            self.sync_budget_bounds()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'budget_min', 'budget_max'}
+        super().save(*args, **kwargs)
+
 
 class SellerProfile(models.Model):
     class PropertyType(models.TextChoices):
@@ -56,6 +87,18 @@ class SellerProfile(models.Model):
     state = models.CharField(max_length=100, blank=True)
     zip_code = models.CharField(max_length=20, blank=True)
     county = models.CharField(max_length=100, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geocoded_at = models.DateTimeField(null=True, blank=True, help_text="Null while the address is waiting to be geocoded")
+    similar_refreshed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Null while its similar-listing neighbours are waiting to be refreshed"
+    )
+    matches_refreshed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Null while its buyer matches are waiting to be refreshed"
+    )
+    saved_searches_checked_at = models.DateTimeField(
+        null=True, blank=True, help_text="Null while it is waiting to be checked against saved searches"
+    )
     
     property_type = models.CharField(max_length=50, blank=True, choices=PropertyType.choices)
     property_description = models.TextField(blank=True)
@@ -73,17 +116,31 @@ class SellerProfile(models.Model):
     leaseback_required = models.BooleanField(default=False)
     
     assigned_realtor = models.ForeignKey("RealtorProfile", on_delete=models.SET_NULL, null=True, blank=True, related_name="assigned_sellers")
-    client_status = models.JSONField(default=dict, blank=True, help_text="Tracks realtor's progress with this seller/client")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "seller_profiles"
+        indexes = [
+            # Bounding-box and radius searches range-scan latitude, then filter longitude
+            models.Index(fields=["latitude", "longitude"]),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - Seller"
 
+    def save(self, *args, **kwargs):
+        from api.gazetteer import normalize_city_state
+        update_fields = kwargs.get('update_fields')
+        # As BuyerProfile.save(): only what is written is normalized
+        city, state = normalize_city_state(self.city, self.state)
+        if update_fields is None or 'city' in update_fields:
+            self.city = city
+        if update_fields is None or 'state' in update_fields:
+            self.state = state
+        super().save(*args, **kwargs)
+
 
 class RealtorProfile(models.Model):
     class ExperienceLevel(models.TextChoices):
@@ -145,12 +202,63 @@ class PartnerProfile(models.Model):
 
 class PropertyImage(models.Model):
     seller_profile = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='property_images/')
+    image = models.ImageField(upload_to='property_images/', storage=property_image_storage, db_index=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in by the process_images worker (see api.images)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True, help_text="Resized copies: {name: {width, height, files: {format: storage name}}}")
+    processed_at = models.DateTimeField(null=True, blank=True, help_text="Null while variants are waiting to be generated")
+    placeholder = models.TextField(blank=True, help_text="Tiny blurred WebP data URI shown while the image loads")
+    dominant_color = models.CharField(max_length=7, blank=True, help_text="#rrggbb")
+
     class Meta:
         db_table = 'property_images'
+        indexes = [
+            models.Index(fields=["processed_at"]),
+        ]
+
+
+class ImageBlob(models.Model):
+    """One stored image file and how many PropertyImage rows point at it."""
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now, help_text="Last time ref_count changed")
+
+    class Meta:
+        db_table = "image_blobs"
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"]),
+        ]
+
+    @classmethod
+    def touch(cls, name):
+        """
+        Make sure `name` is tracked and restart its GC grace period, before a row references it.
+        Returns True if the row had to be created: gc_image_blobs may have deleted it (and
+        the file) since the file was stored, so the caller must check the file is still there.
+        """
+        # update() first: it waits for a gc_image_blobs lock, then matches nothing if the blob was collected
+        if cls.objects.filter(name=name).update(updated_at=timezone.now()):
+            return False
+        return cls.objects.get_or_create(name=name)[1]
+
+    @classmethod
+    def retain(cls, name):
+        """Count one more reference to `name`. Returns True if the row had to be created, as touch()."""
+        if cls.objects.filter(name=name).update(ref_count=F("ref_count") + 1, updated_at=timezone.now()):
+            return False
+        blob, created = cls.objects.get_or_create(name=name, defaults={"ref_count": 1})
+        if not created:
+            cls.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1, updated_at=timezone.now())
+        return created
+
+    @classmethod
+    def release(cls, name):
+        cls.objects.filter(name=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1, updated_at=timezone.now())
 
 
 class BuyerRealtorConnection(models.Model):
@@ -169,11 +277,173 @@ class BuyerRealtorConnection(models.Model):
         db_table = "buyer_realtor_connections"
         unique_together = ('buyer', 'realtor')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["realtor", "status", "created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.buyer} -> {self.realtor} ({self.status})"
 
 
+class ClientPipelineStage(models.Model):
+    """
+    A realtor's progress with one seller/client, one row per (seller, realtor).
+    `stage` is derived from the flags on save so the clients page can filter in SQL.
+    """
+    class Stage(models.TextChoices):
+        NEW = 'NEW', 'New'
+        CONTACTED = 'CONTACTED', 'Contacted'
+        OFFER_SUBMITTED = 'OFFER_SUBMITTED', 'Offer Submitted'
+        OFFER_REJECTED = 'OFFER_REJECTED', 'Offer Rejected'
+        OFFER_ACCEPTED = 'OFFER_ACCEPTED', 'Offer Accepted'
+        CLOSED = 'CLOSED', 'Closed'
+
+    seller = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='pipeline_stages')
+    realtor = models.ForeignKey(RealtorProfile, on_delete=models.CASCADE, related_name='client_pipeline')
+    stage = models.CharField(max_length=20, choices=Stage.choices, default=Stage.CONTACTED)
+
+    contacted_seller = models.BooleanField(default=True)
+    put_in_offer = models.BooleanField(default=False)
+    offer_date = models.DateField(null=True, blank=True)
+    seller_accepted_offer = models.BooleanField(default=False)
+    accepted_date = models.DateField(null=True, blank=True)
+    seller_rejected_offer = models.BooleanField(default=False)
+    rejected_date = models.DateField(null=True, blank=True)
+    property_closed = models.BooleanField(default=False)
+    closing_date = models.DateField(null=True, blank=True)
+    closing_comment = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "client_pipeline_stages"
+        unique_together = ('seller', 'realtor')
+        indexes = [
+            models.Index(fields=["realtor", "stage"]),
+        ]
+
+    def __str__(self):
+        return f"{self.seller} <- {self.realtor} ({self.stage})"
+
+    def compute_stage(self):
+        if self.property_closed:
+            return self.Stage.CLOSED
+        if self.seller_accepted_offer:
+            return self.Stage.OFFER_ACCEPTED
+        if self.seller_rejected_offer:
+            return self.Stage.OFFER_REJECTED
+        if self.put_in_offer:
+            return self.Stage.OFFER_SUBMITTED
+        if self.contacted_seller:
+            return self.Stage.CONTACTED
+        return self.Stage.NEW
+
+    def save(self, *args, **kwargs):
+        self.stage = self.compute_stage()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'stage', 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+class BuyerListingMatch(models.Model):
+    """
+    Precomputed buyer -> listing match, maintained by api.matching.
+    """
+    buyer = models.ForeignKey(BuyerProfile, on_delete=models.CASCADE, related_name='listing_matches')
+    listing = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='buyer_matches')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "buyer_listing_matches"
+        unique_together = ('buyer', 'listing')
+        indexes = [
+            models.Index(fields=["buyer", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.buyer} ~ {self.listing}"
+
+
+class SimilarListing(models.Model):
+    """
+    Precomputed nearest-neighbour list entry, maintained by api.similar.
+    """
+    listing = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='similar_listings')
+    similar = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='similar_to')
+    rank = models.PositiveSmallIntegerField()
+    distance = models.FloatField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "similar_listings"
+        unique_together = ('listing', 'similar')
+        indexes = [
+            models.Index(fields=["listing", "rank"]),
+        ]
+
+
+class SavedSearch(models.Model):
+    """
+    A buyer's saved PropertyFilter query. The bucket columns (location, type,
+    price bounds) are derived from `params` on save so a changed listing only
+    has to evaluate the searches that could possibly match it.
+    """
+    buyer = models.ForeignKey(BuyerProfile, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True)
+    params = models.JSONField(default=dict, blank=True, help_text="Normalized PropertyFilter query parameters")
+
+    location_key = models.CharField(max_length=255, blank=True)
+    property_type = models.CharField(max_length=50, blank=True)
+    price_min = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    price_max = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    is_active = models.BooleanField(default=True)
+    last_notified_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "saved_searches"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["is_active", "property_type"]),
+            models.Index(fields=["price_min", "price_max"]),
+        ]
+
+    def __str__(self):
+        return f"{self.buyer} - {self.name or self.params}"
+
+    def save(self, *args, **kwargs):
+        params = self.params or {}
+        self.location_key = (params.get('location') or "").strip().lower()
+        self.property_type = (params.get('type') or "").strip().upper()
+        self.price_min = params.get('price_min') or None
+        self.price_max = params.get('price_max') or None
+        super().save(*args, **kwargs)
+
+
+class SavedSearchHit(models.Model):
+    """
+    A listing that newly matched a saved search, waiting for the next digest.
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='hits')
+    listing = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='saved_search_hits')
+    notified_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "saved_search_hits"
+        unique_together = ('saved_search', 'listing')
+        indexes = [
+            models.Index(fields=["notified_at", "saved_search"]),
+        ]
+
+    def __str__(self):
+        return f"{self.saved_search} -> {self.listing}"
+
+
 class AccessPassType(models.Model):
     name = models.CharField(max_length=50) # e.g. "Basic", "Pro"
     slug = models.SlugField(unique=True) # e.g. "basic", "pro"
@@ -249,3 +519,23 @@ class PropertyView(models.Model):
         ]
 
 
+class GeocodeCache(models.Model):
+    """Geocoder results keyed by normalized address; a null latitude caches a miss."""
+    address_key = models.CharField(max_length=512, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    resolved_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "geocode_cache"
+        indexes = [
+            models.Index(fields=["resolved_at"]),
+        ]
+
+    def __str__(self):
+        return self.address_key
+
+    @property
+    def is_fresh(self):
+        days = settings.GEOCODE_CACHE_TTL_DAYS if self.latitude is not None else settings.GEOCODE_CACHE_MISS_TTL_DAYS
+        return self.resolved_at > timezone.now() - timedelta(days=days)
@@ -0,0 +1,28 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RealtorRequestsCursorPagination(CursorPagination):
+    """
+    Keyset pagination for a realtor's request inbox, newest first.
+    Walks the (realtor, status, created_at) index instead of OFFSET scans.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = '-created_at'
+
+
+class RealtorClientsCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the realtor clients page, most recently updated first.
+    Honours ?ordering= when the view uses OrderingFilter.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = '-updated_at'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # stage repeats and updated_at moves on edit, so break ties by pk or pages skip/repeat rows
+        return (*ordering, '-pk' if ordering[0].startswith('-') else 'pk')
@@ -0,0 +1,137 @@
+"""
+Routing of public read traffic to a read replica.
+
+Reads go to the primary unless a view opts in with @replica_reads (or
+method_decorator(replica_reads, name="get") on a class-based view) and a
+"replica" database is configured. Even then the primary is used:
+
+- for the rest of a request once it has written anything (or asked for a
+  write connection, e.g. select_for_update()), and inside atomic blocks;
+- for REPLICA_STICKY_SECONDS after a write, for the client that made it
+  (ReplicaPinningMiddleware sets a short-lived cookie), so people see their
+  own changes even if the replica lags;
+- for everyone for REPLICA_STICKY_SECONDS after a change that invalidates the
+  search cache (hold_replica_reads()), so a lagging replica can't repopulate
+  the cache with stale pages.
+
+State lives in context variables, so it is per request for both sync and async
+views.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+REPLICA_PIN_COOKIE = "db_primary"
+REPLICA_HOLD_KEY = "replica-hold"
+
+_replica_allowed = ContextVar("replica_allowed", default=False)
+_pinned = ContextVar("replica_pinned", default=False)
+_wrote = ContextVar("replica_wrote", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def hold_replica_reads():
+    """Send every replica read to the primary until the replica has caught up with a change just made."""
+    if replica_configured():
+        cache.set(REPLICA_HOLD_KEY, True, REPLICA_STICKY_SECONDS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_allowed.get()
+            and not _pinned.get()
+            and replica_configured()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        _wrote.set(True)
+        # Explicit, or Django would write an instance back to the replica it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+def _enter(request):
+    return _pinned.set(REPLICA_PIN_COOKIE in request.COOKIES), _wrote.set(False)
+
+
+def _exit(tokens, response):
+    if response is not None and _wrote.get():
+        response.set_cookie(REPLICA_PIN_COOKIE, "1", max_age=REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax")
+    _pinned.reset(tokens[0])
+    _wrote.reset(tokens[1])
+
+
+class ReplicaPinningMiddleware:
+    """Keeps a client on the primary for REPLICA_STICKY_SECONDS after any request of theirs wrote."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens, response = _enter(request), None
+        try:
+            response = self.get_response(request)
+        finally:
+            _exit(tokens, response)
+        return response
+
+    async def __acall__(self, request):
+        tokens, response = _enter(request), None
+        try:
+            response = await self.get_response(request)
+        finally:
+            _exit(tokens, response)
+        return response
+
+
+def _allow_replica():
+    return _replica_allowed.set(replica_configured() and not cache.get(REPLICA_HOLD_KEY))
+
+
+def replica_reads(view):
+    """Let `view` (sync or async) read from the replica, subject to the rules above."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            token = _allow_replica()
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _replica_allowed.reset(token)
+    else:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = _allow_replica()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _replica_allowed.reset(token)
+    return wrapper
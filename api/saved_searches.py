@@ -0,0 +1,119 @@
+"""
+Saved searches and incremental new-listing alerts.
+
+Instead of buyers re-running their searches, a listing that becomes active or
+changes is evaluated against the saved searches that could match it. The
+bucket columns on SavedSearch (type, price bounds, location) narrow the
+candidates in SQL; the stored PropertyFilter params then decide exactly, and
+each new match is recorded as a SavedSearchHit for the next digest email.
+
+Saving a listing only marks it pending (saved_searches_checked_at = NULL);
+send_saved_search_digests checks pending listings in batches, running each
+candidate search once per batch, before it sends the digests.
+"""
+from itertools import groupby
+
+from django.db.models import CharField, F, Q, Value
+from django.utils import timezone
+
+from api.filters import PropertyFilter
+from api.models import SavedSearch, SavedSearchHit, SellerProfile
+
+
+SEARCH_PARAMS = tuple(PropertyFilter.base_filters)
+
+
+def candidate_searches(listing):
+    """Active saved searches whose type, price and location buckets admit the listing."""
+    qs = SavedSearch.objects.filter(is_active=True).filter(
+        Q(property_type="") | Q(property_type=(listing.property_type or "").upper())
+    )
+
+    price = listing.estimated_value
+    if price is None:
+        qs = qs.filter(price_min__isnull=True, price_max__isnull=True)
+    else:
+        qs = qs.filter(Q(price_min__isnull=True) | Q(price_min__lte=price)).filter(
+            Q(price_max__isnull=True) | Q(price_max__gte=price)
+        )
+
+    # PropertyFilter.location is "city/state/zip contains the term", so compare the
+    # listing's values against each stored term rather than the other way round.
+    qs = qs.alias(
+        listing_city=Value(listing.city or "", output_field=CharField()),
+        listing_state=Value(listing.state or "", output_field=CharField()),
+        listing_zip=Value(listing.zip_code or "", output_field=CharField()),
+    ).filter(
+        Q(location_key="")
+        | Q(listing_city__icontains=F('location_key'))
+        | Q(listing_state__icontains=F('location_key'))
+        | Q(listing_zip__icontains=F('location_key'))
+    )
+    return qs
+
+
+def search_matches(saved_search, listing_ids):
+    """Ids among `listing_ids` that the saved PropertyFilter matches, in one query."""
+    queryset = SellerProfile.objects.filter(pk__in=listing_ids, has_active_listing=True)
+    filterset = PropertyFilter(saved_search.params, queryset=queryset)
+    if not filterset.is_valid():
+        return []
+    return list(filterset.qs.values_list('pk', flat=True))
+
+
+def mark_pending(listing):
+    """Queue `listing` to be checked against saved searches."""
+    SellerProfile.objects.filter(pk=listing.pk).update(saved_searches_checked_at=None)
+
+
+def claim_pending(limit):
+    """Up to `limit` pending active listings, marked checked first so a change made meanwhile queues them again."""
+    listings = list(
+        SellerProfile.objects.filter(has_active_listing=True, saved_searches_checked_at__isnull=True)
+        .only('id', 'city', 'state', 'zip_code', 'property_type', 'estimated_value', 'has_active_listing')
+        .order_by('id')[:limit]
+    )
+    SellerProfile.objects.filter(pk__in=[listing.pk for listing in listings]).update(
+        saved_searches_checked_at=timezone.now()
+    )
+    return listings
+
+
+def record_hits(listings):
+    """Record a hit for every saved search each listing now matches. Returns new hit count."""
+    # A search that is a candidate for several listings runs once, against all of them
+    candidates = {}
+    for listing in listings:
+        if not listing.has_active_listing:
+            continue
+        for saved_search in candidate_searches(listing).only('id', 'params'):
+            candidates.setdefault(saved_search.id, (saved_search, []))[1].append(listing.id)
+
+    hits = [
+        SavedSearchHit(saved_search_id=saved_search.id, listing_id=listing_id)
+        for saved_search, listing_ids in candidates.values()
+        for listing_id in search_matches(saved_search, listing_ids)
+    ]
+    # ignore_conflicts: a listing edited again is not re-announced to the same search
+    created = SavedSearchHit.objects.bulk_create(hits, ignore_conflicts=True)
+    return len(created)
+
+
+def pending_digests():
+    """
+    Yield (buyer, [hits]) for every buyer with un-notified hits, grouped so each
+    buyer gets a single digest however many searches matched.
+    """
+    hits = SavedSearchHit.objects.filter(
+        notified_at__isnull=True, saved_search__is_active=True
+    ).select_related('saved_search__buyer__user', 'listing').order_by('saved_search__buyer_id', 'created_at')
+
+    for _, buyer_hits in groupby(hits.iterator(chunk_size=500), key=lambda hit: hit.saved_search.buyer_id):
+        buyer_hits = list(buyer_hits)
+        yield buyer_hits[0].saved_search.buyer, buyer_hits
+
+
+def mark_notified(hits):
+    now = timezone.now()
+    SavedSearchHit.objects.filter(pk__in=[hit.pk for hit in hits]).update(notified_at=now)
+    SavedSearch.objects.filter(pk__in={hit.saved_search_id for hit in hits}).update(last_notified_at=now)
@@ -0,0 +1,87 @@
+"""
+Result cache for the public property search.
+
+Cached pages are keyed on the canonical filter/pagination/ordering/fields
+parameters plus a listing version counter. Any committed change to an active
+listing or its images bumps the counter, so every cached page is invalidated
+at once without having to know which searches it appeared in.
+
+Viewers are split into namespaces by what the serializer would show them:
+"locked" (anonymous, buyers without an access pass, partners) and "unlocked"
+(realtors, staff, buyers with an active pass). Sellers bypass the cache because
+their own listing is unlocked for them and locked for everyone else.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from api.filters import normalize_property_params
+from api.replicas import hold_replica_reads
+from api.sparse_fields import requested_fields
+from core.models import User
+
+
+SEARCH_CACHE_TTL = getattr(settings, "PROPERTY_SEARCH_CACHE_TTL", 300)
+LISTING_VERSION_KEY = "listing-version"
+DEFAULT_ORDERING = "-created_at"
+
+
+def viewer_has_full_access(user):
+    """True when every listing is unlocked for this viewer (ownership aside)."""
+    if not user or not user.is_authenticated:
+        return False
+    if user.role == User.UserRole.REALTOR or user.is_staff:
+        return True
+    if user.role == User.UserRole.BUYER:
+        profile = getattr(user, "buyer_profile", None)
+        return bool(profile and profile.access_pass_expiry and profile.access_pass_expiry > timezone.now())
+    return False
+
+
+def viewer_namespace(user):
+    if viewer_has_full_access(user):
+        return "unlocked"
+    if user and user.is_authenticated and user.role == User.UserRole.SELLER:
+        return None
+    return "locked"
+
+
+def listing_version():
+    version = cache.get(LISTING_VERSION_KEY)
+    if version is None:
+        # Start from the clock, not 1, so a cache eviction can never revive old keys
+        cache.add(LISTING_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(LISTING_VERSION_KEY)
+    return version
+
+
+def bump_listing_version():
+    # Otherwise a lagging replica could fill the new version's pages with the old data
+    hold_replica_reads()
+    try:
+        cache.incr(LISTING_VERSION_KEY)
+    except ValueError:
+        cache.set(LISTING_VERSION_KEY, time.time_ns(), None)
+
+
+def search_cache_key(request):
+    """Cache key for this search request, or None if the viewer must bypass the cache."""
+    namespace = viewer_namespace(request.user)
+    if namespace is None:
+        return None
+
+    params = request.query_params
+    canonical = normalize_property_params(params)
+    canonical["ordering"] = params.get("ordering", "").strip() or DEFAULT_ORDERING
+    canonical["limit"] = params.get("limit", "").strip()
+    canonical["offset"] = params.get("offset", "").strip() or "0"
+    canonical["fields"] = ",".join(sorted(requested_fields(request) or []))
+    # Pagination links are absolute, so the host is part of the page
+    canonical["host"] = request.get_host()
+
+    digest = hashlib.md5(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+    return f"property-search:{namespace}:{listing_version()}:{digest}"
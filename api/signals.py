@@ -0,0 +1,149 @@
+"""
+Model signal handlers that keep derived data in sync with listings and buyers.
+Heavy work is deferred with transaction.on_commit so it only runs for
+committed changes and never inside the request's own transaction.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from api import geocoding, matching, media_gc, saved_searches, search_cache, similar, suggest
+from api.models import BuyerProfile, ClientPipelineStage, ImageBlob, PropertyImage, SellerProfile
+from api.storage import is_content_addressed
+from core.models import User
+
+
+LISTING_MATCH_FIELDS = {"city", "state", "estimated_value", "has_active_listing"}
+LISTING_SEARCH_FIELDS = {
+    "city", "state", "zip_code", "street_address", "property_description",
+    "property_type", "estimated_value", "bedrooms", "bathrooms", "has_active_listing",
+}
+LISTING_SIMILARITY_FIELDS = {
+    "estimated_value", "bedrooms", "bathrooms", "sqft", "property_type", "state", "has_active_listing",
+}
+LISTING_TRACKED_FIELDS = (
+    LISTING_MATCH_FIELDS | LISTING_SEARCH_FIELDS | LISTING_SIMILARITY_FIELDS | geocoding.ADDRESS_FIELDS
+    | {"assigned_realtor_id"}
+)
+BUYER_MATCH_FIELDS = {"preferred_location", "budget_range"}
+# Shown in search results as seller_info, so cached pages embed them
+SELLER_CONTACT_FIELDS = {"first_name", "last_name", "email", "phone_number"}
+
+
+def _snapshot(instance, fields):
+    # Read from __dict__ so deferred fields are not fetched just to take a snapshot
+    return {field: instance.__dict__.get(field) for field in fields}
+
+
+def _changed_fields(instance, fields, created, update_fields):
+    """Which of `fields` changed since the instance was loaded or last saved."""
+    if created:
+        return set(fields)
+    candidates = set(fields) if update_fields is None else set(fields) & set(update_fields)
+    previous = getattr(instance, "_tracked_snapshot", {})
+    return {field for field in candidates if previous.get(field) != instance.__dict__.get(field)}
+
+
+def _location(values):
+    return values.get("city"), values.get("state"), values.get("zip_code")
+
+
+@receiver(post_init, sender=SellerProfile)
+def remember_listing_fields(sender, instance, **kwargs):
+    instance._tracked_snapshot = _snapshot(instance, LISTING_TRACKED_FIELDS)
+
+
+@receiver(post_init, sender=BuyerProfile)
+def remember_buyer_fields(sender, instance, **kwargs):
+    instance._tracked_snapshot = _snapshot(instance, BUYER_MATCH_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_contact_fields(sender, instance, **kwargs):
+    instance._tracked_snapshot = _snapshot(instance, SELLER_CONTACT_FIELDS)
+
+
+@receiver(post_save, sender=SellerProfile)
+def listing_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = {} if created else getattr(instance, "_tracked_snapshot", {})
+    was_active = previous.get("has_active_listing")
+    changed = _changed_fields(instance, LISTING_TRACKED_FIELDS, created, update_fields)
+    instance._tracked_snapshot = _snapshot(instance, LISTING_TRACKED_FIELDS)
+
+    old_location = _location(previous) if was_active else None
+    new_location = _location(instance.__dict__) if instance.has_active_listing else None
+    if old_location != new_location:
+        transaction.on_commit(lambda: suggest.listing_location_changed(old_location, new_location))
+
+    # Any change to a listing that is or was public can alter cached search pages
+    if instance.has_active_listing or was_active:
+        transaction.on_commit(search_cache.bump_listing_version)
+    if changed & geocoding.ADDRESS_FIELDS:
+        transaction.on_commit(lambda: geocoding.apply_cached_coordinates(instance))
+    if changed & LISTING_MATCH_FIELDS:
+        transaction.on_commit(lambda: matching.mark_listing_pending(instance))
+    if instance.has_active_listing and changed & LISTING_SEARCH_FIELDS:
+        transaction.on_commit(lambda: saved_searches.mark_pending(instance))
+    if changed & LISTING_SIMILARITY_FIELDS:
+        transaction.on_commit(lambda: similar.mark_pending(instance))
+
+    realtor_id = instance.assigned_realtor_id
+    if realtor_id and previous.get("assigned_realtor_id") != realtor_id:
+        # However the seller was assigned (admin included), the clients page lists pipeline rows
+        ClientPipelineStage.objects.get_or_create(seller=instance, realtor_id=realtor_id)
+
+
+@receiver(post_delete, sender=SellerProfile)
+def listing_deleted(sender, instance, **kwargs):
+    if instance.has_active_listing:
+        transaction.on_commit(search_cache.bump_listing_version)
+        location = _location(instance.__dict__)
+        transaction.on_commit(lambda: suggest.listing_location_changed(location, None))
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def listing_image_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(search_cache.bump_listing_version)
+
+
+@receiver(post_save, sender=PropertyImage)
+def image_blob_retained(sender, instance, created, raw=False, **kwargs):
+    # Counted in the same transaction as the row, so the count never drifts
+    if created and not raw and is_content_addressed(instance.image.name):
+        ImageBlob.retain(instance.image.name)
+
+
+@receiver(post_delete, sender=PropertyImage)
+def image_blob_released(sender, instance, **kwargs):
+    if is_content_addressed(instance.image.name):
+        ImageBlob.release(instance.image.name)
+    media_gc.image_deleted(instance)
+
+
+@receiver(post_save, sender=BuyerProfile)
+def buyer_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    changed = _changed_fields(instance, BUYER_MATCH_FIELDS, created, update_fields)
+    instance._tracked_snapshot = _snapshot(instance, BUYER_MATCH_FIELDS)
+
+    if changed:
+        transaction.on_commit(lambda: matching.mark_buyer_pending(instance))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    changed = _changed_fields(instance, SELLER_CONTACT_FIELDS, created, update_fields)
+    # Only what was written is now in the database (login saves only last_login)
+    saved = SELLER_CONTACT_FIELDS if update_fields is None else SELLER_CONTACT_FIELDS & set(update_fields)
+    instance._tracked_snapshot.update(_snapshot(instance, saved))
+
+    if changed and SellerProfile.objects.filter(user=instance, has_active_listing=True).exists():
+        transaction.on_commit(search_cache.bump_listing_version)
@@ -0,0 +1,199 @@
+"""
+"Similar listings" recommendations.
+
+Active listings are turned into feature vectors (log price, beds, baths,
+log sqft, property type, state, position on the globe), standardized so each
+numeric feature has unit variance. The K nearest neighbours by Euclidean
+distance are computed with NumPy in row chunks, so memory stays bounded at
+chunk_size x N, and stored in SimilarListing.
+
+refresh_all() rebuilds every list (the compute_similar_listings command).
+refresh_listing() handles a single changed listing: it rebuilds that
+listing's own list plus only the lists it enters or leaves, found by
+comparing its distance to every listing with their current K-th distance.
+
+Saving a listing only marks it pending (similar_refreshed_at = NULL);
+`compute_similar_listings --pending` refreshes pending listings off the
+request path, and falls back to a full rebuild when many are pending.
+"""
+import math
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from api.models import SellerProfile, SimilarListing
+
+
+K = getattr(settings, "SIMILAR_LISTINGS_K", 10)
+
+FEATURE_FIELDS = (
+    "id", "estimated_value", "bedrooms", "bathrooms", "sqft",
+    "property_type", "state", "latitude", "longitude",
+)
+TYPE_WEIGHT = 1.0
+STATE_WEIGHT = 2.0
+# Distance on the ground that counts as much as one standard deviation of a numeric feature
+LOCATION_SCALE_KM = 50.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def load_vectors():
+    """(ids, matrix) for every active listing, one float32 row per listing."""
+    rows = list(
+        SellerProfile.objects.filter(has_active_listing=True).order_by("id").values_list(*FEATURE_FIELDS)
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    numeric = np.array(
+        [
+            [
+                math.log1p(float(row[1] or 0)),
+                float(row[2] or 0),
+                float(row[3] or 0),
+                math.log1p(float(row[4] or 0)),
+            ]
+            for row in rows
+        ],
+        dtype=np.float64,
+    )
+    std = numeric.std(axis=0)
+    numeric = (numeric - numeric.mean(axis=0)) / np.where(std > 0, std, 1)
+
+    blocks = [numeric]
+    for index, weight in ((5, TYPE_WEIGHT), (6, STATE_WEIGHT)):
+        values = [(row[index] or "").upper() for row in rows]
+        categories = {value: i for i, value in enumerate(sorted(set(values)))}
+        one_hot = np.zeros((len(rows), len(categories)))
+        one_hot[np.arange(len(rows)), [categories[value] for value in values]] = weight
+        blocks.append(one_hot)
+
+    blocks.append(_location_block(rows))
+    return ids, np.hstack(blocks).astype(np.float32)
+
+
+def _location_block(rows):
+    """
+    Unit-sphere xyz scaled so LOCATION_SCALE_KM apart is a distance of 1.
+    Listings not geocoded yet take the mean position of their state (or of all listings).
+    """
+    lat = np.array([row[7] if row[7] is not None else np.nan for row in rows], dtype=np.float64)
+    lon = np.array([row[8] if row[8] is not None else np.nan for row in rows], dtype=np.float64)
+    lat, lon = np.radians(lat), np.radians(lon)
+    xyz = np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+    missing = np.isnan(xyz).any(axis=1)
+    if missing.all():
+        return np.zeros((len(rows), 3))
+    if missing.any():
+        states = np.array([(row[6] or "").upper() for row in rows])
+        overall = xyz[~missing].mean(axis=0)
+        for state in set(states[missing]):
+            known = (states == state) & ~missing
+            xyz[(states == state) & missing] = xyz[known].mean(axis=0) if known.any() else overall
+    return xyz * (EARTH_RADIUS_KM / LOCATION_SCALE_KM)
+
+
+def _squared_distances(queries, matrix):
+    """Squared Euclidean distance from each query row to every matrix row."""
+    distances = (
+        (queries ** 2).sum(axis=1)[:, None] + (matrix ** 2).sum(axis=1)[None, :] - 2 * queries @ matrix.T
+    )
+    return np.maximum(distances, 0)
+
+
+def _nearest(rows, matrix, k):
+    """(indices, distances) of the k nearest other listings for each row index in `rows`."""
+    distances = _squared_distances(matrix[rows], matrix)
+    distances[np.arange(len(rows)), rows] = np.inf  # a listing is not similar to itself
+    k = min(k, matrix.shape[0] - 1)
+    if k <= 0:
+        return np.empty((len(rows), 0), dtype=np.int64), np.empty((len(rows), 0))
+    nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+    order = np.argsort(nearest_distances, axis=1)
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    return nearest, np.sqrt(np.take_along_axis(nearest_distances, order, axis=1))
+
+
+def _store(listing_ids, ids, nearest, distances):
+    SimilarListing.objects.filter(listing_id__in=listing_ids).delete()
+    SimilarListing.objects.bulk_create(
+        [
+            SimilarListing(listing_id=listing_id, similar_id=int(ids[j]), rank=rank, distance=float(distance))
+            for listing_id, row, row_distances in zip(listing_ids, nearest, distances)
+            for rank, (j, distance) in enumerate(zip(row, row_distances), start=1)
+        ],
+        batch_size=1000,
+    )
+
+
+def _refresh_rows(rows, ids, matrix, k, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        nearest, distances = _nearest(chunk, matrix, k)
+        _store(ids[chunk].tolist(), ids, nearest, distances)
+
+
+def refresh_all(k=K, chunk_size=256):
+    """Recompute every active listing's neighbour list. Returns the number of listings."""
+    # Claimed before reading, like claim_pending()
+    SellerProfile.objects.update(similar_refreshed_at=timezone.now())
+    ids, matrix = load_vectors()
+    with transaction.atomic():
+        SimilarListing.objects.exclude(listing__has_active_listing=True).delete()
+        _refresh_rows(np.arange(len(ids)), ids, matrix, k, chunk_size)
+    return len(ids)
+
+
+def mark_pending(listing):
+    """Queue `listing` for compute_similar_listings --pending."""
+    SellerProfile.objects.filter(pk=listing.pk).update(similar_refreshed_at=None)
+
+
+def claim_pending(limit):
+    """Up to `limit` pending listings, marked refreshed first so a change made meanwhile queues them again."""
+    listings = list(SellerProfile.objects.filter(similar_refreshed_at__isnull=True).only("id", "has_active_listing")[:limit])
+    SellerProfile.objects.filter(pk__in=[listing.pk for listing in listings]).update(similar_refreshed_at=timezone.now())
+    return listings
+
+
+@transaction.atomic
+def refresh_listing(listing, k=K, chunk_size=256, vectors=None):
+    """
+    Update neighbour lists after one listing changed. Returns the number of lists rewritten.
+    `vectors` is load_vectors()'s result, to share one load across a batch of listings.
+    Lists that don't exist yet are left to refresh_all().
+    """
+    # Lists that currently include the listing may lose it or reorder
+    affected = set(SimilarListing.objects.filter(similar_id=listing.id).values_list("listing_id", flat=True))
+    if not listing.has_active_listing and not affected:
+        # Was never indexed, so no list mentions it
+        SimilarListing.objects.filter(listing_id=listing.id).delete()
+        return 0
+
+    ids, matrix = vectors if vectors is not None else load_vectors()
+    index = {listing_id: row for row, listing_id in enumerate(ids.tolist())}
+    if listing.id not in index:
+        SimilarListing.objects.filter(listing_id=listing.id).delete()
+    else:
+        affected.add(listing.id)
+        # Lists that are short, or whose K-th neighbour is farther away than this listing now is, gain it
+        full_size = min(k, len(ids) - 1)
+        lists = {
+            row["listing_id"]: row
+            for row in SimilarListing.objects.values("listing_id").annotate(size=Count("id"), kth=Max("distance")).order_by()
+        }
+        distances = np.sqrt(_squared_distances(matrix[[index[listing.id]]], matrix)[0])
+        for other_id, distance in zip(ids.tolist(), distances.tolist()):
+            current = lists.get(other_id)
+            if current is not None and (current["size"] < full_size or distance < current["kth"]):
+                affected.add(other_id)
+
+    rows = np.array(sorted(index[listing_id] for listing_id in affected if listing_id in index), dtype=np.int64)
+    _refresh_rows(rows, ids, matrix, k, chunk_size)
+    return len(rows)
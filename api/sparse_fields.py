@@ -0,0 +1,101 @@
+"""
+Sparse fieldsets: ?fields=id,title,price on read endpoints.
+
+SparseFieldsetMixin drops unrequested fields from a serializer's
+representation. project_queryset() narrows the matching queryset to the
+columns those fields read (only()), and joins or prefetches relations only
+when a requested field needs them.
+
+A serializer maps each field to the model paths it reads in
+Meta.field_sources. Fields not listed there read their own `source`;
+method fields must be listed, and an unlisted one turns projection off so the
+full row is loaded as before.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+FIELDS_PARAM = "fields"
+
+
+def requested_fields(request):
+    """Field names from ?fields=, or None when every field should be returned."""
+    if request is None or request.method != "GET":
+        return None
+    value = request.query_params.get(FIELDS_PARAM, "")
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    return names or None
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin that keeps only the fields named in the request's ?fields=."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields is None:
+            return
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({FIELDS_PARAM: [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+    @classmethod
+    def model_paths(cls, fields):
+        """The model paths needed to serialize `fields`, or None if a method field isn't mapped."""
+        declared = getattr(cls.Meta, "field_sources", {})
+        all_fields = cls().fields
+        paths = set()
+        for name in fields:
+            if name in declared:
+                paths.update(declared[name])
+                continue
+            field = all_fields.get(name)
+            if field is None or field.source == "*":
+                return None  # unknown names are rejected by the serializer itself
+            paths.add(field.source.replace(".", "__"))
+        return paths
+
+
+def project_queryset(queryset, serializer_class, request):
+    """
+    Narrow `queryset` to what ?fields= needs. Existing select_related() and
+    prefetch_related() calls are replaced by the ones the fields require.
+    """
+    fields = requested_fields(request)
+    if fields is None:
+        return queryset
+    paths = serializer_class.model_paths(fields)
+    if paths is None:
+        return queryset
+
+    opts = queryset.model._meta
+    columns, joins, prefetches = {opts.pk.name}, set(), set()
+    for path in paths:
+        relation, _, rest = path.partition("__")
+        try:
+            field = opts.get_field(relation)
+        except FieldDoesNotExist:
+            return queryset  # a computed attribute; load full rows
+        if field.one_to_many or field.many_to_many:
+            prefetches.add(relation)
+        elif rest:
+            joins.add(relation)
+            columns.update((relation, path))
+        else:
+            columns.add(path)
+
+    queryset = queryset.select_related(None).prefetch_related(None).only(*columns)
+    if joins:
+        queryset = queryset.select_related(*joins)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
+
+
+class ProjectedQuerysetMixin:
+    """List view mixin applying project_queryset() after the view's filters."""
+
+    def filter_queryset(self, queryset):
+        return project_queryset(super().filter_queryset(queryset), self.get_serializer_class(), self.request)
@@ -0,0 +1,427 @@
+"""
+Content-addressed storage for uploaded property images.
+
+Each upload is hashed (SHA-256) while it is streamed to a temporary file, then
+moved to <upload dir>/<first two hex digits>/<digest><ext>. A file with the
+same digest already on disk is simply reused, so re-uploading a photo costs no
+space and every copy shares one set of derivatives (see api.images).
+
+Which PropertyImage rows use a blob is reference-counted in ImageBlob by the
+signal handlers; the gc_image_blobs command deletes blobs nobody references.
+
+Media can live in MEDIA_ROOT or in any S3-compatible bucket, chosen through
+settings.STORAGES (see MEDIA_STORAGE in settings). Both content-addressed
+backends also accept direct uploads (api.direct_uploads): the browser PUTs the
+bytes to a presigned URL carrying the expected SHA-256, so the store itself
+rejects content that doesn't match its name and app servers never see the
+bytes. A single PUT lands in a staging key of its own and is moved into place
+when the upload is completed, so completing one proves the uploader had the
+bytes even if that content is already stored. Files above MULTIPART_THRESHOLD
+are uploaded in MULTIPART_PART_SIZE parts, and their digest is S3's composite
+checksum: the SHA-256 of the concatenated part digests. ContentAddressedStorage
+is the filesystem stand-in, whose "presigned" URLs point at a local view that
+performs the same checks.
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.urls import reverse
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+DIGEST_NAME_RE = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}\.[\w]+$")
+MULTIPART_THRESHOLD = getattr(settings, "MEDIA_MULTIPART_THRESHOLD", 8 * 1024 * 1024)
+# S3 requires every part but the last to be at least 5 MB
+MULTIPART_PART_SIZE = getattr(settings, "MEDIA_MULTIPART_PART_SIZE", 5 * 1024 * 1024)
+# Lifetime of presigned upload/download URLs, in seconds
+PRESIGNED_URL_EXPIRY = getattr(settings, "MEDIA_PRESIGNED_URL_EXPIRY", 60 * 60)
+LOCAL_UPLOAD_SALT = "api.storage.local-upload"
+CHUNK_SIZE = 64 * 1024
+
+
+def is_content_addressed(name):
+    return bool(DIGEST_NAME_RE.search(name or ""))
+
+
+def content_addressed_name(directory, hexdigest, ext):
+    return "/".join(part for part in [directory, hexdigest[:2], hexdigest + ext.lower()] if part)
+
+
+def composite_digest(part_digests):
+    """Hex digest of a multipart object from its parts' raw SHA-256 digests."""
+    return hashlib.sha256(b"".join(part_digests)).hexdigest()
+
+
+def part_sizes(size):
+    full, last = divmod(size, MULTIPART_PART_SIZE)
+    return [MULTIPART_PART_SIZE] * full + ([last] if last else [])
+
+
+def checksum_header(digest):
+    """Raw digest -> the base64 value S3 expects in x-amz-checksum-sha256."""
+    return base64.b64encode(digest).decode("ascii")
+
+
+class ContentDigest:
+    """
+    Running SHA-256 of a file in the form its name uses: the plain digest up to
+    MULTIPART_THRESHOLD bytes, the composite part digest above it.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.whole = hashlib.sha256()
+        self.parts = []
+        self.part = hashlib.sha256()
+        self.part_length = 0
+
+    def update(self, data):
+        self.size += len(data)
+        self.whole.update(data)
+        view = memoryview(data)
+        while view:
+            take = min(len(view), MULTIPART_PART_SIZE - self.part_length)
+            self.part.update(view[:take])
+            self.part_length += take
+            view = view[take:]
+            if self.part_length == MULTIPART_PART_SIZE:
+                self.parts.append(self.part.digest())
+                self.part, self.part_length = hashlib.sha256(), 0
+
+    def hexdigest(self):
+        if self.size <= MULTIPART_THRESHOLD:
+            return self.whole.hexdigest()
+        return composite_digest(self.parts + ([self.part.digest()] if self.part_length else []))
+
+
+def _spool(content, destination):
+    """Copy `content` into the open file `destination`, returning its ContentDigest."""
+    digest = ContentDigest()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+        destination.write(chunk)
+    return digest
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Equal names mean equal content, so an existing file is never "taken"
+        return name
+
+    def _save(self, name, content):
+        directory, ext = os.path.dirname(name), os.path.splitext(name)[1]
+        with tempfile.NamedTemporaryFile(dir=self._staging(), delete=False) as tmp:
+            digest = _spool(content, tmp)
+        final_name = content_addressed_name(directory, digest.hexdigest(), ext)
+        self._move_into_place(tmp.name, final_name)
+        return final_name
+
+    def _staging(self, *parts):
+        staging = self.path(os.path.join(".staging", *parts))
+        os.makedirs(staging, exist_ok=True)
+        return staging
+
+    def _move_into_place(self, tmp_path, name):
+        path = self.path(name)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Same filesystem, so the blob appears atomically and complete
+        os.replace(tmp_path, path)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+
+    # Direct uploads, mimicking S3 presigned PUTs (see LocalUploadView)
+
+    def _upload_url(self, **target):
+        token = signing.dumps(target, salt=LOCAL_UPLOAD_SALT)
+        return reverse("local-direct-upload", args=[token])
+
+    def direct_upload(self, name, size, content_type, checksums):
+        upload_id = uuid.uuid4().hex
+        if len(checksums) == 1:
+            return {
+                "method": "PUT",
+                "upload_id": upload_id,
+                "url": self._upload_url(name=name, size=size, checksum=checksums[0], upload_id=upload_id),
+                "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksums[0]},
+            }
+        parts = [
+            {
+                "number": number,
+                "url": self._upload_url(name=name, size=length, checksum=checksum, upload_id=upload_id, number=number),
+                "headers": {"x-amz-checksum-sha256": checksum},
+            }
+            for number, (length, checksum) in enumerate(zip(part_sizes(size), checksums), 1)
+        ]
+        return {"method": "PUT", "upload_id": upload_id, "parts": parts}
+
+    def receive_direct_upload(self, token, stream, content_length):
+        """
+        Store the body of a PUT to a URL from direct_upload(). Returns the ETag, or
+        raises ValueError for an invalid/expired URL, a Content-Length other than the
+        signed size, or a mismatched checksum. Reads at most the signed size, as S3
+        refuses a body longer than the ContentLength its URL was signed for.
+        """
+        try:
+            target = signing.loads(token, salt=LOCAL_UPLOAD_SALT, max_age=PRESIGNED_URL_EXPIRY)
+        except signing.BadSignature:
+            raise ValueError("Upload URL is invalid or has expired.")
+        if "size" not in target or "upload_id" not in target:
+            raise ValueError("Upload URL is invalid or has expired.")
+        if str(content_length) != str(target["size"]):
+            raise ValueError(f"Content-Length must be {target['size']}, the size the upload was signed for.")
+        digest, remaining = hashlib.sha256(), target["size"]
+        with tempfile.NamedTemporaryFile(dir=self._staging(), delete=False) as tmp:
+            while remaining:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                digest.update(chunk)
+                tmp.write(chunk)
+        if remaining:
+            os.unlink(tmp.name)
+            raise ValueError("The body is shorter than its Content-Length.")
+        if checksum_header(digest.digest()) != target["checksum"]:
+            os.unlink(tmp.name)
+            raise ValueError("Content does not match the x-amz-checksum-sha256 the upload was signed for.")
+        if "number" in target:
+            os.replace(tmp.name, os.path.join(self._staging(target["upload_id"]), str(target["number"])))
+        else:
+            os.replace(tmp.name, os.path.join(self._staging(), target["upload_id"]))
+        return '"%s"' % digest.hexdigest()
+
+    def complete_direct_put(self, name, upload_id):
+        """Move a single PUT from its staging file into place (its checksum was verified on receipt)."""
+        staged = os.path.join(self._staging(), upload_id)
+        if not os.path.isfile(staged):
+            raise ValueError("The file has not been uploaded.")
+        self._move_into_place(staged, name)
+
+    def complete_direct_upload(self, name, upload_id, parts):
+        directory = self._staging(upload_id)
+        digest = ContentDigest()
+        try:
+            with tempfile.NamedTemporaryFile(dir=self._staging(), delete=False) as tmp:
+                for part in sorted(parts, key=lambda part: part["number"]):
+                    with open(os.path.join(directory, str(part["number"])), "rb") as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                            digest.update(chunk)
+                            tmp.write(chunk)
+        except FileNotFoundError:
+            os.unlink(tmp.name)
+            raise ValueError("Not every part was uploaded.")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        if digest.hexdigest() != os.path.splitext(os.path.basename(name))[0]:
+            os.unlink(tmp.name)
+            raise ValueError("Uploaded parts do not match the expected content.")
+        self._move_into_place(tmp.name, name)
+
+    def abort_direct_upload(self, name, upload_id):
+        shutil.rmtree(self.path(os.path.join(".staging", upload_id)), ignore_errors=True)
+
+
+@deconstructible
+class S3Storage(Storage):
+    """
+    Any S3-compatible bucket (AWS, MinIO, R2, ...). Requires boto3.
+
+    With `base_url` set (a public bucket or CDN in front of it), urls point
+    straight at it. Otherwise they go through MEDIA_URL, where api.media
+    authorizes the request and redirects to a short-lived presigned URL.
+    """
+
+    def __init__(self, bucket_name=None, endpoint_url=None, region_name=None, access_key=None,
+                 secret_key=None, location="", base_url=None, presigned_url_expiry=PRESIGNED_URL_EXPIRY):
+        self.bucket_name = bucket_name
+        self.endpoint_url = endpoint_url
+        self.region_name = region_name
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.location = location.strip("/")
+        self.base_url = base_url
+        self.presigned_url_expiry = presigned_url_expiry
+
+    @cached_property
+    def client(self):
+        # Imported here so boto3 is only needed where this backend is configured
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            region_name=self.region_name,
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            config=Config(signature_version="s3v4"),
+        )
+
+    def _key(self, name):
+        return f"{self.location}/{name}" if self.location else name
+
+    def _head(self, name):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _open(self, name, mode="rb"):
+        # Only the image worker and management commands read whole files
+        f = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+        if self._head(name) is None:
+            raise FileNotFoundError(name)
+        self.client.download_fileobj(self.bucket_name, self._key(name), f)
+        f.seek(0)
+        return File(f, name=name)
+
+    def _upload(self, fileobj, name):
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.client.upload_fileobj(fileobj, self.bucket_name, self._key(name), ExtraArgs={"ContentType": content_type})
+
+    def _save(self, name, content):
+        if hasattr(content, "seek"):
+            content.seek(0)
+        self._upload(content, name)
+        return name
+
+    def exists(self, name):
+        return self._head(name) is not None
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket_name, Key=self._key(name))
+
+    def size(self, name):
+        head = self._head(name)
+        if head is None:
+            raise FileNotFoundError(name)
+        return head["ContentLength"]
+
+    def get_modified_time(self, name):
+        head = self._head(name)
+        if head is None:
+            raise FileNotFoundError(name)
+        return head["LastModified"]
+
+    def listdir(self, path):
+        prefix = self._key(path).rstrip("/") + "/" if path else (self.location + "/" if self.location else "")
+        directories, files = [], []
+        for page in self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"
+        ):
+            directories += [p["Prefix"][len(prefix):].rstrip("/") for p in page.get("CommonPrefixes", [])]
+            files += [obj["Key"][len(prefix):] for obj in page.get("Contents", [])]
+        return directories, files
+
+    def url(self, name):
+        if self.base_url:
+            return self.base_url.rstrip("/") + "/" + name
+        return settings.MEDIA_URL + name
+
+    def presigned_url(self, name):
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket_name, "Key": self._key(name)}, ExpiresIn=self.presigned_url_expiry
+        )
+
+
+class S3ContentAddressedStorage(S3Storage):
+    """Content-addressed names, as ContentAddressedStorage, in a bucket."""
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory, ext = os.path.dirname(name), os.path.splitext(name)[1]
+        with tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024) as tmp:
+            digest = _spool(content, tmp)
+            final_name = content_addressed_name(directory, digest.hexdigest(), ext)
+            if not self.exists(final_name):
+                tmp.seek(0)
+                self._upload(tmp, final_name)
+        return final_name
+
+    def direct_upload(self, name, size, content_type, checksums):
+        key = self._key(name)
+        if len(checksums) == 1:
+            # Content-Type and the checksum are signed: S3 refuses a body whose SHA-256 differs
+            upload_id = uuid.uuid4().hex
+            url = self.client.generate_presigned_url(
+                "put_object",
+                Params={"Bucket": self.bucket_name, "Key": self._key(self._staging_name(upload_id)),
+                        "ContentType": content_type, "ContentLength": size, "ChecksumSHA256": checksums[0]},
+                ExpiresIn=self.presigned_url_expiry,
+            )
+            return {"method": "PUT", "upload_id": upload_id, "url": url,
+                    "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksums[0]}}
+
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key, ContentType=content_type, ChecksumAlgorithm="SHA256"
+        )["UploadId"]
+        parts = []
+        for number, (length, checksum) in enumerate(zip(part_sizes(size), checksums), 1):
+            url = self.client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": self.bucket_name, "Key": key, "UploadId": upload_id, "PartNumber": number,
+                        "ContentLength": length, "ChecksumSHA256": checksum},
+                ExpiresIn=self.presigned_url_expiry,
+            )
+            parts.append({"number": number, "url": url, "headers": {"x-amz-checksum-sha256": checksum}})
+        return {"method": "PUT", "upload_id": upload_id, "parts": parts}
+
+    @staticmethod
+    def _staging_name(upload_id):
+        # PUTs that are never completed are swept by gc_media, as ContentAddressedStorage's are
+        return f".staging/{upload_id}"
+
+    def complete_direct_put(self, name, upload_id):
+        """Copy a single PUT from its staging key into place (S3 verified its checksum on upload)."""
+        staged = self._staging_name(upload_id)
+        if self._head(staged) is None:
+            raise ValueError("The file has not been uploaded.")
+        if not self.exists(name):
+            self.client.copy_object(
+                Bucket=self.bucket_name, Key=self._key(name), CopySource={"Bucket": self.bucket_name, "Key": self._key(staged)}
+            )
+        self.delete(staged)
+
+    def complete_direct_upload(self, name, upload_id, parts):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": part["number"], "ETag": part["etag"], "ChecksumSHA256": part["checksum"]}
+                    for part in sorted(parts, key=lambda part: part["number"])
+                ]},
+            )
+        except ClientError as e:
+            raise ValueError(e.response["Error"].get("Message", "Multipart upload could not be completed."))
+
+    def abort_direct_upload(self, name, upload_id):
+        self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id)
+
+
+def property_image_storage():
+    """Storage for PropertyImage.image, configured as STORAGES["property_images"]."""
+    return storages["property_images"]
@@ -0,0 +1,158 @@
+"""
+Location autocomplete for the property search box.
+
+Suggestions come from an in-memory prefix trie of the cities, states and zip
+codes of active listings, each with its listing count. The trie is built once
+per process, then kept current by the listing signal handlers, which apply
+each committed location change as a +1/-1 delta. Changes made by other
+processes are picked up by a full rebuild once the listing version (see
+api.search_cache) has moved and the trie is older than
+LOCATION_SUGGEST_MAX_AGE seconds. Answering a query never touches the database.
+"""
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.db.models import Count
+
+from api import search_cache
+from api.gazetteer import get_gazetteer
+from api.models import SellerProfile
+
+
+MAX_AGE = getattr(settings, "LOCATION_SUGGEST_MAX_AGE", 60)
+
+Term = namedtuple("Term", ["type", "label", "value"])
+
+
+class _Node:
+    __slots__ = ("children", "terms")
+
+    def __init__(self):
+        self.children = {}
+        self.terms = set()  # every term whose key passes through this node
+
+
+def location_terms(city, state, zip_code):
+    """The suggestion terms one listing contributes, each with its trie keys."""
+    city, state, zip_code = (city or "").strip(), (state or "").strip(), (zip_code or "").strip()
+    terms = []
+    if city:
+        label = f"{city}, {state}" if state else city
+        terms.append((Term("city", label, city), [label.lower()]))
+    if state:
+        name = get_gazetteer().states.get(state.upper(), state)
+        terms.append((Term("state", name, state), {name.lower(), state.lower()}))
+    if zip_code:
+        terms.append((Term("zip", zip_code, zip_code), [zip_code.lower()]))
+    return terms
+
+
+class LocationTrie:
+    def __init__(self):
+        self.root = _Node()
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def _insert(self, key, term):
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+            node.terms.add(term)
+
+    def _delete(self, key, term):
+        path, node = [], self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return
+            path.append((char, node))
+        for char, node in path:
+            node.terms.discard(term)
+        # Prune branches that no longer lead to any term
+        for index in range(len(path) - 1, -1, -1):
+            char, node = path[index]
+            if node.terms:
+                break
+            parent = path[index - 1][1] if index else self.root
+            del parent.children[char]
+
+    def add(self, city, state, zip_code, count=1):
+        with self.lock:
+            for term, keys in location_terms(city, state, zip_code):
+                if not self.counts[term]:
+                    for key in keys:
+                        self._insert(key, term)
+                self.counts[term] += count
+
+    def remove(self, city, state, zip_code, count=1):
+        with self.lock:
+            for term, keys in location_terms(city, state, zip_code):
+                if term not in self.counts:
+                    continue
+                self.counts[term] -= count
+                if self.counts[term] <= 0:
+                    del self.counts[term]
+                    for key in keys:
+                        self._delete(key, term)
+
+    def suggest(self, prefix, limit):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        with self.lock:
+            node = self.root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            ranked = sorted(node.terms, key=lambda term: (-self.counts[term], term.label))[:limit]
+            return [{**term._asdict(), "count": self.counts[term]} for term in ranked]
+
+
+_trie = None
+_built_version = None
+_built_at = 0.0
+_build_lock = threading.Lock()
+
+
+def _build():
+    trie = LocationTrie()
+    rows = (
+        SellerProfile.objects.filter(has_active_listing=True)
+        .values("city", "state", "zip_code")
+        .annotate(listings=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        trie.add(row["city"], row["state"], row["zip_code"], row["listings"])
+    return trie
+
+
+def _is_stale(version):
+    return _trie is None or (version != _built_version and time.monotonic() - _built_at > MAX_AGE)
+
+
+def get_trie():
+    global _trie, _built_version, _built_at
+    version = search_cache.listing_version()
+    if _is_stale(version):
+        with _build_lock:
+            if _is_stale(version):
+                _trie, _built_version, _built_at = _build(), version, time.monotonic()
+    return _trie
+
+
+def listing_location_changed(old, new):
+    """Apply one listing's committed change; old/new are (city, state, zip) of an active listing or None."""
+    if _trie is None or old == new:
+        return
+    if old:
+        _trie.remove(*old)
+    if new:
+        _trie.add(*new)
+
+
+def suggest_locations(prefix, limit=8):
+    return get_trie().suggest(prefix, limit)
@@ -1,3 +1,273 @@
-from django.test import TestCase
+import hashlib
+import io
+import shutil
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from api import media
+from api.direct_uploads import DirectUploadError, finish_upload, plan_upload
+from api.images import variants_dir
+from api.models import AccessPassType, PropertyImage, SellerProfile
+from api.replicas import (
+    REPLICA_ALIAS, REPLICA_HOLD_KEY, REPLICA_PIN_COOKIE, ReplicaPinningMiddleware, hold_replica_reads, replica_reads,
+)
+from api.storage import property_image_storage
+from api.uploads import attach_listing_images
+from core.models import User
+
+
+def read_view(request):
+    AccessPassType.objects.exists()
+    return HttpResponse()
+
+
+def write_view(request):
+    AccessPassType.objects.create(name="Basic", slug="basic")
+    return HttpResponse()
+
+
+def atomic_read_view(request):
+    with transaction.atomic():
+        AccessPassType.objects.exists()
+    return HttpResponse()
+
+
+def read_after_write_view(request):
+    AccessPassType.objects.filter(slug="basic").update(days_duration=30)
+    AccessPassType.objects.exists()
+    return HttpResponse()
+
+
+@skipUnless(REPLICA_ALIAS in settings.DATABASES, "run with --settings=otlhubs.test_settings")
+class ReplicaRoutingTests(TransactionTestCase):
+    # The test settings point "replica" at the test database (TEST MIRROR), so
+    # which alias a query went through shows where it was routed
+    databases = "__all__"
+
+    def setUp(self):
+        cache.delete(REPLICA_HOLD_KEY)
+        self.factory = RequestFactory()
+
+    def serve(self, view, cookies=None):
+        """Run `view` through ReplicaPinningMiddleware; returns the response and the aliases queried."""
+        request = self.factory.get("/")
+        request.COOKIES.update(cookies or {})
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = ReplicaPinningMiddleware(view)(request)
+        used = {alias for alias, queries in [(DEFAULT_DB_ALIAS, primary), (REPLICA_ALIAS, replica)] if queries}
+        return response, used
+
+    def test_opted_in_view_reads_from_replica(self):
+        _, used = self.serve(replica_reads(read_view))
+        self.assertEqual(used, {REPLICA_ALIAS})
+
+    def test_view_without_opt_in_reads_from_primary(self):
+        _, used = self.serve(read_view)
+        self.assertEqual(used, {DEFAULT_DB_ALIAS})
+
+    def test_pin_cookie_after_write_forces_primary(self):
+        response, _ = self.serve(write_view)
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        _, used = self.serve(replica_reads(read_view), cookies={REPLICA_PIN_COOKIE: response.cookies[REPLICA_PIN_COOKIE].value})
+        self.assertEqual(used, {DEFAULT_DB_ALIAS})
+
+    def test_read_only_request_sets_no_pin_cookie(self):
+        response, _ = self.serve(replica_reads(read_view))
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_hold_replica_reads_sends_reads_to_primary(self):
+        hold_replica_reads()
+        _, used = self.serve(replica_reads(read_view))
+        self.assertEqual(used, {DEFAULT_DB_ALIAS})
+
+    def test_atomic_block_reads_from_primary(self):
+        _, used = self.serve(replica_reads(atomic_read_view))
+        self.assertEqual(used, {DEFAULT_DB_ALIAS})
+
+    def test_reads_after_write_connection_stay_on_primary(self):
+        response, used = self.serve(replica_reads(read_after_write_view))
+        self.assertEqual(used, {DEFAULT_DB_ALIAS})
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+
+DIGEST = "ab" * 32
+ORIGINAL = f"property_images/ab/{DIGEST}.jpg"
+VARIANT = f"{variants_dir(ORIGINAL)}/card.webp"
+
+
+def create_user(email, **extra):
+    return User.objects.create_user(email, "password", first_name="Test", last_name="User", **extra)
+
+
+class MediaAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("owner@example.com", role="SELLER")
+        cls.staff = create_user("staff@example.com", is_staff=True)
+        cls.stranger = create_user("stranger@example.com", role="BUYER")
+        cls.listing = SellerProfile.objects.create(user=cls.owner, city="Austin", state="TX")
+        PropertyImage.objects.create(seller_profile=cls.listing, image=ORIGINAL)
+
+    def set_active(self, active):
+        SellerProfile.objects.filter(pk=self.listing.pk).update(has_active_listing=active)
+
+    def serve(self, user, name):
+        request = RequestFactory().get(f"/media/{name}")
+        request.user = user
+        return media.serve_media(request, name)
+
+    def test_active_listing_photos_are_public(self):
+        self.set_active(True)
+        for user in [AnonymousUser(), self.stranger, self.owner]:
+            self.assertEqual(media.access(user, ORIGINAL), "public")
+
+    def test_inactive_listing_photos_are_private_to_owner_and_staff(self):
+        self.assertEqual(media.access(self.owner, ORIGINAL), "private")
+        self.assertEqual(media.access(self.staff, ORIGINAL), "private")
+
+    def test_inactive_listing_photos_are_not_found_for_everyone_else(self):
+        for user in [AnonymousUser(), self.stranger]:
+            self.assertIsNone(media.access(user, ORIGINAL))
+            with self.assertRaises(Http404):
+                self.serve(user, ORIGINAL)
+
+    def test_variants_follow_their_original(self):
+        self.assertEqual(media.access(self.owner, VARIANT), "private")
+        self.assertIsNone(media.access(self.stranger, VARIANT))
+        self.set_active(True)
+        self.assertEqual(media.access(self.stranger, VARIANT), "public")
+
+    def test_unreferenced_and_other_files_are_not_found(self):
+        self.set_active(True)
+        self.assertIsNone(media.access(self.staff, f"property_images/cd/{'cd' * 32}.jpg"))
+        self.assertIsNone(media.access(self.staff, "documents/contract.pdf"))
+        with self.assertRaises(Http404):
+            self.serve(self.staff, "../secrets.txt")
+
+    @mock.patch.object(media, "SERVE_BACKEND", "x-accel-redirect")
+    def test_accel_redirect_name_is_url_quoted(self):
+        self.set_active(True)
+        PropertyImage.objects.create(seller_profile=self.listing, image="property_images/café.jpg")
+        response = self.serve(AnonymousUser(), "property_images/café.jpg")
+        self.assertEqual(response["X-Accel-Redirect"], media.ACCEL_REDIRECT_PREFIX + "property_images/caf%C3%A9.jpg")
+        self.assertNotIn("immutable", response["Cache-Control"])  # legacy names can be overwritten
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def upload_spec(data):
+    return {"content_type": "image/png", "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+class DirectUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user("seller@example.com", role="SELLER")
+        cls.listing = SellerProfile.objects.create(user=cls.seller)
+        cls.other_seller = create_user("other@example.com", role="SELLER")
+        cls.other_listing = SellerProfile.objects.create(user=cls.other_seller)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.storage = property_image_storage()
+        self.data = png_bytes((200, 30, 30))
+
+    def put(self, plan, body, **extra):
+        return self.client.put(plan["url"], body, content_type="image/png", **extra)
+
+    def upload(self, user, data):
+        """Plan, PUT and finish one upload; returns the stored name."""
+        plan = plan_upload(user, upload_spec(data))
+        self.assertEqual(self.put(plan, data).status_code, 200)
+        return finish_upload(user, plan["token"])
+
+    def test_upload_is_staged_until_finished_then_attached(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        self.assertFalse(plan["exists"])
+        response = self.put(plan, self.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"%s"' % hashlib.sha256(self.data).hexdigest())
+        self.assertFalse(self.storage.exists(plan["name"]))
+
+        self.assertEqual(finish_upload(self.seller, plan["token"]), plan["name"])
+        with self.storage.open(plan["name"]) as f:
+            self.assertEqual(f.read(), self.data)
+        [image] = attach_listing_images(self.listing, [plan["name"]])
+        self.assertEqual(image.image.name, plan["name"])
+
+    def test_finish_without_upload_fails(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        with self.assertRaises(DirectUploadError):
+            finish_upload(self.seller, plan["token"])
+
+    def test_content_stored_for_another_user_must_be_uploaded(self):
+        attach_listing_images(self.other_listing, [self.upload(self.other_seller, self.data)])
+
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        self.assertFalse(plan["exists"])
+        self.assertIn("url", plan)
+        with self.assertRaises(DirectUploadError):
+            finish_upload(self.seller, plan["token"])
+
+        self.assertEqual(self.put(plan, self.data).status_code, 200)
+        self.assertEqual(finish_upload(self.seller, plan["token"]), plan["name"])
+
+    def test_own_photo_skips_upload(self):
+        attach_listing_images(self.listing, [self.upload(self.seller, self.data)])
+
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        self.assertTrue(plan["exists"])
+        self.assertNotIn("url", plan)
+        self.assertEqual(finish_upload(self.seller, plan["token"]), plan["name"])
+
+    def test_token_is_bound_to_its_user(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        self.put(plan, self.data)
+        with self.assertRaises(DirectUploadError):
+            finish_upload(self.other_seller, plan["token"])
+
+    def test_local_put_rejects_a_content_length_other_than_the_signed_size(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        response = self.put(plan, self.data[:-1])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Content-Length", response.json()["error"])
+        with self.assertRaises(DirectUploadError):
+            finish_upload(self.seller, plan["token"])
+
+    def test_local_put_rejects_content_that_does_not_match_the_checksum(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        other = png_bytes((30, 200, 30))
+        self.assertEqual(len(other), len(self.data))
+        self.assertEqual(self.put(plan, other).status_code, 400)
+        with self.assertRaises(DirectUploadError):
+            finish_upload(self.seller, plan["token"])
+
+    def test_local_put_rejects_a_tampered_url(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        url = plan["url"].rstrip("/")
+        tampered = {"url": url[:-1] + ("A" if url[-1] != "A" else "B") + "/"}
+        self.assertEqual(self.put(tampered, self.data).status_code, 400)
+
+    def test_local_put_reads_no_more_than_the_signed_size(self):
+        plan = plan_upload(self.seller, upload_spec(self.data))
+        response = self.put(plan, self.data + b"x" * 1024, CONTENT_LENGTH=str(len(self.data)))
+        self.assertEqual(response.status_code, 200)
+        finish_upload(self.seller, plan["token"])
+        self.assertEqual(self.storage.size(plan["name"]), len(self.data))
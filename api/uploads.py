@@ -0,0 +1,133 @@
+"""
+Listing photo uploads.
+
+ImageUploadHandler streams each multipart file to a temporary file on disk,
+so a large phone photo never sits in worker memory. It feeds the first bytes
+to Pillow's incremental parser and rejects the upload as soon as the header
+shows an unsupported format or oversized dimensions, before the rest of the
+body is written anywhere.
+
+add_listing_images() then stores the files and inserts all rows with one
+bulk_create(), after re-checking the per-listing limit under a row lock on the
+listing so concurrent uploads can't exceed it. Files uploaded directly to
+storage (api.direct_uploads) are attached the same way.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import transaction
+from PIL import Image, ImageFile
+
+from api import search_cache
+from api.models import ImageBlob, PropertyImage, SellerProfile
+
+
+MAX_IMAGES_PER_LISTING = getattr(settings, "MAX_IMAGES_PER_LISTING", 6)
+MAX_IMAGE_UPLOAD_SIZE = getattr(settings, "MAX_IMAGE_UPLOAD_SIZE", 20 * 1024 * 1024)
+MAX_IMAGE_PIXELS = getattr(settings, "MAX_IMAGE_PIXELS", 50_000_000)
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+# Give up on identifying a file whose header isn't parsed after this many bytes
+HEADER_LIMIT = 512 * 1024
+IMAGE_UPLOAD_FIELD = "images"
+
+
+class ListingImageLimitError(ValueError):
+    pass
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Upload handler for IMAGE_UPLOAD_FIELD files. The first invalid file stops the
+    upload; the reasons are collected in `errors` for the view to report.
+    """
+
+    def __init__(self, request=None, max_files=MAX_IMAGES_PER_LISTING):
+        super().__init__(request)
+        self.max_files = max_files
+        self.files_seen = 0
+        self.errors = []
+
+    def _reject(self, message):
+        self.errors.append(f"{self.file_name}: {message}" if self.file_name else message)
+        # Nothing further is parsed or written; the rest of the body is discarded
+        raise StopUpload(connection_reset=False)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.files_seen += 1
+        if self.files_seen > self.max_files:
+            self._reject(f"at most {self.max_files} more image(s) can be added to this listing.")
+        self.parser = ImageFile.Parser()
+        self.size = 0
+        self.identified = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > MAX_IMAGE_UPLOAD_SIZE:
+            self._reject(f"larger than {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)} MB.")
+        if not self.identified:
+            self._check_header(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def _check_header(self, raw_data):
+        try:
+            self.parser.feed(raw_data)
+        except Image.DecompressionBombError:
+            self._reject("image dimensions are too large.")
+        except Exception:
+            self._reject("not a valid image.")
+        image = self.parser.image
+        if image is None:
+            if self.size > HEADER_LIMIT:
+                self._reject("not a supported image.")
+            return
+        if image.format not in ALLOWED_FORMATS:
+            self._reject(f"{image.format} images are not supported.")
+        width, height = image.size
+        if width * height > MAX_IMAGE_PIXELS:
+            self._reject(f"{width}x{height} is too large.")
+        self.identified = True
+        self.parser = None  # only the header was needed; don't decode the rest
+
+    def file_complete(self, file_size):
+        if not self.identified:
+            self._reject("not a supported image.")
+        return super().file_complete(file_size)
+
+
+def add_listing_images(listing, files):
+    """
+    Store `files` and attach them to `listing` in one transaction.
+    Raises ListingImageLimitError if that would exceed MAX_IMAGES_PER_LISTING.
+    """
+    field = PropertyImage._meta.get_field("image")
+    names = []
+    for f in files:
+        upload_name = field.generate_filename(None, f.name)
+        name = field.storage.save(upload_name, f)
+        # Tracked before it is referenced, so gc_image_blobs reclaims it if the insert below is refused
+        if ImageBlob.touch(name) and not field.storage.exists(name):
+            # save() reused a stored copy that gc_image_blobs deleted before the touch
+            field.storage.save(upload_name, f)
+        names.append(name)
+    return attach_listing_images(listing, names)
+
+
+def attach_listing_images(listing, names):
+    """
+    Add already-stored (and ImageBlob.touch()ed) files to `listing` in one
+    transaction. Raises ListingImageLimitError if that would exceed MAX_IMAGES_PER_LISTING.
+    """
+    with transaction.atomic():
+        SellerProfile.objects.select_for_update().only('id').get(pk=listing.pk)
+        existing = PropertyImage.objects.filter(seller_profile=listing).count()
+        if existing + len(names) > MAX_IMAGES_PER_LISTING:
+            raise ListingImageLimitError(f"Maximum {MAX_IMAGES_PER_LISTING} images allowed.")
+        # bulk_create() sends no signals, so count the references and refresh search here
+        images = PropertyImage.objects.bulk_create(
+            [PropertyImage(seller_profile=listing, image=name) for name in names]
+        )
+        for name in names:
+            ImageBlob.retain(name)
+        if listing.has_active_listing:
+            transaction.on_commit(search_cache.bump_listing_version)
+    return images
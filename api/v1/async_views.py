@@ -0,0 +1,184 @@
+"""
+Async versions of the endpoints that spend most of their time waiting on I/O:
+Stripe checkout creation and callbacks, property search and favorite status.
+
+Under ASGI a sync view holds a worker thread for as long as it waits on Stripe;
+these views await it instead (the stripe library's *_async methods, over
+HTTPX), so one process keeps serving other requests meanwhile. Database access
+uses Django's async ORM where the work is a query or two; larger sync
+pieces (signup completion, a search cache miss) run in a worker thread.
+
+DRF 3.14 has no async views, so each one borrows its sync counterpart
+(`api_view`) for authentication, permissions, throttling, error responses and
+any method it doesn't implement itself.
+"""
+import logging
+
+import stripe
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import Http404
+from django.shortcuts import redirect
+from django.views import View
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.models import AccessPassType, BuyerProfile
+from api.replicas import replica_reads
+from api.search_cache import search_cache_key
+from api.v1.payment import (
+    AccessPassSuccessView, CreateAccessPassSessionView, PaymentSuccessView, access_pass_session_kwargs,
+    apply_access_pass, complete_signup,
+)
+from api.v1.views import BuyerFavoriteToggleView, PropertySearchView
+from core.models import PendingSignup
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIView(View):
+    """
+    An async view that runs under the policies of the DRF view `api_view`
+    (instantiated per request as self.api). Handlers receive the DRF request
+    and may return a DRF Response.
+    """
+    api_view = APIView
+    read_from_replica = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # As for DRF views, SessionAuthentication enforces CSRF (for session users only)
+        view.csrf_exempt = True
+        return replica_reads(view) if cls.read_from_replica else view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.api = api = self.api_view(renderer_classes=[JSONRenderer])
+        api.args, api.kwargs = args, kwargs
+        api.request = api.initialize_request(request, *args, **kwargs)
+        api.headers = api.default_response_headers
+        handler = getattr(self, request.method.lower(), None)
+        try:
+            if iscoroutinefunction(handler):
+                await sync_to_async(api.initial)(api.request, *args, **kwargs)
+                response = await handler(api.request, *args, **kwargs)
+            else:
+                response = await sync_to_async(self.dispatch_sync)(api, *args, **kwargs)
+        except Exception as exc:
+            response = api.handle_exception(exc)
+        return api.finalize_response(api.request, response, *args, **kwargs)
+
+    @staticmethod
+    def dispatch_sync(api, *args, **kwargs):
+        """Methods only the DRF view implements (and OPTIONS, 405s) are handled there."""
+        api.initial(api.request, *args, **kwargs)
+        method = api.request.method.lower()
+        if method in api.http_method_names:
+            handler = getattr(api, method, api.http_method_not_allowed)
+        else:
+            handler = api.http_method_not_allowed
+        return handler(api.request, *args, **kwargs)
+
+
+class CreateAccessPassSessionAsyncView(AsyncAPIView):
+    api_view = CreateAccessPassSessionView
+
+    async def post(self, request):
+        user = request.user
+        if not user.is_authenticated or user.role != 'BUYER':
+            return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            pass_type = (
+                await AccessPassType.objects.filter(slug='basic').afirst()
+                or await AccessPassType.objects.afirst()
+            )
+            session_kwargs = access_pass_session_kwargs(request, user, pass_type)
+            checkout_session = await stripe.checkout.Session.create_async(**session_kwargs)
+            return Response({'url': checkout_session.url})
+        except Exception as e:
+            logger.exception("Exception creating access pass checkout session for user %s", user.pk)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AccessPassSuccessAsyncView(AsyncAPIView):
+    api_view = AccessPassSuccessView
+
+    async def get(self, request):
+        session_id = request.GET.get('session_id')
+        if not session_id:
+            return Response({'error': 'No session_id provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session = await stripe.checkout.Session.retrieve_async(session_id)
+        except stripe.error.StripeError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        metadata = session.metadata.to_dict()
+        if session.payment_status == 'paid' and metadata.get('type') == 'access_pass':
+            access_pass_id = metadata.get('access_pass_id')
+            try:
+                profile = await BuyerProfile.objects.aget(user_id=metadata.get('user_id'))
+                pass_type = await AccessPassType.objects.filter(id=access_pass_id).afirst() if access_pass_id else None
+                apply_access_pass(profile, pass_type)
+                await profile.asave()
+                return redirect('/buyer/dashboard?success=access_pass_activated')
+            except Exception as e:
+                logger.exception("Exception in AccessPassSuccessAsyncView for session %s", session_id)
+                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return redirect('/buyer/dashboard?error=payment_failed')
+
+
+class PaymentSuccessAsyncView(AsyncAPIView):
+    api_view = PaymentSuccessView
+
+    async def get(self, request):
+        session_id = request.GET.get('session_id')
+        if not session_id:
+            return Response({'error': 'No session_id provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session = await stripe.checkout.Session.retrieve_async(session_id)
+        except stripe.error.StripeError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if session.payment_status != 'paid':
+            return Response({'error': 'Payment not completed.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return redirect(await sync_to_async(complete_signup)(session))
+        except PendingSignup.DoesNotExist:
+            return Response({'error': 'Signup data not found or already processed.'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.exception("Exception in PaymentSuccessAsyncView for session %s", session_id)
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PropertySearchAsyncView(AsyncAPIView):
+    api_view = PropertySearchView
+    read_from_replica = True
+
+    async def get(self, request):
+        key = await sync_to_async(search_cache_key)(request)
+        if key is None:
+            return await sync_to_async(self.api.list)(request)
+
+        data = await cache.aget(key)
+        if data is None:
+            data = await sync_to_async(self.api.fill_cache)(request, key)
+        return Response(data)
+
+
+class BuyerFavoriteAsyncView(AsyncAPIView):
+    """GET is the favorite status; POST (the toggle) runs in BuyerFavoriteToggleView."""
+    api_view = BuyerFavoriteToggleView
+
+    async def get(self, request, property_id):
+        buyer_profile = await BuyerProfile.objects.only('id').filter(user=request.user).afirst()
+        if buyer_profile is None:
+            raise Http404
+        is_fav = await buyer_profile.favorites.filter(pk=property_id).aexists()
+        return Response({"is_favorite": is_fav})
@@ -1,3 +1,5 @@
+import logging
+
 from django.conf import settings
 from django.shortcuts import redirect
 import stripe
@@ -9,6 +11,8 @@ from core.models import PendingSignup
 from api.v1.serializer import SignupSerializer
 from django.contrib.auth import login
 
+logger = logging.getLogger(__name__)
+
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 from api.models import PricingPlan
@@ -77,76 +81,118 @@ def get_price_for_user(signup_data):
     amount, _, _ = get_product_details(signup_data)
     return amount
 
+def access_pass_type():
+    """The pass sold at checkout: 'basic', else the first one, else None (legacy pricing)."""
+    from api.models import AccessPassType
+    return AccessPassType.objects.filter(slug='basic').first() or AccessPassType.objects.first()
+
+
+def access_pass_session_kwargs(request, user, pass_type):
+    """Arguments for stripe.checkout.Session.create() when `user` buys `pass_type`."""
+    if pass_type:
+        price_amount = int(pass_type.price * 100)
+        product_name = pass_type.name
+        description = f"{pass_type.days_duration}-Day Access Pass. Unlocks {pass_type.properties_limit} properties."
+        pass_id = pass_type.id
+    else:
+        # Emergency Fallback (Legacy)
+        price_amount = 65000
+        product_name = "Buyer Access Pass"
+        description = "30-Day Access Pass"
+        pass_id = None
+
+    success_url = request.build_absolute_uri(reverse('access-pass-success')) + "?session_id={CHECKOUT_SESSION_ID}"
+    cancel_url = request.build_absolute_uri('/buyer/dashboard')
+
+    # Prepare session arguments
+    session_kwargs = {
+        'payment_method_types': ['card'],
+        'line_items': [{
+            'price_data': {
+                'currency': 'usd',
+                'product_data': {
+                    'name': product_name,
+                    'description': description,
+                },
+                'unit_amount': price_amount,
+            },
+            'quantity': 1,
+        }],
+        'mode': 'payment',
+        'invoice_creation': {"enabled": True},
+        'success_url': success_url,
+        'cancel_url': cancel_url,
+        'client_reference_id': str(user.id),
+        'metadata': {
+            'type': 'access_pass',
+            'user_id': str(user.id),
+            'access_pass_id': str(pass_id) if pass_id else ''
+        }
+    }
+
+    # Start logic: Either 'customer' OR 'customer_email'
+    if user.stripe_customer_id:
+        session_kwargs['customer'] = user.stripe_customer_id
+    else:
+        session_kwargs['customer_email'] = user.email
+        session_kwargs['customer_creation'] = 'always' # Create a customer if one doesn't exist
+    return session_kwargs
+
+
+def apply_access_pass(profile, pass_type):
+    """Extend `profile`'s access pass by a purchase of `pass_type` (None: legacy defaults). Not saved."""
+    from django.utils import timezone
+    from datetime import timedelta
+
+    # Default values if pass type missing (fallback)
+    duration = 30
+    limit = 10
+    ext_days = 15
+    ext_price = 0
+
+    if pass_type:
+        duration = pass_type.days_duration
+        limit = pass_type.properties_limit
+        ext_days = pass_type.extension_days
+        ext_price = pass_type.extension_price
+
+    # 1. Update Expiry Date
+    now = timezone.now()
+    if profile.access_pass_expiry and profile.access_pass_expiry > now:
+        profile.access_pass_expiry += timedelta(days=duration)
+    else:
+        profile.access_pass_expiry = now + timedelta(days=duration)
+
+    # 2. Update Snapshot Values (Lock in terms for this subscription)
+    # Only update these on new pass purchase.
+    # If extending, logic might differ, but "Access Pass" usually means a new block.
+    # User said: "current subscription will not affect... added in the next month"
+    # Since this IS the "next month" / new purchase, we update the snapshot.
+
+    profile.current_access_pass_limit = limit
+    profile.current_access_pass_extension_days = ext_days
+    profile.current_access_pass_extension_price = ext_price
+
+    # Reset extensions used on new pass?
+    # Usually yes, if it's a fresh pass.
+    # If it's a stacking purchase, maybe not?
+    # Assuming reset for now as it's a "Pass".
+    profile.access_pass_extensions_used = 0
+
+
 class CreateAccessPassSessionView(APIView):
     """
     Create a Stripe Checkout Session for Buyer Access Pass
+    (served by api.v1.async_views.CreateAccessPassSessionAsyncView)
     """
     def post(self, request):
         if not request.user.is_authenticated or request.user.role != 'BUYER':
             return Response({'error': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
             
         try:
-            # Determine price from AccessPassType (Dynamic)
-            # Default to 'basic' or the first available pass
-            from api.models import AccessPassType
-            
-            # You might want to let the frontend send which pass ID to buy, 
+            # You might want to let the frontend send which pass ID to buy,
             # but for now we'll default to 'basic' if not provided.
-            # If you want to support multiple tiers eventually, get pass_id from request.data
-            
-            pass_type = AccessPassType.objects.filter(slug='basic').first()
-            if not pass_type:
-                # Fallback if no basic pass exists
-                pass_type = AccessPassType.objects.first()
-                
-            if pass_type:
-                price_amount = int(pass_type.price * 100)
-                product_name = pass_type.name
-                description = f"{pass_type.days_duration}-Day Access Pass. Unlocks {pass_type.properties_limit} properties."
-                pass_id = pass_type.id
-            else:
-                # Emergency Fallback (Legacy)
-                price_amount = 65000 
-                product_name = "Buyer Access Pass"
-                description = "30-Day Access Pass"
-                pass_id = None
-
-            success_url = request.build_absolute_uri(reverse('access-pass-success')) + "?session_id={CHECKOUT_SESSION_ID}"
-            cancel_url = request.build_absolute_uri('/buyer/dashboard')
-            
-            # Prepare session arguments
-            session_kwargs = {
-                'payment_method_types': ['card'],
-                'line_items': [{
-                    'price_data': {
-                        'currency': 'usd',
-                        'product_data': {
-                            'name': product_name,
-                            'description': description,
-                        },
-                        'unit_amount': price_amount,
-                    },
-                    'quantity': 1,
-                }],
-                'mode': 'payment',
-                'invoice_creation': {"enabled": True},
-                'success_url': success_url,
-                'cancel_url': cancel_url,
-                'client_reference_id': str(request.user.id),
-                'metadata': {
-                    'type': 'access_pass',
-                    'user_id': str(request.user.id),
-                    'access_pass_id': str(pass_id) if pass_id else ''
-                }
-            }
-            
-            # Start logic: Either 'customer' OR 'customer_email'
-            if request.user.stripe_customer_id:
-                session_kwargs['customer'] = request.user.stripe_customer_id
-            else:
-                session_kwargs['customer_email'] = request.user.email
-                session_kwargs['customer_creation'] = 'always' # Create a customer if one doesn't exist
-            
+            session_kwargs = access_pass_session_kwargs(request, request.user, access_pass_type())
             checkout_session = stripe.checkout.Session.create(**session_kwargs)
             return Response({'url': checkout_session.url})
         except Exception as e:
@@ -155,6 +201,7 @@ class CreateAccessPassSessionView(APIView):
 class AccessPassSuccessView(APIView):
     """
     Handle successful Access Pass payment
+    (served by api.v1.async_views.AccessPassSuccessAsyncView)
     """
     permission_classes = [] # Allow callback to hit this, but we'll verify session
     
@@ -170,62 +217,18 @@ class AccessPassSuccessView(APIView):
              
         if session.payment_status == 'paid':
              # Verify it's an Access Pass session
-             if session.metadata.get('type') == 'access_pass':
-                 user_id = session.metadata.get('user_id')
-                 access_pass_id = session.metadata.get('access_pass_id')
+             metadata = session.metadata.to_dict()
+             if metadata.get('type') == 'access_pass':
+                 user_id = metadata.get('user_id')
+                 access_pass_id = metadata.get('access_pass_id')
                  
                  try:
-                     from core.models import User
                      from api.models import BuyerProfile, AccessPassType
-                     from django.utils import timezone
-                     from datetime import timedelta
-                     
-                     user = User.objects.get(id=user_id)
-                     profile = BuyerProfile.objects.get(user=user)
-                     
+
+                     profile = BuyerProfile.objects.get(user_id=user_id)
                      # Fetch the pass type used for this purchase
-                     pass_type = None
-                     if access_pass_id:
-                         try:
-                             pass_type = AccessPassType.objects.get(id=access_pass_id)
-                         except AccessPassType.DoesNotExist:
-                             pass
-                     
-                     # Default values if pass type missing (fallback)
-                     duration = 30
-                     limit = 10
-                     ext_days = 15
-                     ext_price = 0
-                     
-                     if pass_type:
-                         duration = pass_type.days_duration
-                         limit = pass_type.properties_limit
-                         ext_days = pass_type.extension_days
-                         ext_price = pass_type.extension_price
-                     
-                     # 1. Update Expiry Date
-                     now = timezone.now()
-                     if profile.access_pass_expiry and profile.access_pass_expiry > now:
-                         profile.access_pass_expiry += timedelta(days=duration)
-                     else:
-                         profile.access_pass_expiry = now + timedelta(days=duration)
-                         
-                     # 2. Update Snapshot Values (Lock in terms for this subscription)
-                     # Only update these on new pass purchase.
-                     # If extending, logic might differ, but "Access Pass" usually means a new block.
-                     # User said: "current subscription will not affect... added in the next month"
-                     # Since this IS the "next month" / new purchase, we update the snapshot.
-                     
-                     profile.current_access_pass_limit = limit
-                     profile.current_access_pass_extension_days = ext_days
-                     profile.current_access_pass_extension_price = ext_price
-                     
-                     # Reset extensions used on new pass? 
-                     # Usually yes, if it's a fresh pass. 
-                     # If it's a stacking purchase, maybe not? 
-                     # Assuming reset for now as it's a "Pass".
-                     profile.access_pass_extensions_used = 0 
-                         
+                     pass_type = AccessPassType.objects.filter(id=access_pass_id).first() if access_pass_id else None
+                     apply_access_pass(profile, pass_type)
                      profile.save()
                      
                      return redirect('/buyer/dashboard?success=access_pass_activated')
@@ -235,8 +238,6 @@ class AccessPassSuccessView(APIView):
         
         return redirect('/buyer/dashboard?error=payment_failed')
 
-
-
 def get_checkout_config(signup_data):
     """
     Returns (mode, line_items, subscription_data) based on role and PricingPlan.
@@ -408,81 +409,88 @@ def get_checkout_config(signup_data):
     return mode, line_items, subscription_data
 
 
+def complete_signup(session):
+    """
+    Create the account paid for by checkout `session` from its PendingSignup and
+    return the login URL to redirect to. Raises PendingSignup.DoesNotExist if
+    there is nothing to create and no account for the session's email.
+    """
+    try:
+        # We stored pending_signup_id in client_reference_id
+        pending_signup = PendingSignup.objects.get(id=session.client_reference_id)
+    except PendingSignup.DoesNotExist:
+        logger.info("PendingSignup %s not found.", session.client_reference_id)
+        # Check if user already exists (maybe page refresh?)
+        email = session.customer_email or session.metadata.to_dict().get('email')
+        if email:
+            from core.models import User
+            if User.objects.filter(email=email).exists():
+                logger.info("User %s already exists. Redirecting to login.", email)
+                return f"{reverse('login')}?success=account_created"
+        raise
+
+    logger.debug("Found PendingSignup: %s", pending_signup.email)
+
+    # Create the user
+    serializer = SignupSerializer(data=pending_signup.signup_data)
+    serializer.is_valid(raise_exception=True)
+    user = serializer.save()
+    user.is_active = True
+
+    # Store Stripe Customer ID
+    if session.customer:
+        user.stripe_customer_id = session.customer
+
+    # Store Subscription ID if present
+    if session.subscription:
+        user.stripe_subscription_id = session.subscription
+
+    user.save()
+    logger.info("User created successfully: %s", user.email)
+
+    # Delete pending signup
+    pending_signup.delete()
+
+    # Redirect to Login Page
+    # Use reverse to ensure correct URL construction
+    return f"{reverse('login')}?success=account_created"
+
+
 class PaymentSuccessView(APIView):
     """
     Handle successful payment
+    (served by api.v1.async_views.PaymentSuccessAsyncView)
     """
     permission_classes = []
 
     def get(self, request):
         session_id = request.GET.get('session_id')
-        print(f"DEBUG: PaymentSuccessView called with session_id: {session_id}")
+        logger.debug("PaymentSuccessView called with session_id: %s", session_id)
         
         if not session_id:
             return Response({'error': 'No session_id provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             session = stripe.checkout.Session.retrieve(session_id)
-            print(f"DEBUG: Stripe Session Status: {session.payment_status}")
-            print(f"DEBUG: Session Client Ref ID: {session.client_reference_id}")
-            print(f"DEBUG: Session Email: {session.customer_email}")
+            logger.debug(
+                "Stripe session %s: status %s, client ref %s, email %s",
+                session_id, session.payment_status, session.client_reference_id, session.customer_email,
+            )
             
         except stripe.error.StripeError as e:
-            print(f"DEBUG: Stripe Error: {str(e)}")
+            logger.warning("Stripe error retrieving session %s: %s", session_id, e)
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         if session.payment_status == 'paid':
-            # Retrieve PendingSignup
             try:
-                # We stored pending_signup_id in client_reference_id
-                pending_signup_id = session.client_reference_id
-                pending_signup = PendingSignup.objects.get(id=pending_signup_id)
-                signup_data = pending_signup.signup_data
-                
-                print(f"DEBUG: Found PendingSignup: {pending_signup.email}")
-                
-                # Create the user
-                serializer = SignupSerializer(data=signup_data)
-                if serializer.is_valid(raise_exception=True):
-                    user = serializer.save()
-                    user.is_active = True
-                    
-                    # Store Stripe Customer ID
-                    if session.customer:
-                        user.stripe_customer_id = session.customer
-                        
-                    # Store Subscription ID if present
-                    if session.subscription:
-                        user.stripe_subscription_id = session.subscription
-                        
-                    user.save()
-                    print(f"DEBUG: User created successfully: {user.email}")
-                    
-                    # Delete pending signup
-                    pending_signup.delete()
-                    
-                    # Redirect to Login Page
-                    # Use reverse to ensure correct URL construction
-                    login_url = reverse('login')
-                    return redirect(f"{login_url}?success=account_created")
-                    
+                return redirect(complete_signup(session))
             except PendingSignup.DoesNotExist:
-                 print(f"DEBUG: PendingSignup {session.client_reference_id} not found.")
-                 # Check if user already exists (maybe page refresh?)
-                 email = session.customer_email or session.metadata.get('email')
-                 if email:
-                     from core.models import User
-                     if User.objects.filter(email=email).exists():
-                         print(f"DEBUG: User {email} already exists. Redirecting to login.")
-                         login_url = reverse('login')
-                         return redirect(f"{login_url}?success=account_created")
-                 
                  return Response({'error': 'Signup data not found or already processed.'}, status=status.HTTP_404_NOT_FOUND)
             except Exception as e:
-                print(f"DEBUG: Exception in PaymentSuccessView: {str(e)}")
+                logger.exception("Exception in PaymentSuccessView")
                 return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        print(f"DEBUG: Payment status not 'paid': {session.payment_status}")
+        logger.info("Payment status not 'paid': %s", session.payment_status)
         return Response({'error': 'Payment not completed.'}, status=status.HTTP_400_BAD_REQUEST)
 
 class BillingPortalView(APIView):
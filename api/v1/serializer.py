@@ -1,11 +1,15 @@
 from rest_framework import serializers
 from django.db import transaction
 from core.models import User, PendingSignup
-from api.models import BuyerProfile, RealtorProfile, SellerProfile, PartnerProfile, PropertyImage, BuyerRealtorConnection
+from api.models import BuyerProfile, RealtorProfile, SellerProfile, PartnerProfile, PropertyImage, BuyerRealtorConnection, ClientPipelineStage, SavedSearch
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext_lazy as _
 from api.models import RealtorProfile
+from api.search_cache import viewer_has_full_access
+from api.sparse_fields import SparseFieldsetMixin
+from api.images import image_set
+from api.uploads import add_listing_images, ListingImageLimitError
 
 from django.utils import timezone
 from datetime import timedelta
@@ -305,7 +309,7 @@ class AgentSerializer(serializers.ModelSerializer):
 
 
 
-class BuyerProfileSerializer(serializers.ModelSerializer):
+class BuyerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Buyer Profile data"""
 
     first_name = serializers.CharField(source="user.first_name")
@@ -341,6 +345,8 @@ class BuyerProfileSerializer(serializers.ModelSerializer):
             "agent",
 
         ]
+        # Model paths read by method fields, for ?fields= projection
+        field_sources = {"budget_range": ["budget_range"], "agent": ["assigned_agent"]}
 
     def get_agent(self, obj):
         """Get assigned agent/realtor information"""
@@ -389,7 +395,7 @@ class BuyerProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
-class RealtorProfileSerializer(serializers.ModelSerializer):
+class RealtorProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Realtor Profile data"""
 
     first_name = serializers.CharField(source="user.first_name")
@@ -434,6 +440,7 @@ class RealtorProfileSerializer(serializers.ModelSerializer):
             "review_count",
             "connection_status",
         ]
+        field_sources = {"experience": ["years_of_experience"], "connection_status": []}
 
     def get_connection_status(self, obj):
         request = self.context.get('request')
@@ -490,7 +497,7 @@ class PropertyImageSerializer(serializers.ModelSerializer):
         fields = ["id", "image", "is_primary"]
 
 
-class SellerProfileSerializer(serializers.ModelSerializer):
+class SellerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Seller Profile data"""
 
     first_name = serializers.CharField(source="user.first_name")
@@ -577,6 +584,7 @@ class SellerProfileSerializer(serializers.ModelSerializer):
 
             "has_active_listing",
         ]
+        field_sources = {"property_type": ["property_type"]}
 
     def get_property_type(self, obj):
         """Get formatted property type display"""
@@ -650,18 +658,16 @@ class SellerProfileSerializer(serializers.ModelSerializer):
         # Image Upload Handling
         upload_images = validated_data.pop('upload_images', None)
         if upload_images:
-            # Check limit
-            current_count = instance.images.count()
-            if current_count + len(upload_images) > 6:
-                raise serializers.ValidationError("Maximum 6 images allowed.")
-                
-            for image in upload_images:
-                PropertyImage.objects.create(seller_profile=instance, image=image)
+            # Prefer POST /api/v1/seller/property-images/, which streams and validates uploads
+            try:
+                add_listing_images(instance, upload_images)
+            except ListingImageLimitError as e:
+                raise serializers.ValidationError(str(e))
 
         return instance
 
 
-class PropertySearchSerializer(serializers.ModelSerializer):
+class PropertySearchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for publicly searching properties (SellerProfiles)
     """
@@ -671,6 +677,7 @@ class PropertySearchSerializer(serializers.ModelSerializer):
     price = serializers.DecimalField(source='estimated_value', max_digits=12, decimal_places=2, read_only=True)
     image = serializers.SerializerMethodField()
     images = serializers.SerializerMethodField()
+    image_sets = serializers.SerializerMethodField()
     type = serializers.CharField(source='property_type', read_only=True)
     features = serializers.JSONField(source='property_features', read_only=True)
     dateAdded = serializers.DateTimeField(source='created_at', read_only=True)
@@ -684,44 +691,31 @@ class PropertySearchSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'location', 'price', 
             'bedrooms', 'bathrooms', 'sqft', 
-            'image', 'images', 'type', 'features', 'dateAdded', 'description',
+            'image', 'images', 'image_sets', 'type', 'features', 'dateAdded', 'description',
             'leaseback_required', 'seller_info', 'is_locked'
         ]
+        # Everything that checks is_locked needs the owner id
+        field_sources = {
+            'title': ['street_address', 'city', 'user'],
+            'location': ['city', 'state', 'user'],
+            'image': ['images'],
+            'images': ['images'],
+            'image_sets': ['images'],
+            'seller_info': ['user__first_name', 'user__last_name', 'user__email', 'user__phone_number'],
+            'is_locked': ['user'],
+        }
 
     def get_is_locked(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return True
-        
-        user = request.user
-        
-        # If user is the owner (Seller), they can see it
-        if user == obj.user:
-            return False
 
-        # If user is a Buyer, check access pass
-        if user.role == 'BUYER':
-            try:
-                # We access the profile. Since request.user is shared across the request,
-                # this should be efficient enough (cached after first access)
-                if hasattr(user, 'buyer_profile'):
-                     profile = user.buyer_profile
-                     if profile.access_pass_expiry and profile.access_pass_expiry > timezone.now():
-                         return False
-            except BuyerProfile.DoesNotExist:
-                pass
-        
-        # Realtors have full access
-        if user.role == 'REALTOR':
-            return False
-
-        # For other roles (e.g. Partner, Admin), maybe unlocked?
-        # Assuming for now only Paid Buyers can see details.
-        # If you want Admin to see, add: if user.is_staff: return False
-        if user.is_staff:
+        # If user is the owner (Seller), they can see it
+        if obj.user_id == request.user.pk:
             return False
 
-        return True
+        # Paid Buyers, Realtors and staff see every listing
+        return not viewer_has_full_access(request.user)
 
     def get_title(self, obj):
         # If locked, hide specific address and city
@@ -754,9 +748,9 @@ class PropertySearchSerializer(serializers.ModelSerializer):
 
     def get_image(self, obj):
         # optimistically get primary image, or first available
-        primary_img = obj.images.filter(is_primary=True).first()
-        if not primary_img:
-            primary_img = obj.images.first()
+        # (from the prefetched images, so a page of results costs no extra queries)
+        images = sorted(obj.images.all(), key=lambda img: img.pk)
+        primary_img = next((img for img in images if img.is_primary), images[0] if images else None)
         
         if primary_img and primary_img.image:
             return primary_img.image.url
@@ -766,10 +760,14 @@ class PropertySearchSerializer(serializers.ModelSerializer):
         # Images might give away location? usually fine.
         return [img.image.url for img in obj.images.all() if img.image]
 
+    def get_image_sets(self, obj):
+        # Same order as `images`, with resized/WebP variants for srcset
+        return [image_set(img) for img in obj.images.all() if img.image]
 
 
 
-class PartnerProfileSerializer(serializers.ModelSerializer):
+
+class PartnerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Partner Profile data"""
     first_name = serializers.CharField(source="user.first_name")
     last_name = serializers.CharField(source="user.last_name")
@@ -802,6 +800,7 @@ class PartnerProfileSerializer(serializers.ModelSerializer):
             "business_license_number",
 
         ]
+        field_sources = {"partnership_type_display": ["partnership_type"]}
 
 
 
@@ -863,3 +862,130 @@ class BuyerRealtorConnectionSerializer(serializers.ModelSerializer):
         
         validated_data['buyer'] = user.buyer_profile
         return super().create(validated_data)
+
+
+class ClientPipelineStageSerializer(serializers.ModelSerializer):
+    """
+    Realtor pipeline for one client. Field names follow the camelCase keys
+    used by the realtor clients page.
+    """
+    listingId = serializers.SerializerMethodField()
+    address = serializers.SerializerMethodField()
+    contactedSeller = serializers.BooleanField(source='contacted_seller', required=False)
+    putInOffer = serializers.BooleanField(source='put_in_offer', required=False)
+    offerDate = serializers.DateField(source='offer_date', required=False, allow_null=True)
+    sellerAcceptedOffer = serializers.BooleanField(source='seller_accepted_offer', required=False)
+    acceptedDate = serializers.DateField(source='accepted_date', required=False, allow_null=True)
+    sellerRejectedOffer = serializers.BooleanField(source='seller_rejected_offer', required=False)
+    rejectedDate = serializers.DateField(source='rejected_date', required=False, allow_null=True)
+    propertyClosed = serializers.BooleanField(source='property_closed', required=False)
+    closingDate = serializers.DateField(source='closing_date', required=False, allow_null=True)
+    closingComment = serializers.CharField(source='closing_comment', required=False, allow_blank=True)
+
+    DATE_FIELDS = ('offerDate', 'acceptedDate', 'rejectedDate', 'closingDate')
+
+    class Meta:
+        model = ClientPipelineStage
+        fields = [
+            'listingId', 'address', 'stage',
+            'contactedSeller', 'putInOffer', 'offerDate',
+            'sellerAcceptedOffer', 'acceptedDate',
+            'sellerRejectedOffer', 'rejectedDate',
+            'propertyClosed', 'closingDate', 'closingComment',
+            'updated_at',
+        ]
+        read_only_fields = ['stage', 'updated_at']
+
+    def get_listingId(self, obj):
+        return f"PROP-{obj.seller_id}"
+
+    def get_address(self, obj):
+        seller = obj.seller
+        return f"{seller.street_address}, {seller.city}, {seller.state}" if seller.street_address else "Address Pending"
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # The page binds dates straight into <input type="date">, which wants "" not null
+        for field in self.DATE_FIELDS:
+            if data.get(field) is None:
+                data[field] = ""
+        return data
+
+    def to_internal_value(self, data):
+        if hasattr(data, 'copy'):
+            data = data.copy()
+            for field in self.DATE_FIELDS:
+                if data.get(field) == "":
+                    data[field] = None
+        return super().to_internal_value(data)
+
+    def update(self, instance, validated_data):
+        # Only write the columns that were sent instead of rewriting the row
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data.keys()))
+        return instance
+
+
+class RealtorClientSerializer(serializers.ModelSerializer):
+    """
+    One row of the realtor clients page, built from the pipeline row and its seller.
+    """
+    id = serializers.IntegerField(source='seller_id', read_only=True)
+    type = serializers.SerializerMethodField()
+    name = serializers.SerializerMethodField()
+    email = serializers.EmailField(source='seller.user.email', read_only=True)
+    phone = serializers.SerializerMethodField()
+    properties = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClientPipelineStage
+        fields = ['id', 'type', 'name', 'email', 'phone', 'stage', 'properties']
+
+    def get_type(self, obj):
+        return 'seller'
+
+    def get_name(self, obj):
+        user = obj.seller.user
+        return user.get_full_name() or user.email.split('@')[0]
+
+    def get_phone(self, obj):
+        return obj.seller.user.phone_number or ""
+
+    def get_properties(self, obj):
+        return [ClientPipelineStageSerializer(obj).data]
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """Serializer for a buyer's saved property search"""
+    new_hits = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'name', 'params', 'is_active', 'new_hits', 'last_notified_at', 'created_at']
+        read_only_fields = ['id', 'last_notified_at', 'created_at']
+
+    def get_new_hits(self, obj):
+        return getattr(obj, 'new_hits', None)
+
+    def validate_params(self, value):
+        from api.filters import PropertyFilter, normalize_property_params
+        from api.saved_searches import SEARCH_PARAMS
+
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("params must be an object.")
+        unknown = set(value) - set(SEARCH_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown search parameters: {', '.join(sorted(unknown))}")
+
+        params = normalize_property_params(value)
+        if not params:
+            raise serializers.ValidationError("At least one search parameter is required.")
+        filterset = PropertyFilter(params, queryset=SellerProfile.objects.none())
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return params
+
+    def create(self, validated_data):
+        validated_data['buyer'] = self.context['request'].user.buyer_profile
+        return super().create(validated_data)
@@ -3,13 +3,20 @@ from api.v1.auth import SignupView, VerifyOTPView
 from api.v1.auth import LoginView
 from api.v1.views import (
     BuyerProfileView, RealtorProfileView, SellerProfileView, PartnerProfileView, PartnerListView, 
-    PropertyImageDeleteView, PropertySearchView, BuyerFavoritesView, BuyerFavoriteToggleView,
+    PropertyImageDeleteView, PropertyImageUploadView, PropertyImageDirectUploadView, PropertyImageDirectUploadCompleteView, LocalUploadView, PropertyFacetsView, PropertyLocationSuggestView, LatestListingsView, BuyerFavoritesView, BuyerMatchesView, SimilarListingsView,
+    SavedSearchListCreateView, SavedSearchDetailView, SavedSearchHitsView,
     ChangePasswordView, DeleteAccountView, UpdateNotificationSettingsView,
     PricingPlanListView, PricingPlanUpdateView, AccessPassTypeViewSet,
     RealtorListView, ConnectionRequestCreateView, RealtorRequestsListView,
-    ConnectionStatusUpdateView, BuyerConnectionsListView
+    ConnectionStatusUpdateView, ConnectionBulkStatusUpdateView, BuyerConnectionsListView,
+    RealtorClientsListView, RealtorClientPipelineView,
+    GeoStatesView, GeoCitiesView
+)
+from api.v1.payment import BillingPortalView
+from api.v1.async_views import (
+    PaymentSuccessAsyncView, CreateAccessPassSessionAsyncView, AccessPassSuccessAsyncView, PropertySearchAsyncView,
+    BuyerFavoriteAsyncView,
 )
-from api.v1.payment import PaymentSuccessView, BillingPortalView, CreateAccessPassSessionView, AccessPassSuccessView
 
 from rest_framework_simplejwt.views import TokenRefreshView, TokenBlacklistView
 
@@ -24,9 +31,23 @@ urlpatterns = [
     path("seller/profile/", SellerProfileView.as_view(), name="seller-profile"),
     path("partner/profile/", PartnerProfileView.as_view(), name="partner-profile"),
     path("seller/property-image/<int:pk>/", PropertyImageDeleteView.as_view(), name="delete-property-image"),
-    path("buyer/property-search/", PropertySearchView.as_view(), name="property-search"),
+    path("seller/property-images/", PropertyImageUploadView.as_view(), name="upload-property-images"),
+    path("seller/property-images/uploads/", PropertyImageDirectUploadView.as_view(), name="direct-upload-property-images"),
+    path("seller/property-images/uploads/complete/", PropertyImageDirectUploadCompleteView.as_view(), name="complete-property-image-uploads"),
+    path("uploads/local/<str:token>/", LocalUploadView.as_view(), name="local-direct-upload"),
+    path("buyer/property-search/", PropertySearchAsyncView.as_view(), name="property-search"),
+    path("buyer/property-search/facets/", PropertyFacetsView.as_view(), name="property-search-facets"),
+    path("buyer/property-search/latest/", LatestListingsView.as_view(), name="property-search-latest"),
+    path("buyer/property-search/suggest/", PropertyLocationSuggestView.as_view(), name="property-search-suggest"),
+    path("geo/states/", GeoStatesView.as_view(), name="geo-states"),
+    path("geo/states/<str:iso>/cities/", GeoCitiesView.as_view(), name="geo-cities"),
     path("buyer/favorites/", BuyerFavoritesView.as_view(), name="buyer-favorites"),
-    path("buyer/favorites/<int:property_id>/", BuyerFavoriteToggleView.as_view(), name="buyer-favorite-toggle"),
+    path("buyer/favorites/<int:property_id>/", BuyerFavoriteAsyncView.as_view(), name="buyer-favorite-toggle"),
+    path("buyer/matches/", BuyerMatchesView.as_view(), name="buyer-matches"),
+    path("properties/<int:pk>/similar/", SimilarListingsView.as_view(), name="similar-listings"),
+    path("buyer/saved-searches/", SavedSearchListCreateView.as_view(), name="saved-search-list"),
+    path("buyer/saved-searches/<int:pk>/", SavedSearchDetailView.as_view(), name="saved-search-detail"),
+    path("buyer/saved-searches/<int:pk>/hits/", SavedSearchHitsView.as_view(), name="saved-search-hits"),
 
     path("partners/", PartnerListView.as_view(), name="partner-list"),
     path("pricing-plans/", PricingPlanListView.as_view(), name="pricing-plan-list"),
@@ -35,12 +56,12 @@ urlpatterns = [
     path("user/change-password/", ChangePasswordView.as_view(), name="change-password"),
     path("user/delete-account/", DeleteAccountView.as_view(), name="delete-account"),
     path("user/settings/", UpdateNotificationSettingsView.as_view(), name="update-settings"),
-    path("payment/success/", PaymentSuccessView.as_view(), name="payment-success"),
+    path("payment/success/", PaymentSuccessAsyncView.as_view(), name="payment-success"),
     path("billing/portal/", BillingPortalView.as_view(), name="billing-portal"),
     
     # Access Pass
-    path("payment/create-access-pass-session/", CreateAccessPassSessionView.as_view(), name="create-access-pass-session"),
-    path("payment/access-pass-success/", AccessPassSuccessView.as_view(), name="access-pass-success"),
+    path("payment/create-access-pass-session/", CreateAccessPassSessionAsyncView.as_view(), name="create-access-pass-session"),
+    path("payment/access-pass-success/", AccessPassSuccessAsyncView.as_view(), name="access-pass-success"),
     
     # Access Pass Types (Admin)
     path("access-pass-types/", AccessPassTypeViewSet.as_view({'get': 'list', 'post': 'create'}), name="access-pass-types-list"),
@@ -51,5 +72,10 @@ urlpatterns = [
     path("buyer/connect/", ConnectionRequestCreateView.as_view(), name="connect-realtor"),
     path("buyer/connections/", BuyerConnectionsListView.as_view(), name="buyer-connections"),
     path("realtor/requests/", RealtorRequestsListView.as_view(), name="realtor-requests"),
+    path("realtor/requests/bulk/", ConnectionBulkStatusUpdateView.as_view(), name="bulk-update-connection-status"),
     path("realtor/request/<int:pk>/", ConnectionStatusUpdateView.as_view(), name="update-connection-status"),
+
+    # Realtor Client Pipeline
+    path("realtor/clients/", RealtorClientsListView.as_view(), name="realtor-clients"),
+    path("realtor/clients/<int:seller_id>/pipeline/", RealtorClientPipelineView.as_view(), name="realtor-client-pipeline"),
 ]
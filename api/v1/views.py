@@ -1,6 +1,10 @@
-from rest_framework.generics import RetrieveUpdateAPIView, DestroyAPIView, ListAPIView
+from rest_framework.generics import RetrieveUpdateAPIView, RetrieveUpdateDestroyAPIView, DestroyAPIView, ListAPIView, ListCreateAPIView
 from rest_framework.views import APIView
-from django.db.models import Q
+import json
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from api.v1.serializer import (
     BuyerProfileSerializer,
@@ -10,16 +14,39 @@ from api.v1.serializer import (
     PartnerProfileSerializer,
     PricingPlanSerializer,
     BuyerRealtorConnectionSerializer,
+    ClientPipelineStageSerializer,
+    RealtorClientSerializer,
+    SavedSearchSerializer,
+    PropertyImageSerializer,
 )
 from core.permissions import IsBuyer, IsRealtor, IsSeller, IsPartner
-from api.models import BuyerProfile, RealtorProfile, SellerProfile, PartnerProfile, PropertyImage, PricingPlan, BuyerRealtorConnection
+from api.models import BuyerProfile, RealtorProfile, SellerProfile, PartnerProfile, PropertyImage, PricingPlan, BuyerRealtorConnection, ClientPipelineStage, SavedSearch
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from rest_framework.pagination import LimitOffsetPagination
-from api.filters import PropertyFilter, PartnerFilter
+from rest_framework.parsers import MultiPartParser
+from api.filters import PropertyFilter, PartnerFilter, ClientPipelineFilter, BuyerConnectionFilter
+from api.pagination import RealtorRequestsCursorPagination, RealtorClientsCursorPagination
+from api.facets import get_facets, FacetParamsError
+from api.search_cache import search_cache_key, viewer_namespace, SEARCH_CACHE_TTL
+from api.latest_listings import latest_listings, locked_latest_listings, LATEST_LISTINGS_COUNT
+from api.gazetteer import get_gazetteer
+from api.suggest import suggest_locations
+from api.sparse_fields import ProjectedQuerysetMixin, project_queryset
+from api.uploads import (
+    ImageUploadHandler, ListingImageLimitError, add_listing_images, attach_listing_images,
+    MAX_IMAGES_PER_LISTING, IMAGE_UPLOAD_FIELD,
+)
+from api.direct_uploads import DirectUploadError, finish_upload, plan_upload
+from api.storage import property_image_storage
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from api.replicas import replica_reads
 
 
 
@@ -33,7 +60,7 @@ class BuyerProfileView(RetrieveUpdateAPIView):
 
     def get_object(self):
         user = self.request.user
-        return BuyerProfile.objects.get(user=user)
+        return project_queryset(BuyerProfile.objects.filter(user=user), self.serializer_class, self.request).get()
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -63,7 +90,7 @@ class RealtorProfileView(RetrieveUpdateAPIView):
 
     def get_object(self):
         user = self.request.user
-        return RealtorProfile.objects.get(user=user)
+        return project_queryset(RealtorProfile.objects.filter(user=user), self.serializer_class, self.request).get()
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -93,7 +120,7 @@ class SellerProfileView(RetrieveUpdateAPIView):
 
     def get_object(self):
         user = self.request.user
-        return SellerProfile.objects.get(user=user)
+        return project_queryset(SellerProfile.objects.filter(user=user), self.serializer_class, self.request).get()
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -113,6 +140,135 @@ class SellerProfileView(RetrieveUpdateAPIView):
         )
 
 
+class PropertyImageUploadView(APIView):
+    """
+    Seller uploads listing photos as multipart `images` files.
+    POST /api/v1/seller/property-images/
+    """
+    permission_classes = [IsAuthenticated, IsSeller]
+    parser_classes = [MultiPartParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Must be in place before anything reads the body
+        self.upload_handler = ImageUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # SessionAuthentication's CSRF check reads request.POST, which parses the whole body,
+        # so a session user's limit is set before authentication (the middleware knows them)
+        user = getattr(request._request, "user", None)
+        if user is not None and user.is_authenticated:
+            self.upload_handler.max_files = max(self.remaining_images(user), 0)
+        super().initial(request, *args, **kwargs)
+
+    @staticmethod
+    def remaining_images(user):
+        return MAX_IMAGES_PER_LISTING - PropertyImage.objects.filter(seller_profile__user=user).count()
+
+    def post(self, request):
+        listing = get_object_or_404(SellerProfile, user=request.user)
+        # Fail fast without reading the body; the count is re-checked under a lock when saving
+        remaining = self.remaining_images(request.user)
+        if remaining <= 0:
+            return Response({"error": f"Maximum {MAX_IMAGES_PER_LISTING} images allowed."}, status=status.HTTP_400_BAD_REQUEST)
+        self.upload_handler.max_files = remaining
+
+        files = request.FILES.getlist(IMAGE_UPLOAD_FIELD)
+        if self.upload_handler.errors:
+            return Response({IMAGE_UPLOAD_FIELD: self.upload_handler.errors}, status=status.HTTP_400_BAD_REQUEST)
+        if not files:
+            return Response({IMAGE_UPLOAD_FIELD: ["No images were uploaded."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            images = add_listing_images(listing, files)
+        except ListingImageLimitError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(PropertyImageSerializer(images, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class PropertyImageDirectUploadView(APIView):
+    """
+    Seller asks to upload listing photos straight to media storage.
+    POST /api/v1/seller/property-images/uploads/
+    {"images": [{"content_type", "size", "sha256"} or {..., "parts": [sha256, ...]}]}
+    Returns one upload per image: presigned PUT URL(s), or "exists": true.
+    """
+    permission_classes = [IsAuthenticated, IsSeller]
+
+    def post(self, request):
+        listing = get_object_or_404(SellerProfile, user=request.user)
+        specs = request.data.get(IMAGE_UPLOAD_FIELD)
+        if not isinstance(specs, list) or not specs:
+            return Response({IMAGE_UPLOAD_FIELD: ["No images were described."]}, status=status.HTTP_400_BAD_REQUEST)
+        # Re-checked under a lock when the uploads are attached
+        if listing.images.count() + len(specs) > MAX_IMAGES_PER_LISTING:
+            return Response({"error": f"Maximum {MAX_IMAGES_PER_LISTING} images allowed."}, status=status.HTTP_400_BAD_REQUEST)
+
+        uploads, errors = [], []
+        for index, spec in enumerate(specs):
+            try:
+                uploads.append(plan_upload(request.user, spec if isinstance(spec, dict) else {}))
+            except DirectUploadError as e:
+                errors.append(f"image {index + 1}: {e}")
+        if errors:
+            return Response({IMAGE_UPLOAD_FIELD: errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"uploads": uploads})
+
+
+class PropertyImageDirectUploadCompleteView(APIView):
+    """
+    Seller attaches photos uploaded via PropertyImageDirectUploadView.
+    POST /api/v1/seller/property-images/uploads/complete/
+    {"uploads": [{"token", "etags": [part ETags, multipart only]}]}
+    """
+    permission_classes = [IsAuthenticated, IsSeller]
+
+    def post(self, request):
+        listing = get_object_or_404(SellerProfile, user=request.user)
+        uploads = request.data.get("uploads")
+        if not isinstance(uploads, list) or not uploads:
+            return Response({"uploads": ["No uploads to complete."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        names, errors = [], []
+        for index, upload in enumerate(uploads):
+            upload = upload if isinstance(upload, dict) else {}
+            try:
+                names.append(finish_upload(request.user, upload.get("token", ""), upload.get("etags")))
+            except DirectUploadError as e:
+                errors.append(f"upload {index + 1}: {e}")
+        if errors:
+            return Response({"uploads": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            images = attach_listing_images(listing, names)
+        except ListingImageLimitError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(PropertyImageSerializer(images, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class LocalUploadView(APIView):
+    """
+    Receiver for the presigned PUT URLs of the local filesystem storage, which
+    stands in for an S3 bucket in development and tests.
+    PUT /api/v1/uploads/local/<token>/
+    """
+    # The signed URL is the credential, as with S3
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    def put(self, request, token):
+        storage = property_image_storage()
+        if not hasattr(storage, "receive_direct_upload"):
+            return Response({"error": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            etag = storage.receive_direct_upload(token, request._request, request.META.get("CONTENT_LENGTH"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_200_OK, headers={"ETag": etag})
+
+
 class PropertyImageDeleteView(DestroyAPIView):
     """
     View to delete a specific property image
@@ -128,9 +284,11 @@ class PropertyImageDeleteView(DestroyAPIView):
         return super().destroy(request, *args, **kwargs)
 
 
-class PropertySearchView(ListAPIView):
+@method_decorator(replica_reads, name='get')
+class PropertySearchView(ProjectedQuerysetMixin, ListAPIView):
     """
     Public View (for Buyers) to search properties
+    (served by api.v1.async_views.PropertySearchAsyncView)
     """
     permission_classes = [AllowAny]
     serializer_class = PropertySearchSerializer
@@ -144,7 +302,115 @@ class PropertySearchView(ListAPIView):
     ordering_fields = ['estimated_value', 'created_at']
     ordering = ['-created_at'] 
 
-class BuyerFavoritesView(ListAPIView):
+    def list(self, request, *args, **kwargs):
+        key = search_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        data = cache.get(key)
+        if data is None:
+            data = self.fill_cache(request, key)
+        return Response(data)
+
+    def fill_cache(self, request, key):
+        response = super().list(request)
+        # Store plain JSON types rather than the serializer-bound ReturnList
+        data = json.loads(JSONRenderer().render(response.data))
+        cache.set(key, data, SEARCH_CACHE_TTL)
+        return data
+
+
+class LatestListingsView(APIView):
+    """
+    Public View: the newest active listings for the homepage. Locked viewers are
+    served the cached snapshot; everyone else gets a single uncounted query.
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = []  # served from cache on every homepage load
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", LATEST_LISTINGS_COUNT)), LATEST_LISTINGS_COUNT)
+        except ValueError:
+            return Response({"limit": ["Enter a whole number."]}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(limit, 1)
+
+        if viewer_namespace(request.user) == "locked":
+            results, has_more = locked_latest_listings(limit)
+        else:
+            results, has_more = latest_listings(limit, {"request": request})
+        return Response({"results": results, "has_more": has_more})
+
+
+class PropertyFacetsView(APIView):
+    """
+    Public View: counts per property type, bedroom/bathroom bucket and price
+    range for the current search filters
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            facets = get_facets(request.query_params)
+        except FacetParamsError as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(facets)
+
+
+class PropertyLocationSuggestView(APIView):
+    """
+    Public View: city/state/zip suggestions with active listing counts for the search box
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = []  # answered from memory on every keystroke
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", 8)), 20)
+        except ValueError:
+            return Response({"limit": ["Enter a whole number."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(suggest_locations(request.query_params.get("q", ""), max(limit, 1)))
+
+
+class GeoStatesView(APIView):
+    """
+    Public View: US states from the bundled gazetteer
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = []  # static data, served from memory and cached by browsers
+
+    def get(self, request):
+        states = [{"name": name, "iso2": iso2} for iso2, name in get_gazetteer().states.items()]
+        response = Response(states)
+        patch_cache_control(response, public=True, max_age=settings.GEO_CACHE_MAX_AGE)
+        return response
+
+
+class GeoCitiesView(APIView):
+    """
+    Public View: cities in a US state, optionally filtered by name prefix (?q=)
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    def get(self, request, iso):
+        gazetteer = get_gazetteer()
+        iso = iso.upper()
+        if iso not in gazetteer.states:
+            return Response({"error": "Unknown state"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limit = int(request.query_params["limit"]) if "limit" in request.query_params else None
+        except ValueError:
+            return Response({"limit": ["Enter a whole number."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        cities = gazetteer.cities(iso, request.query_params.get("q", ""), limit)
+        response = Response([{"name": name} for name in cities])
+        patch_cache_control(response, public=True, max_age=settings.GEO_CACHE_MAX_AGE)
+        return response
+
+
+class BuyerFavoritesView(ProjectedQuerysetMixin, ListAPIView):
     """
     List all favorite properties for the logged-in buyer.
     """
@@ -166,6 +432,7 @@ class BuyerFavoriteToggleView(APIView):
     """
     Toggle a property as favorite for the logged-in buyer.
     POST /api/v1/buyer/favorites/<property_id>/
+    (served by api.v1.async_views.BuyerFavoriteAsyncView, which answers GET itself)
     """
     permission_classes = [IsAuthenticated, IsBuyer]
 
@@ -187,6 +454,74 @@ class BuyerFavoriteToggleView(APIView):
         return Response({"is_favorite": is_fav})
 
 
+class BuyerMatchesView(ListAPIView):
+    """
+    Active listings matching the logged-in buyer's budget and preferred location,
+    read from the precomputed match table.
+    """
+    permission_classes = [IsAuthenticated, IsBuyer]
+    serializer_class = PropertySearchSerializer
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        buyer_profile = get_object_or_404(BuyerProfile.objects.only('id'), user=self.request.user)
+        return SellerProfile.objects.filter(
+            buyer_matches__buyer=buyer_profile, has_active_listing=True
+        ).select_related('user').prefetch_related('images').order_by('-buyer_matches__created_at', '-id')
+
+
+class SimilarListingsView(ListAPIView):
+    """
+    Public View: active listings most similar to the given one, read from the
+    precomputed neighbour table.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = PropertySearchSerializer
+
+    def get_queryset(self):
+        get_object_or_404(SellerProfile.objects.only('id'), pk=self.kwargs['pk'], has_active_listing=True)
+        return SellerProfile.objects.filter(
+            similar_to__listing_id=self.kwargs['pk'], has_active_listing=True
+        ).select_related('user').prefetch_related('images').order_by('similar_to__rank')
+
+
+class SavedSearchListCreateView(ListCreateAPIView):
+    """
+    List or create the logged-in buyer's saved searches.
+    POST {"name": "...", "params": {"location": "austin", "price_max": 400000}}
+    """
+    permission_classes = [IsAuthenticated, IsBuyer]
+    serializer_class = SavedSearchSerializer
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(buyer__user=self.request.user).annotate(
+            new_hits=Count('hits', filter=Q(hits__notified_at__isnull=True))
+        )
+
+
+class SavedSearchDetailView(RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAuthenticated, IsBuyer]
+    serializer_class = SavedSearchSerializer
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(buyer__user=self.request.user)
+
+
+class SavedSearchHitsView(ListAPIView):
+    """
+    Listings recorded as matches for one saved search, newest first.
+    """
+    permission_classes = [IsAuthenticated, IsBuyer]
+    serializer_class = PropertySearchSerializer
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        saved_search = get_object_or_404(SavedSearch, pk=self.kwargs['pk'], buyer__user=self.request.user)
+        return SellerProfile.objects.filter(
+            saved_search_hits__saved_search=saved_search, has_active_listing=True
+        ).select_related('user').prefetch_related('images').order_by('-saved_search_hits__created_at', '-id')
+
+
 class PartnerProfileView(RetrieveUpdateAPIView):
     """
     View for Partner profile
@@ -197,7 +532,7 @@ class PartnerProfileView(RetrieveUpdateAPIView):
 
     def get_object(self):
         user = self.request.user
-        return PartnerProfile.objects.get(user=user)
+        return project_queryset(PartnerProfile.objects.filter(user=user), self.serializer_class, self.request).get()
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -217,6 +552,7 @@ class PartnerProfileView(RetrieveUpdateAPIView):
         )
 
 
+@method_decorator(replica_reads, name='get')
 class PartnerListView(ListAPIView):
     """
     Public View to list all partners
@@ -276,6 +612,7 @@ class UpdateNotificationSettingsView(APIView):
         return Response({"message": "Notification settings updated"}, status=status.HTTP_200_OK)
 
 
+@method_decorator(replica_reads, name='get')
 class PricingPlanListView(ListAPIView):
     """
     Public View to list all pricing plans
@@ -302,6 +639,7 @@ from api.models import AccessPassType
 from api.v1.serializer import AccessPassTypeSerializer
 from rest_framework import viewsets
 
+@method_decorator(replica_reads, name='list')
 class AccessPassTypeViewSet(viewsets.ModelViewSet):
     """
     CRUD for Access Pass Types (Admin only for write, All for read?)
@@ -351,9 +689,14 @@ class ConnectionRequestCreateView(APIView):
 class RealtorRequestsListView(ListAPIView):
     permission_classes = [IsAuthenticated, IsRealtor]
     serializer_class = BuyerRealtorConnectionSerializer
+    pagination_class = RealtorRequestsCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BuyerConnectionFilter
     
     def get_queryset(self):
-         return BuyerRealtorConnection.objects.filter(realtor__user=self.request.user, status='PENDING')
+         return BuyerRealtorConnection.objects.filter(
+             realtor__user=self.request.user, status=BuyerRealtorConnection.Status.PENDING
+         ).select_related('buyer__user', 'buyer__assigned_agent', 'realtor__user')
 
 class ConnectionStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated, IsRealtor]
@@ -390,6 +733,70 @@ class ConnectionStatusUpdateView(APIView):
         
         return Response({"status": "success", "connection_status": conn.status})
 
+
+class ConnectionBulkStatusUpdateView(APIView):
+    """
+    Accept or reject many pending requests at once.
+    POST /api/v1/realtor/requests/bulk/  {"ids": [1, 2, 3], "action": "accept" | "reject"}
+    """
+    permission_classes = [IsAuthenticated, IsRealtor]
+
+    def post(self, request):
+        action = request.data.get('action')
+        ids = request.data.get('ids')
+
+        if action not in ('accept', 'reject'):
+            return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids:
+            return Response({"error": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        auto_rejected = 0
+
+        with transaction.atomic():
+            # Lock the realtor's own pending rows (only those, in pk order, so
+            # concurrent bulk updates can't deadlock) so a concurrent auto-rejection
+            # of one of them waits, and the status filter below stays true until commit.
+            pending = BuyerRealtorConnection.objects.select_for_update(of=('self',)).filter(
+                pk__in=ids,
+                realtor__user=request.user,
+                status=BuyerRealtorConnection.Status.PENDING,
+            ).order_by('pk')
+            conn_ids, buyer_ids = [], []
+            for conn_id, buyer_id in pending.values_list('id', 'buyer_id'):
+                conn_ids.append(conn_id)
+                buyer_ids.append(buyer_id)
+
+            if action == 'accept':
+                updated = BuyerRealtorConnection.objects.filter(pk__in=conn_ids).update(
+                    status=BuyerRealtorConnection.Status.ACCEPTED, updated_at=now
+                )
+                BuyerProfile.objects.filter(pk__in=buyer_ids).update(
+                    assigned_agent=request.user, updated_at=now
+                )
+                # Other realtors' pending requests for these buyers, in one UPDATE
+                auto_rejected = BuyerRealtorConnection.objects.filter(
+                    buyer_id__in=buyer_ids,
+                    status=BuyerRealtorConnection.Status.PENDING,
+                ).exclude(pk__in=conn_ids).update(
+                    status=BuyerRealtorConnection.Status.REJECTED, updated_at=now
+                )
+            else:
+                updated = BuyerRealtorConnection.objects.filter(pk__in=conn_ids).update(
+                    status=BuyerRealtorConnection.Status.REJECTED, updated_at=now
+                )
+
+        return Response({
+            "status": "success",
+            "updated": updated,
+            "auto_rejected": auto_rejected,
+            "skipped": len(set(ids)) - len(conn_ids),
+        })
+
 class BuyerConnectionsListView(ListAPIView):
      permission_classes = [IsAuthenticated, IsBuyer]
      serializer_class = BuyerRealtorConnectionSerializer
@@ -397,3 +804,55 @@ class BuyerConnectionsListView(ListAPIView):
      def get_queryset(self):
          return BuyerRealtorConnection.objects.filter(buyer__user=self.request.user).order_by('-updated_at')
 
+
+
+class RealtorClientsListView(ListAPIView):
+    """
+    Paginated clients for the logged-in realtor.
+    GET /api/v1/realtor/clients/?stage=CONTACTED&stage=OFFER_SUBMITTED&search=...&ordering=-updated_at
+    """
+    permission_classes = [IsAuthenticated, IsRealtor]
+    serializer_class = RealtorClientSerializer
+    pagination_class = RealtorClientsCursorPagination
+
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = ClientPipelineFilter
+    ordering_fields = ['updated_at', 'created_at', 'stage']
+    ordering = ['-updated_at']
+
+    def get_queryset(self):
+        realtor = get_object_or_404(RealtorProfile.objects.only('id'), user=self.request.user)
+        # Rows left behind when a seller moved to another realtor are excluded
+        return ClientPipelineStage.objects.filter(
+            realtor=realtor, seller__assigned_realtor=realtor
+        ).select_related('seller__user').only(
+            'id', 'seller_id', 'realtor_id', 'stage',
+            'contacted_seller', 'put_in_offer', 'offer_date',
+            'seller_accepted_offer', 'accepted_date',
+            'seller_rejected_offer', 'rejected_date',
+            'property_closed', 'closing_date', 'closing_comment',
+            'created_at', 'updated_at',
+            'seller__street_address', 'seller__city', 'seller__state',
+            'seller__user__first_name', 'seller__user__last_name',
+            'seller__user__email', 'seller__user__phone_number',
+        )
+
+
+class RealtorClientPipelineView(RetrieveUpdateAPIView):
+    """
+    Read or partially update the pipeline for one of the realtor's clients.
+    PATCH /api/v1/realtor/clients/<seller_id>/pipeline/ with only the changed fields.
+    """
+    permission_classes = [IsAuthenticated, IsRealtor]
+    serializer_class = ClientPipelineStageSerializer
+
+    def get_object(self):
+        realtor = get_object_or_404(RealtorProfile, user=self.request.user)
+        seller = get_object_or_404(
+            SellerProfile.objects.only('id', 'street_address', 'city', 'state'),
+            pk=self.kwargs['seller_id'],
+            assigned_realtor=realtor,
+        )
+        pipeline, _ = ClientPipelineStage.objects.get_or_create(seller=seller, realtor=realtor)
+        pipeline.seller = seller
+        return pipeline
@@ -1,3 +1,4 @@
+import logging
 import random
 import string
 from django.core.mail import send_mail
@@ -5,6 +6,8 @@ from django.conf import settings
 from django.utils import timezone
 from .models import User
 
+logger = logging.getLogger(__name__)
+
 def generate_otp(length=8):
     """Generate a numeric OTP of given length."""
     return ''.join(random.choices(string.digits, k=length))
@@ -21,8 +24,8 @@ def send_verification_email(email, otp):
 
         send_mail(subject, message, from_email, recipient_list)
         return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
+    except Exception:
+        logger.exception("Error sending email")
         return False
 
 def send_otp_email(user_email):
@@ -40,6 +43,26 @@ def send_otp_email(user_email):
         return send_verification_email(user_email, otp)
     except User.DoesNotExist:
         return False
-    except Exception as e:
-        print(f"Error sending email: {e}")
+    except Exception:
+        logger.exception("Error sending email")
+        return False
+
+def send_saved_search_digest(email, listings):
+    """
+    Send one email listing new properties that matched a buyer's saved searches.
+    `listings` is a list of (search_name, SellerProfile) pairs.
+    """
+    try:
+        subject = f'{len(listings)} new listing(s) match your saved searches - OTL Platform'
+        lines = []
+        for search_name, listing in listings:
+            location = ", ".join(p for p in [listing.city, listing.state] if p) or "Location N/A"
+            price = f"${listing.estimated_value:,.0f}" if listing.estimated_value is not None else "Price N/A"
+            lines.append(f'- [{search_name}] {location} - {price} (/property/detail?id={listing.id})')
+        message = 'New properties matching your saved searches:\n\n' + '\n'.join(lines)
+
+        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+        return True
+    except Exception:
+        logger.exception("Error sending saved search digest to %s", email)
         return False
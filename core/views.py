@@ -4,8 +4,10 @@ import json
 from django.core.serializers.json import DjangoJSONEncoder
 from core.models import User
 from core.mixins import RoleRequiredMixin, BuyerRequiredMixin, SellerRequiredMixin, RealtorRequiredMixin, PartnerRequiredMixin, AdminRequiredMixin
-from api.v1.serializer import SellerProfileSerializer
-from api.models import PropertyView, SellerProfile
+from api.v1.serializer import SellerProfileSerializer, ClientPipelineStageSerializer
+from api.models import PropertyView, SellerProfile, ClientPipelineStage
+from api.search_cache import viewer_has_full_access
+from api.storage import MULTIPART_PART_SIZE, MULTIPART_THRESHOLD
 from django.utils import timezone
 from django.contrib import messages
 from django.shortcuts import redirect
@@ -46,10 +48,12 @@ class PropertyDetailView(TemplateView):
     template_name = "property-detail.html"
 
     def get(self, request, *args, **kwargs):
+        self.seller_profile = None
         property_id = request.GET.get('id')
         if property_id:
             try:
                 seller_profile = SellerProfile.objects.get(pk=property_id)
+                self.seller_profile = seller_profile
                 ip_address = get_client_ip(request)
                 
                 # Record unique view
@@ -62,6 +66,17 @@ class PropertyDetailView(TemplateView):
                 
         return super().get(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Server-geocoded coordinates for the map, only for viewers who may see the location
+        listing = self.seller_profile
+        coordinates = None
+        if listing and listing.latitude is not None:
+            if listing.user_id == self.request.user.pk or viewer_has_full_access(self.request.user):
+                coordinates = {'lat': listing.latitude, 'lon': listing.longitude}
+        context['map_coordinates'] = coordinates
+        return context
+
 class BuyerFavoritesView(BuyerRequiredMixin, TemplateView):
     template_name = "buyer-favorites.html"
 
@@ -91,7 +106,8 @@ class SellerDashboardView(SellerRequiredMixin, TemplateView):
 
 class SellerPropertyView(SellerRequiredMixin, TemplateView):
     template_name = "seller-property.html"
-    extra_context = {'active_page': 'properties'}
+    # The photo uploader hashes large files part by part, as api.storage names them
+    extra_context = {'active_page': 'properties', 'multipart_threshold': MULTIPART_THRESHOLD, 'multipart_part_size': MULTIPART_PART_SIZE}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -127,50 +143,8 @@ class RealtorClientsView(RealtorRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if hasattr(self.request.user, 'realtor_profile'):
-            realtor = self.request.user.realtor_profile
-            
-            # Fetch Sellers
-            sellers = realtor.assigned_sellers.select_related('user').all()
-            
-            clients_data = []
-            
-            # Add Sellers to clients list
-            for seller in sellers:
-                # Load saved status or use defaults
-                saved_properties = seller.client_status.get('properties', [])
-                current_property_status = {}
-                
-                if saved_properties and len(saved_properties) > 0:
-                     # Use the first property record from saved status as base
-                     current_property_status = saved_properties[0]
-
-                clients_data.append({
-                    'id': seller.id,
-                    'type': 'seller',
-                    'name': seller.user.get_full_name() or seller.user.email.split('@')[0],
-                    'email': seller.user.email,
-                    'phone': seller.user.phone_number or "",
-                    'properties': [{
-                        'listingId': f"PROP-{seller.id}",
-                        'address': f"{seller.street_address}, {seller.city}, {seller.state}" if seller.street_address else "Address Pending",
-                        'contactedSeller': current_property_status.get('contactedSeller', True), 
-                        'putInOffer': current_property_status.get('putInOffer', False),
-                        'offerDate': current_property_status.get('offerDate', ""),
-                        'sellerAcceptedOffer': current_property_status.get('sellerAcceptedOffer', False),
-                        'acceptedDate': current_property_status.get('acceptedDate', ""),
-                        'sellerRejectedOffer': current_property_status.get('sellerRejectedOffer', False),
-                        'rejectedDate': current_property_status.get('rejectedDate', ""),
-                        'propertyClosed': current_property_status.get('propertyClosed', False),
-                        'closingDate': current_property_status.get('closingDate', ""),
-                        'closingComment': current_property_status.get('closingComment', ""),
-                    }]
-                })
-            
-            context['clients_json'] = json.dumps(clients_data, cls=DjangoJSONEncoder)
-        else:
-            context['clients_json'] = "[]"
-            
+        # Client rows are fetched page by page from /api/v1/realtor/clients/
+        context['pipeline_stages'] = ClientPipelineStage.Stage.choices
         return context
 
 
@@ -186,6 +160,7 @@ class RealtorClientsView(RealtorRequiredMixin, TemplateView):
                     profile = seller_user.seller_profile
                     profile.assigned_realtor = request.user.realtor_profile
                     profile.save()
+                    ClientPipelineStage.objects.get_or_create(seller=profile, realtor=profile.assigned_realtor)
                     messages.success(request, f"Successfully connected with seller: {email}")
                 else:
                     messages.error(request, "This user exists but has not set up a seller profile yet.")
@@ -199,6 +174,10 @@ class RealtorClientsView(RealtorRequiredMixin, TemplateView):
 
 
 class RealtorClientUpdateView(RealtorRequiredMixin, View):
+    """
+    Legacy save endpoint for the clients page. Writes only the pipeline fields
+    that were sent; new clients should PATCH /api/v1/realtor/clients/<id>/pipeline/.
+    """
     def post(self, request, *args, **kwargs):
         try:
             data = json.loads(request.body)
@@ -212,10 +191,13 @@ class RealtorClientUpdateView(RealtorRequiredMixin, View):
             realtor = request.user.realtor_profile
             seller = SellerProfile.objects.get(id=client_id, assigned_realtor=realtor)
             
-            # Save status
-            # We store the entire properties array as structure for simplicity
-            seller.client_status = {'properties': properties_data}
-            seller.save()
+            pipeline, _ = ClientPipelineStage.objects.get_or_create(seller=seller, realtor=realtor)
+            serializer = ClientPipelineStageSerializer(
+                pipeline, data=properties_data[0] if properties_data else {}, partial=True
+            )
+            if not serializer.is_valid():
+                return JsonResponse({'status': 'error', 'message': serializer.errors}, status=400)
+            serializer.save()
             
             return JsonResponse({'status': 'success'})
             
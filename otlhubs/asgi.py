@@ -10,7 +10,24 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "otlhubs.settings")
+# Async views aren't tied to a thread, so a connection kept open for reuse never
+# is and they pile up: reconnect every request (or share a pool, DB_POOL) instead
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+for alias, database in settings.DATABASES.items():
+    if database.get("CONN_MAX_AGE", 0) != 0:
+        raise ImproperlyConfigured(
+            f'DATABASES["{alias}"]["CONN_MAX_AGE"] must be 0 under ASGI: unset DB_CONN_MAX_AGE or set DB_POOL=True.'
+        )
+
+if settings.DB_WARMUP:
+    from otlhubs.db import warm_up_connections
+
+    warm_up_connections()
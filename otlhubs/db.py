@@ -0,0 +1,16 @@
+"""
+Database connection warm-up for web processes.
+
+With DB_WARMUP on, wsgi.py/asgi.py open every configured database's
+connection (or fill its pool, see otlhubs.pooled_postgresql) while the worker
+starts, so the first requests don't pay for connection setup.
+"""
+from django.db import connections
+
+
+def warm_up_connections():
+    for connection in connections.all():
+        if hasattr(connection, "warm_up"):
+            connection.warm_up()
+        # Also the calling thread's own connection, kept if CONN_MAX_AGE allows
+        connection.ensure_connection()
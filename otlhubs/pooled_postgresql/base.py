@@ -0,0 +1,72 @@
+"""
+PostgreSQL backend that borrows connections from a psycopg 3 pool.
+
+Django 4.2 has no built-in pooling, so this wrapper takes a connection from a
+psycopg_pool.ConnectionPool where Django would connect and hands it back where
+Django would close it (at the end of every request). OPTIONS["pool"] is passed
+to the pool: min_size, max_size, timeout, max_idle, max_lifetime, ...
+CONN_HEALTH_CHECKS makes the pool check a connection before lending it.
+
+Requires `psycopg[binary,pool]` (psycopg 3) and CONN_MAX_AGE = 0.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # One pool per alias, shared by every thread's wrapper
+    _pools = {}
+
+    @property
+    def pool(self):
+        if self.alias not in self._pools:
+            if not is_psycopg3:
+                raise ImproperlyConfigured("Connection pooling requires psycopg 3: pip install 'psycopg[binary,pool]'.")
+            try:
+                from psycopg_pool import ConnectionPool
+            except ImportError:
+                raise ImproperlyConfigured("Connection pooling requires psycopg_pool: pip install 'psycopg[binary,pool]'.")
+            if self.settings_dict["CONN_MAX_AGE"] != 0:
+                raise ImproperlyConfigured("Pooled connections are reused by the pool; set CONN_MAX_AGE to 0.")
+
+            kwargs = self.get_connection_params()
+            # Django switches autocommit itself once it has the connection
+            kwargs["autocommit"] = True
+            pool = ConnectionPool(
+                kwargs=kwargs,
+                open=True,
+                check=ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                name=f"django-{self.alias}",
+                **self.settings_dict["OPTIONS"].get("pool", {}),
+            )
+            # Threads racing here keep whichever pool was stored first
+            if self._pools.setdefault(self.alias, pool) is not pool:
+                pool.close()
+        return self._pools[self.alias]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.getconn()
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # The pool rolls back anything left open, or discards a broken connection
+                self.pool.putconn(self.connection)
+            self.connection = None
+
+    def warm_up(self, timeout=30):
+        """Block until the pool holds its min_size connections."""
+        self.pool.wait(timeout=timeout)
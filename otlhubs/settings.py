@@ -54,6 +54,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Outermost app middleware, so it sees every write made while handling the request
+    "api.replicas.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -95,9 +97,83 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Keep connections open across requests for this many seconds (0 = reconnect
+        # every request), checking one still works before reusing it. Under ASGI
+        # (otlhubs.asgi) the default is 0 and nothing else is accepted: async views
+        # aren't tied to a thread, so persistent connections aren't reused there and pile up
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# Optional psycopg 3 pool (pip install 'psycopg[binary,pool]'): connections are
+# shared by all threads of a process instead of held one per thread
+if os.getenv("DB_POOL", "False") == "True":
+    DATABASES["default"].update({
+        "ENGINE": "otlhubs.pooled_postgresql",
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {
+            "pool": {
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+                # Seconds a request waits for a free connection before failing
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            },
+        },
+    })
+
+# Optional read replica for public read-only endpoints (see api.replicas): same
+# credentials and options as the primary, on another host
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        # Test runs read the primary through this alias instead of a second test database
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["api.replicas.ReplicaRouter"]
+# Seconds reads stay on the primary after a write, covering the replica's lag
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
+
+# Open connections (fill the pool) when a web worker starts, see otlhubs.db
+DB_WARMUP = os.getenv("DB_WARMUP", "False") == "True"
+
+
+# Cache
+# Per-process memory by default. Point these at a shared backend in production
+# (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache,
+# CACHE_LOCATION=redis://localhost:6379/1) so invalidation reaches every worker.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+PROPERTY_SEARCH_CACHE_TTL = int(os.getenv("PROPERTY_SEARCH_CACHE_TTL", 300))
+PROPERTY_FACETS_CACHE_TTL = int(os.getenv("PROPERTY_FACETS_CACHE_TTL", 60))
+# Seconds before the location autocomplete trie picks up listing changes made by other processes
+LOCATION_SUGGEST_MAX_AGE = int(os.getenv("LOCATION_SUGGEST_MAX_AGE", 60))
+SIMILAR_LISTINGS_K = int(os.getenv("SIMILAR_LISTINGS_K", 10))
+# Listings kept in the homepage "latest listings" snapshot
+LATEST_LISTINGS_COUNT = int(os.getenv("LATEST_LISTINGS_COUNT", 24))
+
+# Geocoding
+GEOCODER = os.getenv("GEOCODER", "api.geocoding.NominatimGeocoder")
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "OTL-Platform/1.0")
+GEOCODER_TIMEOUT = float(os.getenv("GEOCODER_TIMEOUT", 5))
+GEOCODER_FIXTURE = os.getenv("GEOCODER_FIXTURE", str(BASE_DIR / "api" / "fixtures" / "geocoder.json"))
+# Seconds between requests to an external geocoder (Nominatim allows one per second)
+GEOCODER_MIN_INTERVAL = float(os.getenv("GEOCODER_MIN_INTERVAL", 1))
+GEOCODE_CACHE_TTL_DAYS = int(os.getenv("GEOCODE_CACHE_TTL_DAYS", 90))
+GEOCODE_CACHE_MISS_TTL_DAYS = int(os.getenv("GEOCODE_CACHE_MISS_TTL_DAYS", 7))
+
+# US states/cities gazetteer served by /api/v1/geo/
+GAZETTEER_FILE = os.getenv("GAZETTEER_FILE", str(BASE_DIR / "api" / "fixtures" / "us_gazetteer.json"))
+GEO_CACHE_MAX_AGE = int(os.getenv("GEO_CACHE_MAX_AGE", 60 * 60 * 24 * 7))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -141,6 +217,38 @@ STATICFILES_DIRS = [
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# How api.media.serve_media hands off file bytes: "python", "x-accel-redirect" (nginx) or "x-sendfile".
+# Outside DEBUG the default is nginx, so workers don't stream media unless configured to
+MEDIA_SERVE_BACKEND = os.getenv("MEDIA_SERVE_BACKEND", "python" if DEBUG else "x-accel-redirect")
+# nginx `internal` location aliased to MEDIA_ROOT, used with x-accel-redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Where media lives: "local" (MEDIA_ROOT) or "s3" (any S3-compatible bucket, needs boto3).
+# Listing photos are stored once per unique content and uploaded by the browser
+# straight to storage (see api.storage and api.direct_uploads).
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "local")
+if MEDIA_STORAGE == "s3":
+    _MEDIA_S3_OPTIONS = {
+        "bucket_name": os.getenv("MEDIA_S3_BUCKET"),
+        "endpoint_url": os.getenv("MEDIA_S3_ENDPOINT_URL") or None,
+        "region_name": os.getenv("MEDIA_S3_REGION") or None,
+        "access_key": os.getenv("MEDIA_S3_ACCESS_KEY_ID") or None,
+        "secret_key": os.getenv("MEDIA_S3_SECRET_ACCESS_KEY") or None,
+        # Public bucket/CDN URL; unset, photos are authorized by api.media and redirected
+        "base_url": os.getenv("MEDIA_S3_PUBLIC_URL") or None,
+    }
+    STORAGES = {
+        "default": {"BACKEND": "api.storage.S3Storage", "OPTIONS": _MEDIA_S3_OPTIONS},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        "property_images": {"BACKEND": "api.storage.S3ContentAddressedStorage", "OPTIONS": _MEDIA_S3_OPTIONS},
+    }
+else:
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        "property_images": {"BACKEND": "api.storage.ContentAddressedStorage"},
+    }
+MEDIA_PRESIGNED_URL_EXPIRY = int(os.getenv("MEDIA_PRESIGNED_URL_EXPIRY", 60 * 60))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,8 @@
+"""
+Settings for the test suite: python manage.py test --settings=otlhubs.test_settings
+"""
+from otlhubs.settings import *  # noqa: F401,F403
+
+# Without a configured replica, "replica" reads the test database itself
+# (TEST MIRROR), so the routing in api.replicas is still exercised
+DATABASES.setdefault("replica", {**DATABASES["default"], "TEST": {"MIRROR": "default"}})
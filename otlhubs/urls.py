@@ -18,7 +18,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from api.media import serve_media
 from core.views import (
     IndexView, AboutView, LoginView, SignupView,
     BuyerDashboardView, SellerDashboardView, SellerSettingsView, SellerPropertyView,
@@ -74,6 +74,7 @@ urlpatterns = [
     path("partner/settings", PartnerSettingsView.as_view(), name="partner_settings"),
 ]
 
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Listing photos are authorized here and handed to the web server (see api.media)
+urlpatterns += [
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name="media"),
+]